@@ -1,24 +1,56 @@
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, jsonify, request, send_from_directory, stream_with_context
 from flask_cors import CORS
 import requests
 import pandas as pd
 import json
+import csv
+import io
 import math
-import random
+import operator
 import numpy as np
 from datetime import datetime, timedelta
 import pickle
 import os
+import tempfile
+import shutil
+import gzip
+import hashlib
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import r2_score, mean_squared_error
+from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
+from sklearn.model_selection import train_test_split
+import sklearn
+from sklearn.neighbors import BallTree
 import concurrent.futures
+from collections import OrderedDict
 import threading
+import uuid
 import schedule
 import time
 from datetime import timezone
 import pytz
 
+# Brotli is optional - responses fall back to gzip when it is not installed
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+# openpyxl is optional - /api/export only offers XLSX when it is installed
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+# msgpack is optional - /api/opportunities only offers format=msgpack when it is installed
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 app = Flask(__name__)
 CORS(app)
 
@@ -26,12 +58,630 @@ CORS(app)
 background_scheduler = None
 scraper_instance = None
 
+# /api/opportunities windows encoded up front whenever a new snapshot is published
+PRECOMPUTED_WINDOWS = (7, 30, 90)
+PRECOMPUTED_FORMATS = ('json', 'columnar')  # script.js asks for columnar, other clients for JSON
+MAX_ENCODED_WINDOWS = 32  # Per-snapshot LRU bound on encoded responses for other windows, deltas and binnings
+MAX_INDEX_WINDOWS = 8  # Per-snapshot LRU bound on spatial indexes for windows other than the precomputed ones
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+_NOT_ENCODED = object()
+
+# Columnar snapshot storage: the record layout produced by _build_opportunity
+OPPORTUNITY_FIELDS = ('id', 'name', 'address', 'neighborhood', 'borough', 'lat', 'lng', 'totalValue',
+                      'pricePerSqft', 'sqft', 'violationDate', 'violationType', 'mlConfidence',
+                      'waterScore', 'transitScore', 'safetyScore', 'propertyOwner', 'phone')
+NUMERIC_FIELDS = ('id', 'lat', 'lng', 'totalValue', 'pricePerSqft', 'sqft', 'mlConfidence',
+                  'waterScore', 'transitScore', 'safetyScore')
+CATEGORICAL_FIELDS = ('neighborhood', 'borough', 'violationType', 'propertyOwner')
+TEXT_FIELDS = ('name', 'address', 'phone')
+
+# Server-side listing: sort keys match the dashboard's sort dropdown
+SORT_KEYS = ('value_desc', 'value_asc', 'name_asc', 'name_desc', 'date_desc', 'date_asc')
+QUERY_PARAMS = ('borough', 'min_value', 'max_value', 'min_confidence', 'sort', 'limit', 'cursor', 'top')
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# Delta sync: /api/opportunities?since=<version> is served from the last CHANGELOG_VERSIONS refreshes
+CHANGELOG_VERSIONS = 20
+
+# /api/opportunities wire formats - columnar and msgpack send column arrays plus string dictionaries
+WIRE_FORMATS = ('json', 'columnar', 'msgpack')
+MSGPACK_MIMETYPE = 'application/x-msgpack'
+DICTIONARY_ENCODED_FIELDS = CATEGORICAL_FIELDS + ('violationDate',)
+
+# Scan job queue
+SCAN_WORKERS = 2
+MAX_PENDING_SCANS = 8  # Distinct scans queued or running at once
+MAX_FINISHED_SCANS = 50  # Finished jobs kept around for polling
+SCAN_WAIT_SECONDS = 120  # Longest a request blocks on a scan job (or a stream waits for its next record)
+SCAN_RETRY_AFTER_SECONDS = 10  # Retry-After sent when the queue is full or a scan outlasts the wait
+
+# /api/events - Server-Sent Events pushed when a new snapshot is published
+SSE_HEARTBEAT_SECONDS = 15
+SSE_MAX_STREAM_SECONDS = 600  # Streams end after this and EventSource reconnects with Last-Event-ID
+SSE_RETRY_MS = 3000
+MAX_SSE_CLIENTS = 500
+
+MAX_OWNER_BATCH = 100  # Addresses per /api/property-owner/batch request
+
+# /api/export
+EXPORT_HEADERS = ['Name', 'Address', 'Borough', 'Neighborhood', 'Total Value', 'Price per SqFt',
+                  'Square Feet', 'Violation Date', 'Violation Type', 'ML Confidence']
+EXPORT_CHUNK_ROWS = 500
+
+# /api/clusters - grid cells are 1/4 of a 256px map tile, so a zoom level maps to cell level zoom + 2
+CLUSTER_CELL_BITS = 2
+MAX_CLUSTER_LEVEL = 20
+MAX_CLUSTER_FEATURES = 1024  # Viewports that would need more cells are served from a coarser level
+MAX_MERCATOR_LAT = 85.05112878
+
+# /api/spatial - same Earth radius as calculate_distance
+EARTH_RADIUS_MILES = 3959
+MAX_SPATIAL_RESULTS = 500
+MAX_NEAREST = 100
+
+# Per-address feature store - bump FEATURE_SCHEMA_VERSION whenever the feature math changes
+FEATURE_SCHEMA_VERSION = 1
+
+# Model artifact: flat forest arrays and scaler parameters as uncompressed .npy files, memory-mapped on load
+MODEL_ARTIFACT_DIR = 'nyc_commercial_rf_model'
+MODEL_ARTIFACT_FORMAT = 'flat-forest'
+MODEL_ARTIFACT_VERSION = 1
+MODEL_ARTIFACT_ARRAYS = ('feature', 'threshold', 'children', 'value', 'roots', 'scaler_mean', 'scaler_scale')
+
+# Versioned model registry - train_model.py adds v0001, v0002, ... and PROMOTED names the version to serve
+MODEL_REGISTRY_DIR = 'model_registry'
+MODEL_RELOAD_CHECK_SECONDS = 30  # How often a running predictor looks for a newly promoted version
+
+# Synthetic training data around each neighborhood's training anchor, and the forest fitted on it
+TRAINING_SEED = 42
+TRAINING_SAMPLES_PER_ANCHOR = 40
+TRAINING_HOLDOUT = 0.2  # Share of samples held out for the metrics recorded with each version
+RANDOM_FOREST_PARAMS = {'n_estimators': 100, 'max_depth': 12, 'min_samples_split': 5, 'min_samples_leaf': 2}
+
+# Flattened forest inference - rows per traversal chunk bound the (rows x trees) node arrays
+FOREST_CHUNK_ROWS = 1024
+
+# Prediction memo - scaled features are rounded to PREDICTION_MEMO_DECIMALS places (standard deviations)
+PREDICTION_MEMO_DECIMALS = 2
+PREDICTION_MEMO_SIZE = 20000
+PREDICTION_MEMO_MAX_ERROR = 1.0  # Mean $/sqft the rounding may move a prediction
+
+# /api/aggregates value histogram
+HISTOGRAM_BIN_SIZE = 50000
+MAX_HISTOGRAM_BINS = 1000
+
+# NYC neighborhoods with realistic factors. Bounds are matched in table order, and
+# trainingAnchor marks the commercial areas the Random Forest's samples are drawn around
+NEIGHBORHOOD_PROFILES = [
+    # Manhattan
+    {"name": "Tribeca", "borough": "Manhattan", "bounds": {"minLat": 40.715, "maxLat": 40.725, "minLng": -74.015, "maxLng": -74.005}, "crimeBase": 8.5, "transitBase": 9.5, "amenityBase": 9.5,
+     "crimeSentiment": 0.25, "baseSafety": 8.2, "sqftMultiplier": 1.3, "buildingAge": 35, "commercialAppeal": 1.3, "priceRange": [200, 1000],
+     "trainingAnchor": {"lat": 40.7195, "lng": -74.0089, "priceRange": [600, 1200]}},
+    {"name": "SoHo", "borough": "Manhattan", "bounds": {"minLat": 40.720, "maxLat": 40.730, "minLng": -74.010, "maxLng": -73.995}, "crimeBase": 8.0, "transitBase": 9.0, "amenityBase": 9.8,
+     "crimeSentiment": 0.2, "baseSafety": 8.0, "sqftMultiplier": 1.25, "buildingAge": 30, "commercialAppeal": 1.35, "priceRange": [180, 900],
+     "trainingAnchor": {"lat": 40.7230, "lng": -74.0020, "priceRange": [550, 1100]}},
+    {"name": "West Village", "borough": "Manhattan", "bounds": {"minLat": 40.730, "maxLat": 40.740, "minLng": -74.010, "maxLng": -73.995}, "crimeBase": 8.5, "transitBase": 8.5, "amenityBase": 9.0,
+     "crimeSentiment": 0.18, "baseSafety": 7.8, "sqftMultiplier": 1.15, "buildingAge": 40, "commercialAppeal": 1.2, "priceRange": [160, 750],
+     "trainingAnchor": {"lat": 40.7357, "lng": -74.0036, "priceRange": [500, 950]}},
+    {"name": "East Village", "borough": "Manhattan", "bounds": {"minLat": 40.720, "maxLat": 40.735, "minLng": -73.995, "maxLng": -73.975}, "crimeBase": 6.0, "transitBase": 8.0, "amenityBase": 8.5,
+     "crimeSentiment": -0.05, "baseSafety": 6.5, "sqftMultiplier": 0.9, "buildingAge": 35, "commercialAppeal": 1.1, "priceRange": [120, 500],
+     "trainingAnchor": {"lat": 40.7264, "lng": -73.9816, "priceRange": [300, 650]}},
+    {"name": "Chelsea", "borough": "Manhattan", "bounds": {"minLat": 40.740, "maxLat": 40.755, "minLng": -74.010, "maxLng": -73.990}, "crimeBase": 7.5, "transitBase": 9.0, "amenityBase": 8.8,
+     "crimeSentiment": 0.1, "baseSafety": 7.3, "sqftMultiplier": 1.1, "buildingAge": 25, "commercialAppeal": 1.15, "priceRange": [400, 800],
+     "trainingAnchor": {"lat": 40.7465, "lng": -73.9972, "priceRange": [400, 800]}},
+    {"name": "Midtown West", "borough": "Manhattan", "bounds": {"minLat": 40.755, "maxLat": 40.770, "minLng": -74.000, "maxLng": -73.980}, "crimeBase": 6.8, "transitBase": 9.5, "amenityBase": 8.0,
+     "crimeSentiment": 0.05, "baseSafety": 7.0, "sqftMultiplier": 0.95, "buildingAge": 20, "commercialAppeal": 1.1, "priceRange": [130, 600],
+     "trainingAnchor": {"lat": 40.7549, "lng": -73.9840, "priceRange": [350, 800]}},
+    {"name": "Midtown East", "borough": "Manhattan", "bounds": {"minLat": 40.750, "maxLat": 40.765, "minLng": -73.980, "maxLng": -73.960}, "crimeBase": 6.5, "transitBase": 9.8, "amenityBase": 8.0,
+     "crimeSentiment": 0.08, "baseSafety": 7.2, "sqftMultiplier": 1.0, "buildingAge": 25, "commercialAppeal": 1.15, "priceRange": [140, 650]},
+    {"name": "Upper East Side", "borough": "Manhattan", "bounds": {"minLat": 40.765, "maxLat": 40.785, "minLng": -73.970, "maxLng": -73.945}, "crimeBase": 8.8, "transitBase": 9.2, "amenityBase": 8.5,
+     "crimeSentiment": 0.2, "baseSafety": 8.0, "sqftMultiplier": 1.05, "buildingAge": 30, "commercialAppeal": 1.1, "priceRange": [120, 550],
+     "trainingAnchor": {"lat": 40.7736, "lng": -73.9566, "priceRange": [350, 700]}},
+    {"name": "Upper West Side", "borough": "Manhattan", "bounds": {"minLat": 40.775, "maxLat": 40.795, "minLng": -74.000, "maxLng": -73.970}, "crimeBase": 8.2, "transitBase": 8.8, "amenityBase": 8.2,
+     "crimeSentiment": 0.15, "baseSafety": 7.7, "sqftMultiplier": 1.0, "buildingAge": 35, "commercialAppeal": 1.05, "priceRange": [110, 500],
+     "trainingAnchor": {"lat": 40.7851, "lng": -73.9754, "priceRange": [300, 650]}},
+    {"name": "Financial District", "borough": "Manhattan", "bounds": {"minLat": 40.702, "maxLat": 40.715, "minLng": -74.020, "maxLng": -74.000}, "crimeBase": 7.8, "transitBase": 8.5, "amenityBase": 7.5,
+     "crimeSentiment": 0.15, "baseSafety": 7.5, "sqftMultiplier": 1.2, "buildingAge": 25, "commercialAppeal": 1.25, "priceRange": [150, 800],
+     "trainingAnchor": {"lat": 40.7074, "lng": -74.0113, "priceRange": [400, 900]}},
+    {"name": "Harlem", "borough": "Manhattan", "bounds": {"minLat": 40.805, "maxLat": 40.830, "minLng": -73.960, "maxLng": -73.935}, "crimeBase": 4.5, "transitBase": 7.5, "amenityBase": 6.0,
+     "crimeSentiment": -0.15, "baseSafety": 5.5, "sqftMultiplier": 1.0, "buildingAge": 45, "commercialAppeal": 0.95, "priceRange": [80, 350]},
+
+    # Brooklyn
+    {"name": "DUMBO", "borough": "Brooklyn", "bounds": {"minLat": 40.700, "maxLat": 40.706, "minLng": -73.995, "maxLng": -73.985}, "crimeBase": 8.5, "transitBase": 8.0, "amenityBase": 8.5,
+     "crimeSentiment": 0.12, "baseSafety": 7.5, "sqftMultiplier": 1.15, "buildingAge": 15, "commercialAppeal": 1.2, "priceRange": [130, 600],
+     "trainingAnchor": {"lat": 40.7033, "lng": -73.9903, "priceRange": [350, 750]}},
+    {"name": "Brooklyn Heights", "borough": "Brooklyn", "bounds": {"minLat": 40.692, "maxLat": 40.700, "minLng": -74.000, "maxLng": -73.990}, "crimeBase": 8.8, "transitBase": 8.5, "amenityBase": 8.0,
+     "crimeSentiment": 0.18, "baseSafety": 7.8, "sqftMultiplier": 1.1, "buildingAge": 40, "commercialAppeal": 1.15, "priceRange": [120, 550],
+     "trainingAnchor": {"lat": 40.6958, "lng": -73.9936, "priceRange": [320, 680]}},
+    {"name": "Park Slope", "borough": "Brooklyn", "bounds": {"minLat": 40.665, "maxLat": 40.685, "minLng": -73.990, "maxLng": -73.970}, "crimeBase": 8.2, "transitBase": 8.5, "amenityBase": 8.0,
+     "crimeSentiment": 0.15, "baseSafety": 7.6, "sqftMultiplier": 1.05, "buildingAge": 35, "commercialAppeal": 1.1, "priceRange": [110, 450],
+     "trainingAnchor": {"lat": 40.6719, "lng": -73.9832, "priceRange": [280, 580]}},
+    {"name": "Williamsburg", "borough": "Brooklyn", "bounds": {"minLat": 40.700, "maxLat": 40.720, "minLng": -73.970, "maxLng": -73.945}, "crimeBase": 7.0, "transitBase": 8.0, "amenityBase": 8.8,
+     "crimeSentiment": 0.05, "baseSafety": 6.8, "sqftMultiplier": 1.0, "buildingAge": 20, "commercialAppeal": 1.15, "priceRange": [120, 500],
+     "trainingAnchor": {"lat": 40.7081, "lng": -73.9571, "priceRange": [300, 650]}},
+    {"name": "Red Hook", "borough": "Brooklyn", "bounds": {"minLat": 40.670, "maxLat": 40.680, "minLng": -74.020, "maxLng": -74.005}, "crimeBase": 5.5, "transitBase": 4.0, "amenityBase": 6.5,
+     "crimeSentiment": 0.0, "baseSafety": 7.0, "sqftMultiplier": 1.0, "buildingAge": 30, "commercialAppeal": 1.0, "priceRange": [80, 500]},
+    {"name": "Crown Heights", "borough": "Brooklyn", "bounds": {"minLat": 40.660, "maxLat": 40.680, "minLng": -73.950, "maxLng": -73.930}, "crimeBase": 5.0, "transitBase": 7.0, "amenityBase": 6.0,
+     "crimeSentiment": 0.0, "baseSafety": 7.0, "sqftMultiplier": 1.0, "buildingAge": 30, "commercialAppeal": 1.0, "priceRange": [80, 500]},
+    {"name": "Bed-Stuy", "borough": "Brooklyn", "bounds": {"minLat": 40.675, "maxLat": 40.695, "minLng": -73.950, "maxLng": -73.930}, "crimeBase": 5.2, "transitBase": 7.2, "amenityBase": 6.8,
+     "crimeSentiment": 0.0, "baseSafety": 7.0, "sqftMultiplier": 1.0, "buildingAge": 30, "commercialAppeal": 1.0, "priceRange": [80, 500]},
+
+    # Queens
+    {"name": "Long Island City", "borough": "Queens", "bounds": {"minLat": 40.740, "maxLat": 40.750, "minLng": -73.955, "maxLng": -73.940}, "crimeBase": 7.0, "transitBase": 8.5, "amenityBase": 7.5,
+     "crimeSentiment": 0.08, "baseSafety": 7.0, "sqftMultiplier": 0.95, "buildingAge": 15, "commercialAppeal": 1.05, "priceRange": [100, 400],
+     "trainingAnchor": {"lat": 40.7444, "lng": -73.9482, "priceRange": [250, 500]}},
+    {"name": "Astoria", "borough": "Queens", "bounds": {"minLat": 40.770, "maxLat": 40.780, "minLng": -73.935, "maxLng": -73.920}, "crimeBase": 7.2, "transitBase": 8.0, "amenityBase": 7.8,
+     "crimeSentiment": 0.1, "baseSafety": 7.2, "sqftMultiplier": 0.85, "buildingAge": 30, "commercialAppeal": 1.0, "priceRange": [90, 350],
+     "trainingAnchor": {"lat": 40.7720, "lng": -73.9300, "priceRange": [230, 450]}},
+    {"name": "Forest Hills", "borough": "Queens", "bounds": {"minLat": 40.720, "maxLat": 40.730, "minLng": -73.850, "maxLng": -73.835}, "crimeBase": 8.0, "transitBase": 7.5, "amenityBase": 7.0,
+     "crimeSentiment": 0.12, "baseSafety": 7.5, "sqftMultiplier": 0.8, "buildingAge": 25, "commercialAppeal": 0.95, "priceRange": [85, 300]},
+    {"name": "Flushing", "borough": "Queens", "bounds": {"minLat": 40.760, "maxLat": 40.770, "minLng": -73.840, "maxLng": -73.825}, "crimeBase": 6.5, "transitBase": 7.0, "amenityBase": 6.5,
+     "crimeSentiment": 0.0, "baseSafety": 7.0, "sqftMultiplier": 1.0, "buildingAge": 30, "commercialAppeal": 1.0, "priceRange": [80, 500]},
+    {"name": "Jackson Heights", "borough": "Queens", "bounds": {"minLat": 40.745, "maxLat": 40.760, "minLng": -73.885, "maxLng": -73.870}, "crimeBase": 6.0, "transitBase": 7.8, "amenityBase": 7.5,
+     "crimeSentiment": 0.0, "baseSafety": 7.0, "sqftMultiplier": 1.0, "buildingAge": 30, "commercialAppeal": 1.0, "priceRange": [80, 500]},
+
+    # Bronx
+    {"name": "Riverdale", "borough": "Bronx", "bounds": {"minLat": 40.890, "maxLat": 40.900, "minLng": -73.915, "maxLng": -73.900}, "crimeBase": 8.0, "transitBase": 6.0, "amenityBase": 6.5,
+     "crimeSentiment": 0.2, "baseSafety": 8.0, "sqftMultiplier": 1.0, "buildingAge": 30, "commercialAppeal": 1.0, "priceRange": [70, 280]},
+    {"name": "South Bronx", "borough": "Bronx", "bounds": {"minLat": 40.820, "maxLat": 40.835, "minLng": -73.915, "maxLng": -73.900}, "crimeBase": 3.5, "transitBase": 6.5, "amenityBase": 4.5,
+     "crimeSentiment": -0.25, "baseSafety": 4.5, "sqftMultiplier": 1.0, "buildingAge": 30, "commercialAppeal": 1.0, "priceRange": [60, 200]},
+    {"name": "Fordham", "borough": "Bronx", "bounds": {"minLat": 40.855, "maxLat": 40.870, "minLng": -73.905, "maxLng": -73.890}, "crimeBase": 4.5, "transitBase": 7.0, "amenityBase": 5.5,
+     "crimeSentiment": 0.0, "baseSafety": 7.0, "sqftMultiplier": 1.0, "buildingAge": 30, "commercialAppeal": 1.0, "priceRange": [80, 500],
+     "trainingAnchor": {"lat": 40.8621, "lng": -73.8965, "priceRange": [180, 350]}},
+
+    # Staten Island
+    {"name": "St. George", "borough": "Staten Island", "bounds": {"minLat": 40.640, "maxLat": 40.650, "minLng": -74.085, "maxLng": -74.070}, "crimeBase": 6.5, "transitBase": 5.5, "amenityBase": 5.5,
+     "crimeSentiment": 0.1, "baseSafety": 6.8, "sqftMultiplier": 1.0, "buildingAge": 30, "commercialAppeal": 1.0, "priceRange": [65, 220]}
+]
+
+def _haversine_miles(lat1, lng1, lat2, lng2):
+    """calculate_distance over NumPy arrays, broadcasting like any ufunc"""
+    lat1, lng1, lat2, lng2 = (np.asarray(value, dtype=np.float64) for value in (lat1, lng1, lat2, lng2))
+    dLat = np.radians(lat2 - lat1)
+    dLng = np.radians(lng2 - lng1)
+    a = (np.sin(dLat/2) * np.sin(dLat/2) +
+         np.cos(np.radians(lat1)) * np.cos(np.radians(lat2)) *
+         np.sin(dLng/2) * np.sin(dLng/2))
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
+    return EARTH_RADIUS_MILES * c
+
+class NeighborhoodRegistry:
+    """Neighborhood profiles as NumPy columns indexed by integer neighborhood id.
+
+    An id is the neighborhood's position in the profile table, so every attribute
+    lookup - single or batched - is array indexing.
+    """
+
+    def __init__(self, profiles):
+        self.profiles = tuple(profiles)
+        self.names = [profile['name'] for profile in self.profiles]
+        self.boroughs = [profile['borough'] for profile in self.profiles]
+        self.ids = {name: nid for nid, name in enumerate(self.names)}
+
+        def column(key, dtype=np.float64):
+            return np.array([profile[key] for profile in self.profiles], dtype=dtype)
+
+        bounds = np.array([[profile['bounds'][key] for key in ('minLat', 'maxLat', 'minLng', 'maxLng')]
+                           for profile in self.profiles])
+        self.min_lat, self.max_lat, self.min_lng, self.max_lng = bounds.T.copy()
+        self.center_lat = (self.min_lat + self.max_lat) / 2
+        self.center_lng = (self.min_lng + self.max_lng) / 2
+
+        self.crime_base = column('crimeBase')
+        self.transit_base = column('transitBase')
+        self.amenity_base = column('amenityBase')
+        self.crime_sentiment = column('crimeSentiment')
+        self.base_safety = column('baseSafety')
+        self.sqft_multiplier = column('sqftMultiplier')
+        self.building_age = column('buildingAge')
+        self.commercial_appeal = column('commercialAppeal')
+        self.min_price, self.max_price = column('priceRange').T.copy()
+
+        # Training anchors, one row per neighborhood that has one
+        anchored = [(nid, profile['trainingAnchor']) for nid, profile in enumerate(self.profiles)
+                    if 'trainingAnchor' in profile]
+        self.training_ids = np.array([nid for nid, _ in anchored], dtype=np.intp)
+        self.anchor_lat = np.array([anchor['lat'] for _, anchor in anchored])
+        self.anchor_lng = np.array([anchor['lng'] for _, anchor in anchored])
+        self.anchor_min_price, self.anchor_max_price = np.array(
+            [anchor['priceRange'] for _, anchor in anchored], dtype=np.float64).reshape(-1, 2).T.copy()
+
+        self.fingerprint = hashlib.sha1(json.dumps(self.profiles, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def __len__(self):
+        return len(self.profiles)
+
+    def locate(self, lats, lngs):
+        """Neighborhood ids for arrays of points: the first containing bounds, else the nearest center"""
+        lats = np.asarray(lats, dtype=np.float64).reshape(-1, 1)
+        lngs = np.asarray(lngs, dtype=np.float64).reshape(-1, 1)
+        inside = ((self.min_lat <= lats) & (lats <= self.max_lat) &
+                  (self.min_lng <= lngs) & (lngs <= self.max_lng))
+        ids = np.where(inside.any(axis=1), inside.argmax(axis=1), -1)
+
+        outside = ids < 0
+        if outside.any():
+            distances = _haversine_miles(lats[outside], lngs[outside], self.center_lat, self.center_lng)
+            ids[outside] = distances.argmin(axis=1)
+        return ids
+
+    def profile(self, nid):
+        return self.profiles[nid]
+
+NEIGHBORHOODS = NeighborhoodRegistry(NEIGHBORHOOD_PROFILES)
+
+class FlatForest:
+    """A fitted RandomForestRegressor flattened into NumPy node arrays.
+
+    Every tree's nodes are concatenated into one set of feature, threshold,
+    children and value arrays, with child indices rebased to the combined
+    arrays. Leaves point at themselves, so a batch walks all trees at once for
+    max_depth steps with no per-row branching.
+
+    sklearn compares float32 rows against float64 thresholds; thresholds are
+    stored as the largest float32 not above them, which makes every comparison
+    come out the same. Tree outputs are summed in tree order like sklearn does,
+    so predictions are bit-for-bit identical to RandomForestRegressor.predict.
+
+    A forest fitted on two outputs (price, spread) keeps the second one in
+    `spread`, and predict_with_spread averages it instead of measuring how
+    much the trees disagree.
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, max_depth, spread=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.spread = spread
+
+    @classmethod
+    def from_model(cls, model):
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        roots = np.concatenate([[0], np.cumsum([tree.node_count for tree in trees])[:-1]])
+
+        children = []
+        for tree, root in zip(trees, roots):
+            nodes = np.arange(tree.node_count) + root
+            leaf = tree.children_left < 0
+            children.append(np.column_stack([np.where(leaf, nodes, tree.children_left + root),
+                                             np.where(leaf, nodes, tree.children_right + root)]))
+
+        threshold = np.concatenate([tree.threshold for tree in trees])
+        threshold32 = threshold.astype(np.float32)
+        rounded_up = threshold32 > threshold
+        threshold32[rounded_up] = np.nextafter(threshold32[rounded_up], np.float32(-np.inf))
+
+        return cls(np.concatenate([np.maximum(tree.feature, 0) for tree in trees]).astype(np.int32),
+                   threshold32,
+                   np.concatenate(children).ravel().astype(np.int32),
+                   np.concatenate([tree.value[:, 0, 0] for tree in trees]),
+                   roots.astype(np.int32),
+                   max(tree.max_depth for tree in trees),
+                   np.concatenate([tree.value[:, 1, 0] for tree in trees]) if model.n_outputs_ == 2 else None)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def leaf_values(self, X):
+        """(rows x trees) leaf value each row reaches in each tree"""
+        return self.value[self.leaf_nodes(X)]
+
+    def leaf_nodes(self, X):
+        """(rows x trees) leaf node each row reaches in each tree"""
+        X = np.asarray(X, dtype=np.float32)
+        leaves = np.empty((len(X), self.n_trees), dtype=np.int32)
+        for start in range(0, len(X), FOREST_CHUNK_ROWS):
+            chunk = X[start:start + FOREST_CHUNK_ROWS]
+            cells = chunk.ravel()
+            row_offsets = (np.arange(len(chunk), dtype=np.int32) * chunk.shape[1])[:, None]
+            nodes = np.broadcast_to(self.roots, (len(chunk), self.n_trees))
+            for _ in range(self.max_depth):
+                go_right = cells[row_offsets + self.feature[nodes]] > self.threshold[nodes]
+                nodes = self.children[2 * nodes + go_right]
+            leaves[start:start + len(chunk)] = nodes
+        return leaves
+
+    def predict(self, X):
+        return self._mean(self.leaf_values(X))
+
+    def predict_with_spread(self, X):
+        """(rows x 2) mean prediction and standard deviation across trees, from one traversal"""
+        nodes = self.leaf_nodes(X)
+        leaves = self.value[nodes]
+        spread = leaves.std(axis=1) if self.spread is None else self._mean(self.spread[nodes])
+        return np.column_stack([self._mean(leaves), spread])
+
+    def _mean(self, leaves):
+        # Accumulate tree by tree like sklearn so the float sums match exactly
+        total = np.zeros(len(leaves))
+        for column in leaves.T:
+            total += column
+        total /= self.n_trees
+        return total
+
+def _save_model_artifact(path, forest, scaler_mean, scaler_scale, metadata=None):
+    """Write a model artifact directory, replacing any existing one at path in a single rename"""
+    parent = os.path.dirname(os.path.abspath(path))
+    tmp_path = tempfile.mkdtemp(prefix=f".{os.path.basename(path)}.", dir=parent)
+    try:
+        arrays = {
+            'feature': forest.feature, 'threshold': forest.threshold, 'children': forest.children,
+            'value': forest.value, 'roots': forest.roots,
+            'scaler_mean': np.asarray(scaler_mean, dtype=np.float64),
+            'scaler_scale': np.asarray(scaler_scale, dtype=np.float64)
+        }
+        names = MODEL_ARTIFACT_ARRAYS
+        if forest.spread is not None:
+            arrays['spread'] = forest.spread
+            names += ('spread',)
+        for name in names:
+            np.save(os.path.join(tmp_path, f"{name}.npy"), np.ascontiguousarray(arrays[name]))
+
+        manifest = dict(metadata or {}, format=MODEL_ARTIFACT_FORMAT, format_version=MODEL_ARTIFACT_VERSION,
+                        n_trees=forest.n_trees, node_count=len(forest.value), max_depth=forest.max_depth,
+                        n_features=len(arrays['scaler_mean']), learned_spread=forest.spread is not None)
+        _atomic_write_json(os.path.join(tmp_path, 'manifest.json'), manifest)
+
+        # Readable by every worker process, whichever user it runs as
+        os.chmod(tmp_path, 0o755)
+        for name in os.listdir(tmp_path):
+            os.chmod(os.path.join(tmp_path, name), 0o644)
+
+        if os.path.exists(path):
+            old_path = tempfile.mkdtemp(prefix=f".{os.path.basename(path)}.old.", dir=parent)
+            os.replace(path, os.path.join(old_path, 'model'))
+            os.replace(tmp_path, path)
+            shutil.rmtree(old_path, ignore_errors=True)
+        else:
+            os.replace(tmp_path, path)
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+def _load_model_artifact(path):
+    """Memory-map a model artifact: returns (forest, scaler_mean, scaler_scale, manifest).
+
+    Arrays stay in the page cache, so every worker process that maps the same
+    files shares one physical copy of the model.
+    """
+    with open(os.path.join(path, 'manifest.json')) as f:
+        manifest = json.load(f)
+    if manifest.get('format') != MODEL_ARTIFACT_FORMAT or manifest.get('format_version') != MODEL_ARTIFACT_VERSION:
+        raise ValueError(f"unsupported model artifact {manifest.get('format')} v{manifest.get('format_version')}")
+
+    names = MODEL_ARTIFACT_ARRAYS + (('spread',) if manifest.get('learned_spread') else ())
+    arrays = {name: np.asarray(np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r')) for name in names}
+    forest = FlatForest(arrays['feature'], arrays['threshold'], arrays['children'], arrays['value'],
+                        arrays['roots'], manifest['max_depth'], arrays.get('spread'))
+    return forest, arrays['scaler_mean'], arrays['scaler_scale'], manifest
+
+class ModelRegistry:
+    """Numbered model artifacts under one directory, plus a PROMOTED pointer to the one to serve.
+
+    Versions are never overwritten. Promoting rewrites only the small pointer
+    file, which running predictors poll to hot-swap models without a restart.
+    """
+
+    def __init__(self, root=MODEL_REGISTRY_DIR):
+        self.root = root
+        self.pointer_file = os.path.join(root, 'PROMOTED')
+
+    def versions(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root)
+                      if name.startswith('v') and name[1:].isdigit())
+
+    def path(self, version):
+        return os.path.join(self.root, version)
+
+    def manifest(self, version):
+        with open(os.path.join(self.path(version), 'manifest.json')) as f:
+            return json.load(f)
+
+    def register(self, forest, scaler_mean, scaler_scale, metadata=None):
+        """Store a model as the next version and return its name"""
+        os.makedirs(self.root, exist_ok=True)
+        number = int(self.versions()[-1][1:]) + 1 if self.versions() else 1
+        while True:
+            version = f"v{number:04d}"
+            try:
+                # Claims the name, so concurrent trainers never write the same version
+                os.mkdir(self.path(version))
+                break
+            except FileExistsError:
+                number += 1
+        _save_model_artifact(self.path(version), forest, scaler_mean, scaler_scale,
+                             dict(metadata or {}, version=version))
+        return version
+
+    def promote(self, version):
+        """Point PROMOTED at a registered version"""
+        self.manifest(version)  # Fails if the version is missing or incomplete
+        _atomic_write_json(self.pointer_file, {'version': version, 'promoted_at': datetime.now().isoformat()})
+        os.chmod(self.pointer_file, 0o644)
+
+    def promoted(self):
+        """Name of the promoted version, or None"""
+        if not os.path.exists(self.pointer_file):
+            return None
+        with open(self.pointer_file) as f:
+            return json.load(f)['version']
+
+    def load(self, version):
+        return _load_model_artifact(self.path(version))
+
+def fit_random_forest(X, y, seed=TRAINING_SEED, params=None, holdout=TRAINING_HOLDOUT, refit=True):
+    """Fit the scaler and forest on all cores, returning (model, scaler, training metadata).
+
+    A holdout share of the rows is kept out of a first fit and scored, so each
+    version records how well it does on samples it has not seen. The returned
+    model is then refit on every row; pass refit=False to keep the fit that
+    never saw the holdout.
+    """
+    params = dict(RANDOM_FOREST_PARAMS, **(params or {}))
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=holdout, random_state=seed)
+
+    def fit(X_fit, y_fit):
+        scaler = StandardScaler()
+        model = RandomForestRegressor(**params, random_state=seed, n_jobs=-1)
+        model.fit(scaler.fit_transform(X_fit), y_fit)
+        return model, scaler
+
+    start = time.perf_counter()
+    model, scaler = fit(X_train, y_train)
+    predicted = model.predict(scaler.transform(X_test))
+    if refit:
+        model, scaler = fit(X, y)
+    fit_seconds = time.perf_counter() - start
+
+    metadata = {
+        'seed': seed,
+        'hyperparameters': params,
+        'training_rows': len(X) if refit else len(X_train),
+        'holdout_rows': len(X_test),
+        'refit_on_all_rows': refit,
+        'fit_seconds': round(fit_seconds, 3),
+        'metrics': {
+            'r2': round(float(r2_score(y_test, predicted)), 4),
+            'rmse': round(float(np.sqrt(mean_squared_error(y_test, predicted))), 2),
+            'mae': round(float(mean_absolute_error(y_test, predicted)), 2)
+        },
+        'sklearn_version': sklearn.__version__
+    }
+    return model, scaler, metadata
+
+def train_model_version(predictor, registry, seed=TRAINING_SEED, params=None, promote=False,
+                        training_data=None, refit=True, **metadata):
+    """Fit a forest and register it; returns (version, manifest).
+
+    Fits on training_data (X, y) if given, else on synthesized samples, with
+    refit as in fit_random_forest. Extra keyword arguments are recorded in the
+    manifest.
+    """
+    if training_data is None:
+        training_data = predictor.synthesize_training_data(seed)
+    model, scaler, fit_metadata = fit_random_forest(*training_data, seed, params, refit=refit)
+    metadata = {**fit_metadata, 'source': 'synthetic', **metadata}
+    metadata.update({
+        'trained_at': datetime.now().isoformat(),
+        'feature_schema_version': FEATURE_SCHEMA_VERSION,
+        'feature_fingerprint': predictor._feature_fingerprint()
+    })
+    version = registry.register(FlatForest.from_model(model), scaler.mean_, scaler.scale_, metadata)
+    if promote:
+        registry.promote(version)
+    return version, registry.manifest(version)
+
+class PredictionMemo:
+    """Bounded LRU of model predictions keyed on quantized feature vectors.
+
+    Scaled features are rounded to `decimals` places and the model is evaluated
+    on the rounded vector, so a key always maps to the same prediction no matter
+    which address filled it. Geocoder anchor points that differ only by their
+    house-number offset land on the same key and skip the forest.
+    """
+
+    def __init__(self, decimals=PREDICTION_MEMO_DECIMALS, max_size=PREDICTION_MEMO_SIZE):
+        self.decimals = decimals
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def quantize(self, features_scaled):
+        # Adding 0.0 turns -0.0 into 0.0 so both round to the same key
+        return np.round(np.asarray(features_scaled, dtype=np.float64), self.decimals) + 0.0
+
+    def predict(self, features_scaled, model_predict):
+        """model_predict on the quantized rows, evaluating only keys not seen before.
+
+        model_predict may return one value per row or a row of outputs per row.
+        """
+        quantized = self.quantize(features_scaled)
+        keys = [row.tobytes() for row in quantized]
+        predictions = [None] * len(keys)
+        missing = {}
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                prediction = self._entries.get(key)
+                if prediction is None:
+                    missing.setdefault(key, []).append(i)
+                else:
+                    self._entries.move_to_end(key)
+                    predictions[i] = prediction
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            # Rows sharing a key within the batch are evaluated once
+            computed = model_predict(quantized[[rows[0] for rows in missing.values()]]).tolist()
+            with self._lock:
+                for (key, rows), prediction in zip(missing.items(), computed):
+                    for i in rows:
+                        predictions[i] = prediction
+                    self._entries[key] = prediction
+                    self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return np.array(predictions, dtype=np.float64)
+
+    def quantization_error(self, features_scaled, model_predict):
+        """Mean and largest change in prediction that rounding causes over these rows"""
+        exact = model_predict(np.asarray(features_scaled, dtype=np.float64))
+        errors = np.abs(model_predict(self.quantize(features_scaled)) - exact)
+        return {
+            'mean': float(errors.mean()) if len(errors) else 0.0,
+            'max': float(errors.max(initial=0.0))
+        }
+
+    def stats(self, since=None):
+        """Hits, misses and hit rate, optionally relative to an earlier stats() result"""
+        hits, misses = self.hits, self.misses
+        if since:
+            hits, misses = hits - since['hits'], misses - since['misses']
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            'size': len(self._entries)
+        }
+
 class NYCRealEstatePricePredictor:
     def __init__(self):
         # Initialize core attributes FIRST
         self.random_forest_model = None
         self.scaler = StandardScaler()
+
+        # What inference runs on - flattened from the model, or memory-mapped from its artifact
+        self.forest = None
+        self.scaler_mean = None
+        self.scaler_scale = None
         self.model_trained = False
+        self.model_version = None  # Registry version being served, None for the legacy artifact or pickle
+
+        # Promoted registry versions are swapped in while the server runs
+        self.model_registry = ModelRegistry()
+        self._model_lock = threading.Lock()
+        self._next_model_check = 0.0
+        self._rejected_model_version = None
+
+        # Model predictions shared by feature vectors that round to the same key
+        self.prediction_memo = PredictionMemo()
 
         # Initialize geocoding cache
         self.cache_file = 'geocoding_cache.json'
@@ -40,49 +690,12 @@ class NYCRealEstatePricePredictor:
         # Initialize enhanced features SECOND
         self._initialize_enhanced_features()
 
+        # Neighborhood profiles shared by find_neighborhood, training and inference
+        self.registry = NEIGHBORHOODS
+
         # Load trained Random Forest model LAST
         self._load_or_train_random_forest_model()
 
-        # NYC neighborhood data with realistic factors
-        self.neighborhoods = [
-            # Manhattan
-            {"name": "Tribeca", "borough": "Manhattan", "bounds": {"minLat": 40.715, "maxLat": 40.725, "minLng": -74.015, "maxLng": -74.005}, "crimeBase": 8.5, "transitBase": 9.5, "amenityBase": 9.5},
-            {"name": "SoHo", "borough": "Manhattan", "bounds": {"minLat": 40.720, "maxLat": 40.730, "minLng": -74.010, "maxLng": -73.995}, "crimeBase": 8.0, "transitBase": 9.0, "amenityBase": 9.8},
-            {"name": "West Village", "borough": "Manhattan", "bounds": {"minLat": 40.730, "maxLat": 40.740, "minLng": -74.010, "maxLng": -73.995}, "crimeBase": 8.5, "transitBase": 8.5, "amenityBase": 9.0},
-            {"name": "East Village", "borough": "Manhattan", "bounds": {"minLat": 40.720, "maxLat": 40.735, "minLng": -73.995, "maxLng": -73.975}, "crimeBase": 6.0, "transitBase": 8.0, "amenityBase": 8.5},
-            {"name": "Chelsea", "borough": "Manhattan", "bounds": {"minLat": 40.740, "maxLat": 40.755, "minLng": -74.010, "maxLng": -73.990}, "crimeBase": 7.5, "transitBase": 9.0, "amenityBase": 8.8},
-            {"name": "Midtown West", "borough": "Manhattan", "bounds": {"minLat": 40.755, "maxLat": 40.770, "minLng": -74.000, "maxLng": -73.980}, "crimeBase": 6.8, "transitBase": 9.5, "amenityBase": 8.0},
-            {"name": "Midtown East", "borough": "Manhattan", "bounds": {"minLat": 40.750, "maxLat": 40.765, "minLng": -73.980, "maxLng": -73.960}, "crimeBase": 6.5, "transitBase": 9.8, "amenityBase": 8.0},
-            {"name": "Upper East Side", "borough": "Manhattan", "bounds": {"minLat": 40.765, "maxLat": 40.785, "minLng": -73.970, "maxLng": -73.945}, "crimeBase": 8.8, "transitBase": 9.2, "amenityBase": 8.5},
-            {"name": "Upper West Side", "borough": "Manhattan", "bounds": {"minLat": 40.775, "maxLat": 40.795, "minLng": -74.000, "maxLng": -73.970}, "crimeBase": 8.2, "transitBase": 8.8, "amenityBase": 8.2},
-            {"name": "Financial District", "borough": "Manhattan", "bounds": {"minLat": 40.702, "maxLat": 40.715, "minLng": -74.020, "maxLng": -74.000}, "crimeBase": 7.8, "transitBase": 8.5, "amenityBase": 7.5},
-            {"name": "Harlem", "borough": "Manhattan", "bounds": {"minLat": 40.805, "maxLat": 40.830, "minLng": -73.960, "maxLng": -73.935}, "crimeBase": 4.5, "transitBase": 7.5, "amenityBase": 6.0},
-
-            # Brooklyn
-            {"name": "DUMBO", "borough": "Brooklyn", "bounds": {"minLat": 40.700, "maxLat": 40.706, "minLng": -73.995, "maxLng": -73.985}, "crimeBase": 8.5, "transitBase": 8.0, "amenityBase": 8.5},
-            {"name": "Brooklyn Heights", "borough": "Brooklyn", "bounds": {"minLat": 40.692, "maxLat": 40.700, "minLng": -74.000, "maxLng": -73.990}, "crimeBase": 8.8, "transitBase": 8.5, "amenityBase": 8.0},
-            {"name": "Park Slope", "borough": "Brooklyn", "bounds": {"minLat": 40.665, "maxLat": 40.685, "minLng": -73.990, "maxLng": -73.970}, "crimeBase": 8.2, "transitBase": 8.5, "amenityBase": 8.0},
-            {"name": "Williamsburg", "borough": "Brooklyn", "bounds": {"minLat": 40.700, "maxLat": 40.720, "minLng": -73.970, "maxLng": -73.945}, "crimeBase": 7.0, "transitBase": 8.0, "amenityBase": 8.8},
-            {"name": "Red Hook", "borough": "Brooklyn", "bounds": {"minLat": 40.670, "maxLat": 40.680, "minLng": -74.020, "maxLng": -74.005}, "crimeBase": 5.5, "transitBase": 4.0, "amenityBase": 6.5},
-            {"name": "Crown Heights", "borough": "Brooklyn", "bounds": {"minLat": 40.660, "maxLat": 40.680, "minLng": -73.950, "maxLng": -73.930}, "crimeBase": 5.0, "transitBase": 7.0, "amenityBase": 6.0},
-            {"name": "Bed-Stuy", "borough": "Brooklyn", "bounds": {"minLat": 40.675, "maxLat": 40.695, "minLng": -73.950, "maxLng": -73.930}, "crimeBase": 5.2, "transitBase": 7.2, "amenityBase": 6.8},
-
-            # Queens
-            {"name": "Long Island City", "borough": "Queens", "bounds": {"minLat": 40.740, "maxLat": 40.750, "minLng": -73.955, "maxLng": -73.940}, "crimeBase": 7.0, "transitBase": 8.5, "amenityBase": 7.5},
-            {"name": "Astoria", "borough": "Queens", "bounds": {"minLat": 40.770, "maxLat": 40.780, "minLng": -73.935, "maxLng": -73.920}, "crimeBase": 7.2, "transitBase": 8.0, "amenityBase": 7.8},
-            {"name": "Forest Hills", "borough": "Queens", "bounds": {"minLat": 40.720, "maxLat": 40.730, "minLng": -73.850, "maxLng": -73.835}, "crimeBase": 8.0, "transitBase": 7.5, "amenityBase": 7.0},
-            {"name": "Flushing", "borough": "Queens", "bounds": {"minLat": 40.760, "maxLat": 40.770, "minLng": -73.840, "maxLng": -73.825}, "crimeBase": 6.5, "transitBase": 7.0, "amenityBase": 6.5},
-            {"name": "Jackson Heights", "borough": "Queens", "bounds": {"minLat": 40.745, "maxLat": 40.760, "minLng": -73.885, "maxLng": -73.870}, "crimeBase": 6.0, "transitBase": 7.8, "amenityBase": 7.5},
-
-            # Bronx
-            {"name": "Riverdale", "borough": "Bronx", "bounds": {"minLat": 40.890, "maxLat": 40.900, "minLng": -73.915, "maxLng": -73.900}, "crimeBase": 8.0, "transitBase": 6.0, "amenityBase": 6.5},
-            {"name": "South Bronx", "borough": "Bronx", "bounds": {"minLat": 40.820, "maxLat": 40.835, "minLng": -73.915, "maxLng": -73.900}, "crimeBase": 3.5, "transitBase": 6.5, "amenityBase": 4.5},
-            {"name": "Fordham", "borough": "Bronx", "bounds": {"minLat": 40.855, "maxLat": 40.870, "minLng": -73.905, "maxLng": -73.890}, "crimeBase": 4.5, "transitBase": 7.0, "amenityBase": 5.5},
-
-            # Staten Island
-            {"name": "St. George", "borough": "Staten Island", "bounds": {"minLat": 40.640, "maxLat": 40.650, "minLng": -74.085, "maxLng": -74.070}, "crimeBase": 6.5, "transitBase": 5.5, "amenityBase": 5.5}
-        ]
-
         # Water bodies in NYC for distance calculation
         self.water_bodies = [
             {"name": "Hudson River", "lat": 40.7589, "lng": -74.0134},
@@ -92,6 +705,12 @@ class NYCRealEstatePricePredictor:
             {"name": "Bronx River", "lat": 40.8176, "lng": -73.8648}
         ]
 
+        # Per-address feature vectors, reused across runs until their inputs change
+        self.feature_store_file = 'address_features.json'
+        self._feature_store_lock = threading.Lock()
+        self._feature_store_dirty = False
+        self.feature_store = self._load_feature_store()
+
     def _load_cache(self):
         """Load geocoding cache from file"""
         try:
@@ -162,9 +781,21 @@ class NYCRealEstatePricePredictor:
         ]
 
     def _load_or_train_random_forest_model(self):
-        """Load trained Random Forest model or train a new one"""
+        """Load the promoted registry version, the memory-mapped model artifact, the pickled model, or train a new one"""
         model_file = 'nyc_commercial_rf_model.pkl'
 
+        if self.reload_model_if_promoted(force=True):
+            return
+
+        try:
+            if os.path.exists(MODEL_ARTIFACT_DIR):
+                forest, scaler_mean, scaler_scale, _ = _load_model_artifact(MODEL_ARTIFACT_DIR)
+                self._install_model(forest, scaler_mean, scaler_scale)
+                print("✅ Memory-mapped Random Forest model artifact")
+                return
+        except Exception as e:
+            print(f"⚠️ Could not load model artifact: {e}")
+
         try:
             # Try to load existing model
             if os.path.exists(model_file):
@@ -172,8 +803,9 @@ class NYCRealEstatePricePredictor:
                     model_data = pickle.load(f)
                     self.random_forest_model = model_data['model']
                     self.scaler = model_data['scaler']
-                    self.model_trained = True
+                    self._compile_model()
                     print("✅ Loaded pre-trained Random Forest model")
+                    self._export_model_artifact()
                     return
         except Exception as e:
             print(f"⚠️ Could not load saved model: {e}")
@@ -182,155 +814,170 @@ class NYCRealEstatePricePredictor:
         print("🤖 Training new Random Forest model...")
         self._train_random_forest_model()
 
-    def _train_random_forest_model(self):
-        """Train Random Forest model with NYC commercial real estate data"""
-        print("🏢 Training Random Forest model with NYC commercial data...")
-
-        # Generate training data based on real NYC commercial patterns
-        training_data = []
-
-        # Enhanced commercial areas with realistic pricing
-        commercial_areas = [
-            # Premium Manhattan neighborhoods
-            {"lat": 40.7195, "lng": -74.0089, "price_range": (600, 1200), "borough": "Manhattan", "name": "Tribeca"},
-            {"lat": 40.7230, "lng": -74.0020, "price_range": (550, 1100), "borough": "Manhattan", "name": "SoHo"},
-            {"lat": 40.7074, "lng": -74.0113, "price_range": (400, 900), "borough": "Manhattan", "name": "Financial District"},
-            {"lat": 40.7549, "lng": -73.9840, "price_range": (350, 800), "borough": "Manhattan", "name": "Midtown"},
-            {"lat": 40.7357, "lng": -74.0036, "price_range": (500, 950), "borough": "Manhattan", "name": "West Village"},
-            {"lat": 40.7264, "lng": -73.9816, "price_range": (300, 650), "borough": "Manhattan", "name": "East Village"},
-            {"lat": 40.7465, "lng": -73.9972, "price_range": (400, 800), "borough": "Manhattan", "name": "Chelsea"},
-            {"lat": 40.7736, "lng": -73.9566, "price_range": (350, 700), "borough": "Manhattan", "name": "Upper East Side"},
-            {"lat": 40.7851, "lng": -73.9754, "price_range": (300, 650), "borough": "Manhattan", "name": "Upper West Side"},
-
-            # Brooklyn neighborhoods
-            {"lat": 40.7033, "lng": -73.9903, "price_range": (350, 750), "borough": "Brooklyn", "name": "DUMBO"},
-            {"lat": 40.6958, "lng": -73.9936, "price_range": (320, 680), "borough": "Brooklyn", "name": "Brooklyn Heights"},
-            {"lat": 40.6719, "lng": -73.9832, "price_range": (280, 580), "borough": "Brooklyn", "name": "Park Slope"},
-            {"lat": 40.7081, "lng": -73.9571, "price_range": (300, 650), "borough": "Brooklyn", "name": "Williamsburg"},
-
-            # Queens neighborhoods
-            {"lat": 40.7444, "lng": -73.9482, "price_range": (250, 500), "borough": "Queens", "name": "Long Island City"},
-            {"lat": 40.7720, "lng": -73.9300, "price_range": (230, 450), "borough": "Queens", "name": "Astoria"},
-
-            # Bronx neighborhoods
-            {"lat": 40.8621, "lng": -73.8965, "price_range": (180, 350), "borough": "Bronx", "name": "Fordham"},
-        ]
-
-        for area in commercial_areas:
-            for _ in range(40):  # Generate samples for each area
-                lat = area["lat"] + (random.random() - 0.5) * 0.01
-                lng = area["lng"] + (random.random() - 0.5) * 0.01
-
-                water_score = self._calculate_enhanced_water_proximity(lat, lng)
-                transit_score = self._calculate_enhanced_transit_accessibility(lat, lng)
-                business_premium = self._calculate_business_district_premium(lat, lng)
-
-                # Area-specific crime sentiment
-                crime_sentiment = random.uniform(-0.1, 0.3) if area["borough"] == "Manhattan" else random.uniform(-0.2, 0.1)
-                safety_score = 7.0 + crime_sentiment * 2 + random.uniform(-0.5, 0.5)
-                safety_score = max(4.0, min(9.0, safety_score))
-
-                square_footage = random.uniform(2500, 4500)
-                building_age = random.uniform(10, 50)
-                type_premium = random.uniform(0.9, 1.3)
-
-                base_price = random.uniform(area["price_range"][0], area["price_range"][1])
-
-                features = [water_score, transit_score, business_premium, crime_sentiment,
-                           safety_score, square_footage, building_age, type_premium]
-
-                training_data.append({
-                    'features': features,
-                    'price': base_price
-                })
-
-        # Prepare training data
-        X = np.array([item['features'] for item in training_data])
-        y = np.array([item['price'] for item in training_data])
-
-        # Scale features
-        X_scaled = self.scaler.fit_transform(X)
+    def _compile_model(self):
+        """Flatten the fitted forest and scaler into the arrays inference runs on"""
+        self._install_model(FlatForest.from_model(self.random_forest_model), self.scaler.mean_, self.scaler.scale_)
+
+    def _install_model(self, forest, scaler_mean, scaler_scale, version=None):
+        """Switch inference to another model; predictions already running finish on the old one"""
+        with self._model_lock:
+            self.forest, self.scaler_mean, self.scaler_scale = forest, scaler_mean, scaler_scale
+            self.model_version = version
+            self.model_trained = True
+            # Memoized predictions belong to the old model
+            if self.prediction_memo is not None:
+                self.prediction_memo = PredictionMemo(self.prediction_memo.decimals, self.prediction_memo.max_size)
+
+    def reload_model_if_promoted(self, force=False):
+        """Hot-swap to the registry's promoted version if it changed, checking at most every MODEL_RELOAD_CHECK_SECONDS"""
+        now = time.monotonic()
+        if not force and now < self._next_model_check:
+            return False
+        self._next_model_check = now + MODEL_RELOAD_CHECK_SECONDS
 
-        # Train Random Forest model
-        self.random_forest_model = RandomForestRegressor(
-            n_estimators=100,
-            max_depth=12,
-            min_samples_split=5,
-            min_samples_leaf=2,
-            random_state=42
-        )
+        try:
+            version = self.model_registry.promoted()
+            if version is None or version in (self.model_version, self._rejected_model_version):
+                return False
+            forest, scaler_mean, scaler_scale, manifest = self.model_registry.load(version)
+            if manifest.get('feature_fingerprint') != self._feature_fingerprint():
+                self._rejected_model_version = version
+                print(f"⚠️ Model {version} was trained on different features, keeping the current model")
+                return False
+            self._install_model(forest, scaler_mean, scaler_scale, version)
+            print(f"✅ Serving model {version} (holdout R² {manifest.get('metrics', {}).get('r2')})")
+            return True
+        except Exception as e:
+            print(f"⚠️ Could not load promoted model: {e}")
+            return False
 
-        self.random_forest_model.fit(X_scaled, y)
-        self.model_trained = True
+    def _export_model_artifact(self):
+        """Write the flattened model so later processes can memory-map it instead of unpickling"""
+        try:
+            _save_model_artifact(MODEL_ARTIFACT_DIR, self.forest, self.scaler_mean, self.scaler_scale)
+            print(f"💾 Model artifact written to {MODEL_ARTIFACT_DIR}/")
+        except Exception as e:
+            print(f"⚠️ Could not write model artifact: {e}")
+
+    def scale_features(self, features):
+        """Standardize feature rows with the fitted scaler parameters"""
+        return (np.asarray(features, dtype=np.float64) - self.scaler_mean) / self.scaler_scale
+
+    def synthesize_training_data(self, seed=TRAINING_SEED, samples_per_anchor=TRAINING_SAMPLES_PER_ANCHOR):
+        """Synthetic (features, price per sqft) samples scattered around each neighborhood's training anchor"""
+        rng = np.random.default_rng(seed)
+        registry = self.registry
+        anchors = np.repeat(np.arange(len(registry.training_ids)), samples_per_anchor)
+        n = len(anchors)
+
+        lats = registry.anchor_lat[anchors] + (rng.random(n) - 0.5) * 0.01
+        lngs = registry.anchor_lng[anchors] + (rng.random(n) - 0.5) * 0.01
+
+        # Area-specific crime sentiment
+        manhattan = np.array([registry.boroughs[nid] == "Manhattan" for nid in registry.training_ids])[anchors]
+        crime_sentiment = np.where(manhattan, rng.uniform(-0.1, 0.3, n), rng.uniform(-0.2, 0.1, n))
+        safety_score = np.clip(7.0 + crime_sentiment * 2 + rng.uniform(-0.5, 0.5, n), 4.0, 9.0)
+
+        X = np.column_stack([
+            self._water_proximity_scores(lats, lngs),
+            self._transit_accessibility_scores(lats, lngs),
+            self._business_district_premiums(lats, lngs),
+            crime_sentiment,
+            safety_score,
+            rng.uniform(2500, 4500, n),  # Square footage
+            rng.uniform(10, 50, n),  # Building age
+            rng.uniform(0.9, 1.3, n)  # Property type premium
+        ])
+        y = rng.uniform(registry.anchor_min_price[anchors], registry.anchor_max_price[anchors])
+        return X, y
 
-        # Save the trained model
+    def _train_random_forest_model(self):
+        """Train a Random Forest on synthetic NYC commercial data and promote it in the model registry"""
+        print("🏢 Training Random Forest model with NYC commercial data...")
         try:
-            model_data = {
-                'model': self.random_forest_model,
-                'scaler': self.scaler
-            }
-            with open('nyc_commercial_rf_model.pkl', 'wb') as f:
-                pickle.dump(model_data, f)
-            print("💾 Model saved successfully")
+            version, manifest = train_model_version(self, self.model_registry, promote=True)
+            forest, scaler_mean, scaler_scale, _ = self.model_registry.load(version)
+            self._install_model(forest, scaler_mean, scaler_scale, version)
+            print(f"💾 Model {version} saved to {self.model_registry.root}/ (holdout R² {manifest['metrics']['r2']})")
         except Exception as e:
+            # Still serve a model even if the registry is not writable
             print(f"⚠️ Could not save model: {e}")
+            X, y = self.synthesize_training_data()
+            self.random_forest_model, self.scaler, _ = fit_random_forest(X, y)
+            self._compile_model()
 
         print("✅ Random Forest model trained successfully")
 
     def _calculate_enhanced_water_proximity(self, lat, lng):
         """Calculate weighted proximity to water features"""
-        total_score = 0
-        for water_body in self.enhanced_water_bodies:
-            distance = self.calculate_distance(lat, lng, water_body['lat'], water_body['lng'])
-            weight = water_body.get('weight', 1.0)
-            score = weight / (1 + distance)
-            total_score += score
-        return total_score
+        return float(self._water_proximity_scores(lat, lng)[0])
 
     def _calculate_enhanced_transit_accessibility(self, lat, lng):
         """Calculate comprehensive transit accessibility score (0-10 scale)"""
-        total_score = 0
+        return float(self._transit_accessibility_scores(lat, lng)[0])
+
+    def _calculate_business_district_premium(self, lat, lng):
+        """Calculate premium for being in established business districts"""
+        return float(self._business_district_premiums(lat, lng)[0])
+
+    def _landmark_distances(self, lats, lngs, landmarks):
+        """Miles from each point (rows) to each landmark (columns)"""
+        lats = np.asarray(lats, dtype=np.float64).reshape(-1, 1)
+        lngs = np.asarray(lngs, dtype=np.float64).reshape(-1, 1)
+        landmark_lats = np.array([landmark['lat'] for landmark in landmarks])
+        landmark_lngs = np.array([landmark['lng'] for landmark in landmarks])
+        return _haversine_miles(lats, lngs, landmark_lats, landmark_lngs)
+
+    def _water_proximity_scores(self, lats, lngs):
+        """Weighted water proximity for arrays of points"""
+        distances = self._landmark_distances(lats, lngs, self.enhanced_water_bodies)
+        weights = np.array([water_body.get('weight', 1.0) for water_body in self.enhanced_water_bodies])
+        return (weights / (1 + distances)).sum(axis=1)
+
+    def _transit_accessibility_scores(self, lats, lngs):
+        """Transit accessibility (0-10 scale) for arrays of points"""
         hub_type_bonuses = {
             'major_hub': 2.0, 'transit_center': 1.5, 'financial_center': 1.8
         }
+        distances = self._landmark_distances(lats, lngs, self.enhanced_transit_hubs)
+        weights = np.array([hub.get('weight', 1.0) * hub_type_bonuses.get(hub.get('type', 'transit_center'), 1.0)
+                            for hub in self.enhanced_transit_hubs])
 
-        for hub in self.enhanced_transit_hubs:
-            distance = self.calculate_distance(lat, lng, hub['lat'], hub['lng'])
-            weight = hub.get('weight', 1.0)
-            hub_type = hub.get('type', 'transit_center')
-            type_bonus = hub_type_bonuses.get(hub_type, 1.0)
-
-            if distance <= 0.5:
-                score = weight * type_bonus * 3.0
-            elif distance <= 1.0:
-                score = weight * type_bonus * 2.0
-            elif distance <= 2.0:
-                score = weight * type_bonus * 1.0
-            else:
-                score = weight * type_bonus / (1 + distance)
-
-            total_score += score
+        # Full credit in steps out to 2 miles, then decaying with distance
+        step = np.select([distances <= 0.5, distances <= 1.0], [3.0, 2.0], 1.0)
+        scores = np.where(distances <= 2.0, weights * step, weights / (1 + distances))
+        total_score = scores.sum(axis=1)
 
         # Normalize to 0-10 scale using sigmoid-like function
         # This ensures scores approach but never exceed 10
         normalized_score = 10 * (1 - 1 / (1 + total_score / 15))
-        return min(normalized_score, 10.0)
-
-    def _calculate_business_district_premium(self, lat, lng):
-        """Calculate premium for being in established business districts"""
-        max_premium = 1.0
-        for district in self.business_districts:
-            distance = self.calculate_distance(lat, lng, district['lat'], district['lng'])
-            if distance <= 0.5:
-                premium_factor = district['premium']
-            elif distance <= 1.0:
-                premium_factor = 1.0 + (district['premium'] - 1.0) * 0.7
-            elif distance <= 2.0:
-                premium_factor = 1.0 + (district['premium'] - 1.0) * 0.3
-            else:
-                premium_factor = 1.0
-            max_premium = max(max_premium, premium_factor)
-        return max_premium
+        return np.minimum(normalized_score, 10.0)
+
+    def _business_district_premiums(self, lats, lngs):
+        """Best business district premium for arrays of points"""
+        distances = self._landmark_distances(lats, lngs, self.business_districts)
+        premiums = np.array([district['premium'] for district in self.business_districts])
+        premium_factors = np.select(
+            [distances <= 0.5, distances <= 1.0, distances <= 2.0],
+            [np.broadcast_to(premiums, distances.shape), 1.0 + (premiums - 1.0) * 0.7, 1.0 + (premiums - 1.0) * 0.3],
+            1.0)
+        return np.maximum(premium_factors.max(axis=1), 1.0)
+
+    def feature_matrix(self, lats, lngs):
+        """Neighborhood ids and the model's 8 features for arrays of coordinates"""
+        ids = self.registry.locate(lats, lngs)
+        registry = self.registry
+        features = np.column_stack([
+            self._water_proximity_scores(lats, lngs),
+            self._transit_accessibility_scores(lats, lngs),
+            self._business_district_premiums(lats, lngs),
+            registry.crime_sentiment[ids],
+            registry.base_safety[ids],
+            3500 * registry.sqft_multiplier[ids],  # Base 3500 sqft adjusted by location
+            registry.building_age[ids],
+            registry.commercial_appeal[ids]
+        ])
+        return ids, features
 
     def geocode_address(self, address, borough=None):
         """Convert address to coordinates using cached real geocoding services"""
@@ -592,238 +1239,1146 @@ class NYCRealEstatePricePredictor:
 
     def find_neighborhood(self, lat, lng):
         """Find neighborhood based on coordinates"""
-        for neighborhood in self.neighborhoods:
-            bounds = neighborhood["bounds"]
-            if (bounds["minLat"] <= lat <= bounds["maxLat"] and
-                bounds["minLng"] <= lng <= bounds["maxLng"]):
-                return neighborhood
-
-        # Find closest neighborhood if not in bounds
-        closest = self.neighborhoods[0]
-        min_dist = float('inf')
-
-        for neighborhood in self.neighborhoods:
-            bounds = neighborhood["bounds"]
-            center_lat = (bounds["minLat"] + bounds["maxLat"]) / 2
-            center_lng = (bounds["minLng"] + bounds["maxLng"]) / 2
-            dist = self.calculate_distance(lat, lng, center_lat, center_lng)
-            if dist < min_dist:
-                min_dist = dist
-                closest = neighborhood
-
-        return closest
+        return self.registry.profile(self.registry.locate([lat], [lng])[0])
+
+    def _feature_fingerprint(self):
+        """Hash of everything a stored feature vector depends on besides the geocode"""
+        inputs = {
+            'schema': FEATURE_SCHEMA_VERSION,
+            'water_bodies': self.enhanced_water_bodies,
+            'transit_hubs': self.enhanced_transit_hubs,
+            'business_districts': self.business_districts,
+            'neighborhoods': self.registry.fingerprint
+        }
+        return hashlib.sha1(json.dumps(inputs, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _load_feature_store(self):
+        """Load stored feature vectors, dropping them if the landmark or neighborhood tables changed"""
+        try:
+            if os.path.exists(self.feature_store_file):
+                with open(self.feature_store_file, 'r') as f:
+                    store = json.load(f)
+                if store.get('fingerprint') == self._feature_fingerprint():
+                    print(f"📋 Loaded {len(store['entries'])} stored feature vectors")
+                    return store['entries']
+                print("🔄 Landmark or neighborhood data changed, rebuilding feature store")
+        except Exception as e:
+            print(f"⚠️ Could not load feature store: {e}")
+        return {}
+
+    def save_feature_store(self):
+        """Persist the feature store if anything was added since the last save"""
+        with self._feature_store_lock:
+            if not self._feature_store_dirty:
+                return
+            store = {'fingerprint': self._feature_fingerprint(), 'entries': dict(self.feature_store)}
+            self._feature_store_dirty = False
+        try:
+            _atomic_write_json(self.feature_store_file, store)
+            print(f"💾 Saved {len(store['entries'])} feature vectors to feature store")
+        except Exception as e:
+            print(f"⚠️ Could not save feature store: {e}")
+
+    def address_features(self, address, borough=None):
+        """Model features for one address, see address_feature_entries"""
+        return self.address_feature_entries([(address, borough)])[0]
+
+    def address_feature_entries(self, properties):
+        """Feature store entries for (address, borough) pairs.
+
+        Entries come from the feature store while an address still geocodes to the
+        coordinates they were computed from; the rest are featurized in one batch.
+        """
+        entries = [None] * len(properties)
+        missing = []
+        for i, (address, borough) in enumerate(properties):
+            coords = self.geocode_address(address, borough)
+            key = f"{self._normalize_nyc_address(address or '')}|{borough or ''}"
+            location = [coords["lat"], coords["lng"]]
+            entry = self.feature_store.get(key)
+            if entry is not None and entry['coords'] == location:
+                entries[i] = entry
+            else:
+                missing.append((i, key, location))
+
+        if missing:
+            locations = np.array([location for _, _, location in missing])
+            ids, features = self.feature_matrix(locations[:, 0], locations[:, 1])
+            with self._feature_store_lock:
+                for (i, key, location), nid, row in zip(missing, ids, features.tolist()):
+                    entries[i] = self.feature_store[key] = {
+                        'coords': location,
+                        'neighborhood': self.registry.names[nid],
+                        'borough': self.registry.boroughs[nid],
+                        'features': row
+                    }
+                self._feature_store_dirty = True
+        return entries
 
     def predict_real_estate_value(self, address, borough=None):
         """Predict real estate value using Random Forest model"""
+        return self.predict_real_estate_values([(address, borough)])[0]
+
+    def predict_real_estate_values(self, properties):
+        """Predict real estate values for (address, borough) pairs with one model call"""
+        if not properties:
+            return []
         try:
-            # Get coordinates and neighborhood
-            coords = self.geocode_address(address, borough)
-            neighborhood = self.find_neighborhood(coords["lat"], coords["lng"])
-
-            # Calculate features for Random Forest
-            water_score = self._calculate_enhanced_water_proximity(coords["lat"], coords["lng"])
-            transit_score = self._calculate_enhanced_transit_accessibility(coords["lat"], coords["lng"])
-            business_premium = self._calculate_business_district_premium(coords["lat"], coords["lng"])
-
-            # Neighborhood-specific calculations
-            neighborhood_name = neighborhood["name"] if neighborhood else "Unknown"
-
-            # Crime sentiment and safety based on neighborhood (exact Colab values)
-            neighborhood_safety_scores = {
-                "Financial District": 0.15, "Tribeca": 0.25, "SoHo": 0.2, "West Village": 0.18,
-                "East Village": -0.05, "Chelsea": 0.1, "Midtown West": 0.05, "Midtown East": 0.08,
-                "Upper East Side": 0.2, "Upper West Side": 0.15, "Harlem": -0.15,
-                "DUMBO": 0.12, "Brooklyn Heights": 0.18, "Park Slope": 0.15, "Williamsburg": 0.05,
-                "Long Island City": 0.08, "Astoria": 0.1, "Forest Hills": 0.12, "Riverdale": 0.2,
-                "South Bronx": -0.25, "St. George": 0.1
-            }
-            crime_sentiment = neighborhood_safety_scores.get(neighborhood_name, 0.0)
-
-            neighborhood_base_safety = {
-                "Financial District": 7.5, "Tribeca": 8.2, "SoHo": 8.0, "West Village": 7.8,
-                "East Village": 6.5, "Chelsea": 7.3, "Midtown West": 7.0, "Midtown East": 7.2,
-                "Upper East Side": 8.0, "Upper West Side": 7.7, "Harlem": 5.5,
-                "DUMBO": 7.5, "Brooklyn Heights": 7.8, "Park Slope": 7.6, "Williamsburg": 6.8,
-                "Long Island City": 7.0, "Astoria": 7.2, "Forest Hills": 7.5, "Riverdale": 8.0,
-                "South Bronx": 4.5, "St. George": 6.8
-            }
-            safety_score = neighborhood_base_safety.get(neighborhood_name, 7.0)
-
-            # Location-specific building characteristics (exact Colab values)
-            neighborhood_sqft_multiplier = {
-                "Tribeca": 1.3, "SoHo": 1.25, "West Village": 1.15, "East Village": 0.9,
-                "Chelsea": 1.1, "Midtown West": 0.95, "Midtown East": 1.0,
-                "Upper East Side": 1.05, "Upper West Side": 1.0, "Financial District": 1.2,
-                "DUMBO": 1.15, "Brooklyn Heights": 1.1, "Park Slope": 1.05, "Williamsburg": 1.0,
-                "Long Island City": 0.95, "Astoria": 0.85, "Forest Hills": 0.8
-            }
-            sqft_multiplier = neighborhood_sqft_multiplier.get(neighborhood_name, 1.0)
-            estimated_sqft = 3500 * sqft_multiplier  # Base 3500 sqft adjusted by location
-
-            neighborhood_age_map = {
-                "Financial District": 25, "Tribeca": 35, "SoHo": 30, "West Village": 40,
-                "East Village": 35, "Chelsea": 25, "Midtown West": 20, "Midtown East": 25,
-                "Upper East Side": 30, "Upper West Side": 35, "Harlem": 45,
-                "DUMBO": 15, "Brooklyn Heights": 40, "Park Slope": 35, "Williamsburg": 20,
-                "Long Island City": 15, "Astoria": 30, "Forest Hills": 25
-            }
-            building_age = neighborhood_age_map.get(neighborhood_name, 30)
-
-            commercial_appeal_map = {
-                "Financial District": 1.25, "Tribeca": 1.3, "SoHo": 1.35, "West Village": 1.2,
-                "East Village": 1.1, "Chelsea": 1.15, "Midtown West": 1.1, "Midtown East": 1.15,
-                "Upper East Side": 1.1, "Upper West Side": 1.05, "Harlem": 0.95,
-                "DUMBO": 1.2, "Brooklyn Heights": 1.15, "Park Slope": 1.1, "Williamsburg": 1.15,
-                "Long Island City": 1.05, "Astoria": 1.0, "Forest Hills": 0.95
-            }
-            type_premium = commercial_appeal_map.get(neighborhood_name, 1.0)
-
-            # Prepare features for prediction
-            features = np.array([[
-                water_score,
-                transit_score,
-                business_premium,
-                crime_sentiment,
-                safety_score,
-                estimated_sqft,
-                building_age,
-                type_premium
-            ]])
+            entries = self.address_feature_entries(properties)
+            features = np.array([entry['features'] for entry in entries])
+            ids = np.array([self.registry.ids[entry['neighborhood']] for entry in entries])
+
+            # One consistent model for the whole batch, even if a new version is promoted meanwhile
+            self.reload_model_if_promoted()
+            with self._model_lock:
+                forest, scaler_mean, scaler_scale = self.forest, self.scaler_mean, self.scaler_scale
+                prediction_memo = self.prediction_memo
 
             # Scale features and predict
-            features_scaled = self.scaler.transform(features)
-            predicted_price = self.random_forest_model.predict(features_scaled)[0]
+            features_scaled = (features - scaler_mean) / scaler_scale
+            if prediction_memo is not None:
+                outputs = prediction_memo.predict(features_scaled, forest.predict_with_spread)
+            else:
+                outputs = forest.predict_with_spread(features_scaled)
+            predicted_prices, spreads = outputs[:, 0], outputs[:, 1]
 
-            # Apply neighborhood-specific bounds like Colab
-            neighborhood_price_ranges = {
-                "Financial District": (150, 800), "Tribeca": (200, 1000), "SoHo": (180, 900),
-                "West Village": (160, 750), "East Village": (120, 500), "Chelsea": (400, 800),
-                "Midtown West": (130, 600), "Midtown East": (140, 650), "Upper East Side": (120, 550),
-                "Upper West Side": (110, 500), "Harlem": (80, 350),
-                "DUMBO": (130, 600), "Brooklyn Heights": (120, 550), "Park Slope": (110, 450),
-                "Williamsburg": (120, 500), "Long Island City": (100, 400), "Astoria": (90, 350),
-                "Forest Hills": (85, 300), "Riverdale": (70, 280), "South Bronx": (60, 200),
-                "St. George": (65, 220)
-            }
-            min_price, max_price = neighborhood_price_ranges.get(neighborhood_name, (80, 500))
-            predicted_price = max(min_price, min(max_price, predicted_price))
-            total_value = predicted_price * estimated_sqft
+            # Confidence is the share of the prediction the trees agree on
+            confidences = np.clip(np.round(100 * (1 - spreads / np.maximum(predicted_prices, 1.0))), 0, 100)
 
-            return {
-                'price_per_sqft': round(predicted_price),
-                'estimated_sqft': round(estimated_sqft),
-                'total_value': round(total_value),
-                'neighborhood': neighborhood_name,
-                'borough': neighborhood.get("borough", borough or "Unknown"),
-                'water_score': round(water_score, 2),
-                'transit_score': round(transit_score, 1),
-                'business_premium': round(business_premium, 2),
-                'safety_score': round(safety_score, 1),
-                'ml_confidence': random.randint(85, 98)
-            }
+            # Apply neighborhood-specific bounds like Colab
+            predicted_prices = np.clip(predicted_prices, self.registry.min_price[ids], self.registry.max_price[ids])
+            total_values = predicted_prices * features[:, 5]
 
         except Exception as e:
             print(f"Error in real estate prediction: {e}")
-            return {
+            return [{
                 'price_per_sqft': 300,
                 'estimated_sqft': 3000,
                 'total_value': 900000,
                 'neighborhood': 'Unknown',
                 'borough': borough or 'Unknown',
                 'ml_confidence': 75
-            }
+            } for _, borough in properties]
 
-class RestaurantScraper:
-    def __init__(self, lazy_init=False):
-        self.api_base_url = "https://data.cityofnewyork.us/resource/43nn-pn8j.json"
-        self.hmc_url = "https://data.cityofnewyork.us/resource/wvxf-dwi5.json"
+        results = []
+        for entry, predicted_price, total_value, confidence in zip(entries, predicted_prices.tolist(),
+                                                                   total_values.tolist(), confidences.tolist()):
+            water_score, transit_score, business_premium, _, safety_score, estimated_sqft, _, _ = entry['features']
+            results.append({
+                'price_per_sqft': round(predicted_price),
+                'estimated_sqft': round(estimated_sqft),
+                'total_value': round(total_value),
+                'neighborhood': entry['neighborhood'],
+                'borough': entry['borough'],
+                'water_score': round(water_score, 2),
+                'transit_score': round(transit_score, 1),
+                'business_premium': round(business_premium, 2),
+                'safety_score': round(safety_score, 1),
+                'ml_confidence': int(confidence)
+            })
+        return results
 
-        # Only initialize heavy ML model if not in lazy mode
-        if not lazy_init:
-            self.re_predictor = NYCRealEstatePricePredictor()
-        else:
-            self.re_predictor = None  # Initialize later if needed
+class _TextColumn:
+    """Strings packed into a single UTF-8 buffer plus an offsets array"""
+
+    __slots__ = ('_buffer', '_offsets')
+
+    def __init__(self, strings):
+        encoded = [string.encode('utf-8') for string in strings]
+        self._offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(chunk) for chunk in encoded], out=self._offsets[1:])
+        self._buffer = b''.join(encoded)
+
+    @property
+    def nbytes(self):
+        return len(self._buffer) + self._offsets.nbytes
+
+    def take(self, positions):
+        """Decoded strings at positions"""
+        buffer = self._buffer
+        starts = self._offsets[positions].tolist()
+        ends = self._offsets[np.asarray(positions) + 1].tolist()
+        return [buffer[start:end].decode('utf-8') for start, end in zip(starts, ends)]
+
+class OpportunityColumns:
+    """Columnar storage for a list of opportunity records.
+
+    Numeric fields are NumPy arrays, the repeated strings (neighborhood,
+    borough, violation type, owner) are dictionary-encoded, violation dates
+    are day ordinals and the remaining text is packed into UTF-8 buffers.
+    Dicts are only rebuilt by records(), when a response is serialized.
+
+    Records that don't have exactly the _build_opportunity layout are kept as
+    dicts and returned unchanged, so the store is lossless for any input.
+    """
+
+    __slots__ = ('_count', '_numeric', '_int_masks', '_codes', '_categories', '_text', '_dates', '_irregular')
+
+    def __init__(self, opportunities, date_ordinals):
+        """date_ordinals[i] is the parsed violationDate of opportunities[i], 0 if it has none"""
+        self._count = len(opportunities)
+        self._dates = np.asarray(date_ordinals, dtype=np.int32)
+        self._irregular = {}
+
+        # Transpose into one tuple per field; irregular records still fill every
+        # column so the query index covers them
+        get_fields = operator.itemgetter(*OPPORTUNITY_FIELDS)
+        rows = []
+        for position, opp in enumerate(opportunities):
+            if self._has_standard_layout(opp, date_ordinals[position]):
+                rows.append(get_fields(opp))
+            else:
+                self._irregular[position] = opp
+                rows.append(tuple(opp.get(field) for field in OPPORTUNITY_FIELDS))
+        fields = dict(zip(OPPORTUNITY_FIELDS, zip(*rows))) if rows else dict.fromkeys(OPPORTUNITY_FIELDS, ())
+
+        self._numeric = {}
+        self._int_masks = {}
+        for field in NUMERIC_FIELDS:
+            values = self._checked(opportunities, fields[field], (int, float), 0)
+            kinds = set(map(type, values))
+            if kinds <= {int}:
+                column = np.array(values, dtype=np.int64)
+                if not len(column) or (column.min() >= -2**31 and column.max() < 2**31):
+                    column = column.astype(np.int32)
+                self._numeric[field] = column
+            else:
+                self._numeric[field] = np.array(values, dtype=np.float64)
+                if int in kinds:
+                    # Mixed column - remember which values were ints so JSON output is unchanged
+                    self._int_masks[field] = np.array([type(value) is int for value in values], dtype=bool)
+
+        self._codes = {}
+        self._categories = {}
+        for field in CATEGORICAL_FIELDS:
+            codes = {}
+            values = self._checked(opportunities, fields[field], (str,), '')
+            self._codes[field] = np.array([codes.setdefault(value, len(codes)) for value in values], dtype=np.int32)
+            self._categories[field] = list(codes)
+
+        self._text = {
+            field: _TextColumn(self._checked(opportunities, fields[field], (str,), ''))
+            for field in TEXT_FIELDS
+        }
 
-        # Caching system
-        self.cache_file = 'violations_cache.json'
-        self.owner_cache_file = 'owner_lookup_cache.json'
-        self.cache_expiry_hours = 24  # Cache is valid for 24 hours (updated by scheduler)
-        self.owner_cache_expiry_days = 30  # Refresh owner lookups after 30 days
-        self.cached_data = self._load_cache()
-        self.owner_cache = self._load_owner_cache()
+    @staticmethod
+    def _has_standard_layout(opp, date_ordinal):
+        """Whether a record has exactly the _build_opportunity keys and a YYYY-MM-DD date"""
+        if tuple(opp) != OPPORTUNITY_FIELDS:
+            return False
+        violation_date = opp['violationDate']
+        # fromisoformat also accepts other spellings, only YYYY-MM-DD is rebuilt from the ordinal
+        return bool(date_ordinal) and len(violation_date) == 10 and violation_date[4] == '-' and violation_date[7] == '-'
+
+    def _checked(self, opportunities, values, types, default):
+        """values with anything not of types replaced by default, marking those records irregular"""
+        if set(map(type, values)) <= set(types):
+            return values
+        checked = []
+        for position, value in enumerate(values):
+            if type(value) not in types:
+                self._irregular.setdefault(position, opportunities[position])
+                value = default
+            checked.append(value)
+        return checked
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def dates(self):
+        return self._dates
+
+    @property
+    def nbytes(self):
+        """Approximate resident size of the columns, excluding irregular records"""
+        return (self._dates.nbytes +
+                sum(column.nbytes for column in self._numeric.values()) +
+                sum(mask.nbytes for mask in self._int_masks.values()) +
+                sum(codes.nbytes for codes in self._codes.values()) +
+                sum(column.nbytes for column in self._text.values()))
+
+    def numeric(self, field):
+        return self._numeric[field]
+
+    def codes(self, field):
+        return self._codes[field]
+
+    def categories(self, field):
+        return self._categories[field]
+
+    def text(self, field, positions):
+        return self._text[field].take(positions)
+
+    def _values(self, field, positions):
+        """Python values of one field at positions"""
+        if field in self._numeric:
+            values = self._numeric[field][positions].tolist()
+            if field in self._int_masks:
+                values = [int(value) if is_int else value
+                          for value, is_int in zip(values, self._int_masks[field][positions].tolist())]
+            return values
+        if field in self._codes:
+            names = self._categories[field]
+            return [names[code] for code in self._codes[field][positions].tolist()]
+        if field == 'violationDate':
+            ordinals, inverse = np.unique(self._dates[positions], return_inverse=True)
+            dates = [datetime.fromordinal(ordinal).strftime('%Y-%m-%d') if ordinal else ''
+                     for ordinal in ordinals.tolist()]
+            return [dates[index] for index in inverse.tolist()]
+        return self._text[field].take(positions)
+
+    def records(self, positions):
+        """Opportunity dicts for positions, in order"""
+        positions = np.asarray(positions, dtype=np.int64)
+        columns = [self._values(field, positions) for field in OPPORTUNITY_FIELDS]
+        records = [dict(zip(OPPORTUNITY_FIELDS, values)) for values in zip(*columns)]
+        if self._irregular:
+            for index, position in enumerate(positions.tolist()):
+                if position in self._irregular:
+                    records[index] = self._irregular[position]
+        return records
+
+class OpportunitySnapshot:
+    """Immutable view of the opportunities produced by one completed refresh.
+
+    A snapshot is fully built before it is published, and publishing is a single
+    reference assignment, so request threads either see the previous snapshot or
+    the new one - never a half-built list. Records are held in an
+    OpportunityColumns store rather than as dicts.
+    """
+
+    __slots__ = ('_store', '_version', '_generated_at', '_date_keys', '_columns', '_categories',
+                 '_sort_orders', '_borough_masks', '_id_order', '_changelog', '_pinned', '_indexes', '_encoded', '_encode_lock',
+                 '_leading', '_leading_lock')
+
+    def __init__(self, opportunities, version, generated_at, previous=None):
+        """previous is the snapshot this one replaces, used to extend the changelog"""
+        # Dicts for the records of the longest precomputed window, built on first read
+        object.__setattr__(self, '_leading', None)
+        object.__setattr__(self, '_leading_lock', threading.Lock())
+        self._build_date_index(opportunities)
+        self._build_query_index()
+        object.__setattr__(self, '_version', version)
+        object.__setattr__(self, '_generated_at', generated_at)
+        object.__setattr__(self, '_changelog', self._build_changelog(previous))
+        # Results for the precomputed windows, never evicted, then LRUs for indexes and for
+        # encoded bodies of other windows, so neither can push out the other
+        object.__setattr__(self, '_pinned', {})
+        object.__setattr__(self, '_indexes', OrderedDict())
+        object.__setattr__(self, '_encoded', OrderedDict())
+        object.__setattr__(self, '_encode_lock', threading.Lock())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("OpportunitySnapshot is immutable")
+
+    @property
+    def opportunities(self):
+        """Every record, newest first with undated records last"""
+        return tuple(self._leading_records(len(self._store)))
+
+    @property
+    def store(self):
+        return self._store
+
+    @property
+    def version(self):
+        return self._version
+
+    @property
+    def generated_at(self):
+        return self._generated_at
+
+    def __len__(self):
+        return len(self._store)
+
+    def _build_date_index(self, opportunities):
+        """Store opportunities newest first with a parallel ascending key array.
+
+        Dates are parsed once here; _date_keys holds negated ordinals so a window
+        query is a single binary search. The sort is stable, so records on the
+        same day keep their original (API) order. Records without a usable date
+        are stored after every dated one and left out of every window, as before.
+        """
+        dated = []
+        undated = []
+        for opp in opportunities:
+            violation_date_str = opp.get('violationDate', '')
+            if violation_date_str:
+                try:
+                    dated.append((-datetime.fromisoformat(violation_date_str).toordinal(), opp))
+                    continue
+                except:
+                    pass
+            undated.append(opp)
+
+        dated.sort(key=lambda item: item[0])
+        date_keys = np.array([key for key, _ in dated], dtype=np.int32)
+        store = OpportunityColumns([opp for _, opp in dated] + undated,
+                                   np.concatenate([-date_keys, np.zeros(len(undated), dtype=np.int32)]))
+        object.__setattr__(self, '_date_keys', date_keys)
+        object.__setattr__(self, '_store', store)
+
+    def _build_query_index(self):
+        """Precompute per-snapshot columns, sort permutations and borough bitsets.
+
+        Everything is indexed by position in the store, so a days window is the
+        position range [0, window_end) and filters become boolean masks. Columns
+        are shared with the store wherever the dtype allows.
+        """
+        store = self._store
+        count = len(store)
+        columns = {
+            'value': store.numeric('totalValue').astype(np.float64, copy=False),
+            'confidence': store.numeric('mlConfidence').astype(np.float64, copy=False),
+            'date': store.dates,
+            'position': np.arange(count, dtype=np.int32),
+            'borough': store.codes('borough'),
+            'neighborhood': store.codes('neighborhood'),
+            'violation_type': store.codes('violationType')
+        }
+        categories = {
+            'borough': store.categories('borough'),
+            'neighborhood': store.categories('neighborhood'),
+            'violation_type': store.categories('violationType')
+        }
 
-        # Clean up expired cache entries on startup
-        self._cleanup_expired_cache()
+        names = np.array([name.lower() for name in store.text('name', columns['position'])], dtype=object)
+        name_order = np.argsort(names, kind='stable').astype(np.int32)
+        sort_orders = {
+            'value_desc': np.argsort(-columns['value'], kind='stable').astype(np.int32),
+            'value_asc': np.argsort(columns['value'], kind='stable').astype(np.int32),
+            'name_asc': name_order,
+            'name_desc': name_order[::-1],
+            'date_desc': columns['position'],
+            'date_asc': np.argsort(columns['date'], kind='stable').astype(np.int32)
+        }
 
-        # Set global instance for cleanup (only if predictor exists)
-        global predictor_instance
-        if self.re_predictor:
-            predictor_instance = self.re_predictor
+        borough_masks = {}
+        for code, borough in enumerate(categories['borough']):
+            key = borough.strip().lower()
+            mask = columns['borough'] == code
+            borough_masks[key] = borough_masks[key] | mask if key in borough_masks else mask
+
+        object.__setattr__(self, '_columns', columns)
+        object.__setattr__(self, '_categories', categories)
+        object.__setattr__(self, '_sort_orders', sort_orders)
+        object.__setattr__(self, '_borough_masks', borough_masks)
+        object.__setattr__(self, '_id_order', np.argsort(store.numeric('id'), kind='stable').astype(np.int32))
+
+    def positions_for_ids(self, ids):
+        """Store positions of opportunity ids, -1 for ids not in this snapshot"""
+        ids = np.asarray(ids, dtype=np.int64)
+        if not len(self._id_order):
+            return np.full(len(ids), -1, dtype=np.int64)
+
+        sorted_ids = self._store.numeric('id')[self._id_order]
+        index = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+        return np.where(sorted_ids[index] == ids, self._id_order[index], -1)
+
+    def _build_changelog(self, previous):
+        """The previous snapshot's changelog plus the delta from it to this snapshot.
+
+        Records are matched by their stable id; a record is changed when any
+        field differs. Only the last CHANGELOG_VERSIONS deltas are kept.
+        """
+        if previous is None or previous.version >= self._version:
+            return ()
+
+        old_ids = previous.store.numeric('id')
+        new_ids = self._store.numeric('id')
+        common = np.intersect1d(old_ids, new_ids)
+        old_records = previous.records(previous.positions_for_ids(common))
+        new_records = self.records(self.positions_for_ids(common))
+        changed = np.array([old != new for old, new in zip(old_records, new_records)], dtype=bool)
+
+        changed_ids = common[changed] if len(common) else common
+        removed_ids = np.setdiff1d(old_ids, new_ids)
+        # Dates in the previous version tell delta() which window each record was in
+        old_dates = previous.store.dates
+        delta = SnapshotDelta(previous.version, self._version,
+                              added=np.setdiff1d(new_ids, old_ids),
+                              changed=changed_ids,
+                              removed=removed_ids,
+                              changed_dates=old_dates[previous.positions_for_ids(changed_ids)],
+                              removed_dates=old_dates[previous.positions_for_ids(removed_ids)],
+                              from_generated_at=previous.generated_at)
+        return (previous._changelog + (delta,))[-CHANGELOG_VERSIONS:]
+
+    def delta(self, since, days_back=30):
+        """Records added, changed and removed since an earlier version.
+
+        Deltas from the changelog are combined, so a record added and then
+        changed is reported once as added. Records are classified by the
+        days_back window: added holds records now in it that were not in it at
+        since (new, or edited to a newer date), changed those in it both times,
+        and removed those in it at since that are not any more: deleted, edited
+        to an older date, or aged past the cutoff since version since was
+        generated.
+        If the changelog doesn't reach back to since, the response is a full
+        resync: every record in the window as added, with full set.
+        """
+        deltas = [delta for delta in self._changelog if delta.from_version >= since]
+        covered = since == self._version or (
+            deltas and deltas[0].from_version == since and
+            all(a.to_version == b.from_version for a, b in zip(deltas, deltas[1:]))
+        )
 
-    def _ensure_predictor_loaded(self):
-        """Load the price predictor if not already loaded (lazy loading)"""
-        if self.re_predictor is None:
-            print("🔄 Loading price predictor for processing...")
-            self.re_predictor = NYCRealEstatePricePredictor()
-            global predictor_instance
-            predictor_instance = self.re_predictor
+        payload = {
+            'success': True,
+            'since': since,
+            'version': self._version,
+            'generated_at': self._generated_at,
+            'days': days_back,
+            'full': not covered
+        }
+        if not covered:
+            payload.update(added=self.get_opportunities(days_back), changed=[], removed=[])
+            payload['message'] = f'Version {since} is no longer in the changelog, sending all {len(payload["added"])} opportunities'
+            return payload
 
-    def _load_cache(self):
-        """Load cached violation data"""
         try:
-            if os.path.exists(self.cache_file):
-                with open(self.cache_file, 'r') as f:
-                    cache = json.load(f)
-                    cache_time = datetime.fromisoformat(cache.get('timestamp', '2000-01-01T00:00:00'))
+            since_time = datetime.fromisoformat(deltas[0].from_generated_at if deltas else self._generated_at)
+        except (TypeError, ValueError):
+            since_time = None
+
+        # First delta each id appears in gives its date at version since, or None if it didn't exist yet
+        seen = {}
+        for delta in deltas:
+            for opp_id in delta.added.tolist():
+                seen.setdefault(opp_id, None)
+            for ids, dates in ((delta.changed, delta.changed_dates), (delta.removed, delta.removed_dates)):
+                for opp_id, ordinal in zip(ids.tolist(), dates.tolist()):
+                    seen.setdefault(opp_id, ordinal)
+
+        ids = np.array(list(seen), dtype=np.int64)
+        dates_then = np.array([ordinal or 0 for ordinal in seen.values()], dtype=np.int64)
+        in_window_then = dates_then >= _window_min_ordinal(days_back, since_time)
+        positions = self.positions_for_ids(ids)
+        window_end = self._window_end(days_back)
+        in_window = (positions >= 0) & (positions < window_end)
+
+        # Unchanged records also leave the window as their dates pass its cutoff
+        aged_out = np.empty(0, dtype=np.int64)
+        if since_time is not None:
+            then = self._columns['position'][window_end:self._window_end(days_back, since_time)]
+            aged_out = np.setdiff1d(self._store.numeric('id')[then], ids)
+
+        # Records are new to the client unless they were in its window at version since
+        payload.update(
+            added=self.records(np.sort(positions[in_window & ~in_window_then])),
+            changed=self.records(np.sort(positions[in_window & in_window_then])),
+            removed=ids[in_window_then & ~in_window].tolist() + aged_out.tolist()
+        )
+        payload['message'] = (f"{len(payload['added'])} added, {len(payload['changed'])} changed, "
+                              f"{len(payload['removed'])} removed since version {since}")
+        return payload
+
+    def _window_end(self, days_back, now=None):
+        """Number of leading stored records inside the last days_back days"""
+        return int(np.searchsorted(self._date_keys, -_window_min_ordinal(days_back, now), side='right'))
+
+    def get_opportunities(self, days_back=30):
+        """Opportunities whose violation date falls within the last days_back days, newest first"""
+        return self._leading_records(self._window_end(days_back))
+
+    def _leading_records(self, end):
+        """Records at store positions [0, end) - every days window is such a prefix.
+
+        Records of the longest precomputed window are built into dicts once per
+        snapshot and shared by every window read, so only records beyond it are
+        built per call. Windows only shrink as days pass, so the prefix never
+        has to be rebuilt.
+        """
+        leading = self._window_records()
+        if end <= len(leading):
+            return leading[:end]
+        return leading + self._store.records(self._columns['position'][len(leading):end])
+
+    def _window_records(self):
+        """The shared dicts for the longest precomputed window, in store order"""
+        if self._leading is None:
+            with self._leading_lock:
+                if self._leading is None:
+                    end = self._window_end(max(PRECOMPUTED_WINDOWS))
+                    object.__setattr__(self, '_leading', self._store.records(self._columns['position'][:end]))
+        return self._leading
+
+    def query(self, days_back=30, boroughs=None, min_value=None, max_value=None,
+              min_confidence=None, sort='value_desc'):
+        """Positions of matching opportunities in sort order, without re-sorting.
+
+        Filters are combined into one mask, then the precomputed permutation for
+        the sort key is masked, which keeps its order.
+        """
+        if sort not in self._sort_orders:
+            raise ValueError(f"Unknown sort '{sort}', expected one of: {', '.join(SORT_KEYS)}")
+
+        columns = self._columns
+        mask = columns['position'] < self._window_end(days_back)
+        if boroughs:
+            borough_mask = np.zeros(len(mask), dtype=bool)
+            for borough in boroughs:
+                found = self._borough_masks.get(borough.strip().lower())
+                if found is not None:
+                    borough_mask |= found
+            mask &= borough_mask
+        if min_value is not None:
+            mask &= columns['value'] >= min_value
+        if max_value is not None:
+            mask &= columns['value'] <= max_value
+        if min_confidence is not None:
+            mask &= columns['confidence'] >= min_confidence
+
+        order = self._sort_orders[sort]
+        return order[mask[order]]
+
+    def stats_for(self, positions):
+        """_calculate_stats over query positions, computed on the numeric columns"""
+        if not len(positions):
+            return {}
+
+        columns = self._columns
+        return {
+            'total_opportunities': int(len(positions)),
+            'average_value': float(columns['value'][positions].mean()),
+            'total_neighborhoods': int(len(np.unique(columns['neighborhood'][positions]))),
+            'average_confidence': float(columns['confidence'][positions].mean())
+        }
 
-                    # Check if cache is still fresh (within expiry hours)
-                    if datetime.now() - cache_time < timedelta(hours=self.cache_expiry_hours):
-                        print(f"📋 Loaded fresh cache with {len(cache.get('opportunities', []))} opportunities")
-                        return cache
-                    else:
-                        print(f"⏰ Cache expired ({self.cache_expiry_hours}h limit), will refresh")
-        except Exception as e:
-            print(f"⚠️ Could not load cache: {e}")
+    def records(self, positions):
+        """Opportunity dicts for query positions"""
+        leading = self._window_records()
+        positions = np.asarray(positions, dtype=np.int64)
+        if len(positions) and positions.max() < len(leading):
+            # Positions are the store order, which is also the order of the shared window records
+            return [leading[position] for position in positions.tolist()]
+        return self._store.records(positions)
+
+    def _memoized(self, key, build, pinned=False, index=False):
+        """Cache build() for this snapshot under key plus today's date.
+
+        Windows only depend on the current date, so every result is computed once
+        per day for the lifetime of the snapshot. Results from earlier days are
+        dropped. Pinned results (the precomputed windows) are always kept; other
+        indexes share an LRU of MAX_INDEX_WINDOWS entries and everything else one
+        of MAX_ENCODED_WINDOWS, so user-chosen keys only push out their own kind.
+        """
+        key = key + (datetime.now().date(),)
+        if pinned:
+            cache, limit = self._pinned, None
+        elif index:
+            cache, limit = self._indexes, MAX_INDEX_WINDOWS
+        else:
+            cache, limit = self._encoded, MAX_ENCODED_WINDOWS
+        encoded = cache.get(key, _NOT_ENCODED)
+        if encoded is not _NOT_ENCODED:
+            if not pinned:
+                try:
+                    cache.move_to_end(key)
+                except KeyError:
+                    pass  # Evicted by another thread meanwhile
+            return encoded
+
+        with self._encode_lock:
+            if key in cache:
+                return cache[key]
+
+            encoded = build()
+
+            # Drop windows computed on a previous day, they can never be served again
+            for store in (self._pinned, self._indexes, self._encoded):
+                for stale_key in [k for k in store if k[-1] != key[-1]]:
+                    del store[stale_key]
+            cache[key] = encoded
+            while limit is not None and len(cache) > limit:
+                cache.popitem(last=False)
+            return encoded
+
+    def encoded_response(self, days_back=30, wire_format='json'):
+        """Pre-encoded /api/opportunities body for a window, or None if the window is empty"""
+        def build():
+            opportunities = self.get_opportunities(days_back)
+            if not opportunities:
+                return None
+            payload = _wire_payload(_build_opportunities_payload(self, opportunities, days_back), wire_format)
+            return EncodedResponse.from_payload(payload, wire_format)
+
+        return self._memoized(('opportunities', days_back, wire_format), build,
+                              pinned=days_back in PRECOMPUTED_WINDOWS)
+
+    def encoded_delta(self, since, days_back=30):
+        """Pre-encoded /api/opportunities?since= body"""
+        return self._memoized(('delta', since, days_back),
+                              lambda: EncodedResponse.from_payload(self.delta(since, days_back)))
+
+    def _located(self, days_back):
+        """Positions, lats and lngs of the window's records that have usable coordinates"""
+        end = self._window_end(days_back)
+        lats = self._store.numeric('lat')[:end].astype(np.float64)
+        lngs = self._store.numeric('lng')[:end].astype(np.float64)
+        usable = (np.isfinite(lats) & np.isfinite(lngs) & (lats != 0) & (lngs != 0) &
+                  (np.abs(lats) <= MAX_MERCATOR_LAT) & (np.abs(lngs) <= 180))
+        return self._columns['position'][:end][usable], lats[usable], lngs[usable]
+
+    def cluster_index(self, days_back=30):
+        """ClusterIndex over the window's records that have usable coordinates"""
+        def build():
+            positions, lats, lngs = self._located(days_back)
+            return ClusterIndex(lats, lngs, self._columns['value'][positions], positions)
+
+        return self._memoized(('clusters', days_back), build, pinned=days_back in PRECOMPUTED_WINDOWS, index=True)
+
+    def spatial_index(self, days_back=30):
+        """SpatialIndex over the window's records that have usable coordinates"""
+        return self._memoized(('spatial', days_back), lambda: SpatialIndex(*self._located(days_back)),
+                              pinned=days_back in PRECOMPUTED_WINDOWS, index=True)
+
+    def encoded_aggregates(self, days_back=30, bin_edges=None, bin_size=HISTOGRAM_BIN_SIZE):
+        """Pre-encoded /api/aggregates body for a window and histogram binning"""
+        key = ('aggregates', days_back, tuple(bin_edges) if bin_edges else None, bin_size)
+        pinned = bin_edges is None and bin_size == HISTOGRAM_BIN_SIZE and days_back in PRECOMPUTED_WINDOWS
+        return self._memoized(key, lambda: EncodedResponse.from_payload(
+            self.aggregates(days_back, bin_edges, bin_size)), pinned=pinned)
+
+    def max_value(self, days_back=30):
+        """Largest totalValue in a window, 0 if the window is empty"""
+        end = self._window_end(days_back)
+        return float(self._columns['value'][:end].max()) if end else 0.0
+
+    def aggregates(self, days_back=30, bin_edges=None, bin_size=HISTOGRAM_BIN_SIZE):
+        """Histogram and grouped summaries for a window, computed on the numeric columns"""
+        columns = self._columns
+        end = self._window_end(days_back)
+        values = columns['value'][:end]
+
+        if bin_edges is None:
+            # Same $50K bins the dashboard used to build in the browser
+            top = max(math.ceil(self.max_value(days_back) / bin_size), 1) * bin_size
+            bin_edges = np.arange(0, top + bin_size, bin_size)
+        counts, edges = np.histogram(values, bins=np.asarray(bin_edges, dtype=np.float64))
+
+        return {
+            'success': True,
+            'version': self._version,
+            'generated_at': self._generated_at,
+            'days': days_back,
+            'stats': self.stats_for(columns['position'][:end]),
+            'value_histogram': {
+                'edges': [float(edge) for edge in edges],
+                'counts': [int(count) for count in counts]
+            },
+            'boroughs': _grouped_value_summary(columns['borough'][:end], self._categories['borough'], values),
+            'neighborhoods': _grouped_value_summary(
+                columns['neighborhood'][:end], self._categories['neighborhood'], values),
+            'violation_types': [
+                {'name': name, 'count': int(count)}
+                for name, count in zip(self._categories['violation_type'],
+                                       np.bincount(columns['violation_type'][:end],
+                                                   minlength=len(self._categories['violation_type'])))
+                if count
+            ]
+        }
 
-        return None
+    def warm(self, windows=PRECOMPUTED_WINDOWS, formats=PRECOMPUTED_FORMATS):
+        """Encode the common windows in the formats clients ask for before the snapshot starts serving"""
+        for days_back in windows:
+            for wire_format in formats:
+                self.encoded_response(days_back, wire_format)
+
+    @classmethod
+    def from_cache(cls, cache, previous=None):
+        """Build a snapshot from a violations cache dict"""
+        return cls(
+            cache.get('opportunities', []),
+            cache.get('version', 0),
+            cache.get('timestamp', ''),
+            previous
+        )
 
-    def _save_cache(self, opportunities_data):
-        """Save opportunities data to cache"""
-        try:
-            cache = {
-                'timestamp': datetime.now().isoformat(),
-                'opportunities': opportunities_data,
-                'total_count': len(opportunities_data)
-            }
-            with open(self.cache_file, 'w') as f:
-                json.dump(cache, f, indent=2)
-            print(f"💾 Cached {len(opportunities_data)} opportunities")
-        except Exception as e:
-            print(f"⚠️ Could not save cache: {e}")
+class SnapshotDelta:
+    """Ids added, changed and removed between two consecutive snapshot versions"""
+
+    __slots__ = ('from_version', 'to_version', 'from_generated_at', 'added', 'changed', 'removed',
+                 'changed_dates', 'removed_dates')
+
+    def __init__(self, from_version, to_version, added, changed, removed, changed_dates, removed_dates,
+                 from_generated_at=''):
+        """changed_dates and removed_dates are the violation date ordinals of those ids in the from-version"""
+        self.from_version = from_version
+        self.from_generated_at = from_generated_at
+        self.changed_dates = changed_dates
+        self.removed_dates = removed_dates
+        self.to_version = to_version
+        self.added = added
+        self.changed = changed
+        self.removed = removed
+
+class ClusterIndex:
+    """Hierarchical grid of map clusters, built once per snapshot window.
+
+    Every record gets Web Mercator cell coordinates at MAX_CLUSTER_LEVEL; a
+    coarser level is the same coordinates shifted right, so each level is one
+    np.unique over the records. Levels hold per-cell count, value sum,
+    centroid and one representative record position.
+    """
+
+    __slots__ = ('_levels',)
+
+    def __init__(self, lats, lngs, values, positions):
+        x, y = _mercator_cells(lats, lngs, MAX_CLUSTER_LEVEL)
+        self._levels = []
+        for level in range(MAX_CLUSTER_LEVEL + 1):
+            shift = MAX_CLUSTER_LEVEL - level
+            keys = ((x >> shift) << 32) | (y >> shift)
+            cells, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+            counts = np.bincount(inverse, minlength=len(cells))
+            self._levels.append({
+                'x': cells >> 32,
+                'y': cells & 0xFFFFFFFF,
+                'count': counts,
+                'value': np.bincount(inverse, weights=values, minlength=len(cells)),
+                'lat': np.bincount(inverse, weights=lats, minlength=len(cells)) / np.maximum(counts, 1),
+                'lng': np.bincount(inverse, weights=lngs, minlength=len(cells)) / np.maximum(counts, 1),
+                'position': positions[first]
+            })
 
-    def get_cached_opportunities(self, days_back=30):
-        """Get opportunities from cache, filtering by requested time period"""
-        if not self.cached_data:
-            return None
+    @staticmethod
+    def level_for(bbox, zoom):
+        """Cell level for a map zoom, coarsened until the bbox spans at most MAX_CLUSTER_FEATURES cells"""
+        level = min(max(zoom, 0) + CLUSTER_CELL_BITS, MAX_CLUSTER_LEVEL)
+        while level > 0:
+            (x0, y0), (x1, y1) = _bbox_cells(bbox, level)
+            if (x1 - x0 + 1) * (y1 - y0 + 1) <= MAX_CLUSTER_FEATURES:
+                break
+            level -= 1
+        return level
+
+    def query(self, bbox, level):
+        """Cells of level inside bbox as (x, y, count, value sum, lat, lng, position) arrays"""
+        cells = self._levels[level]
+        (x0, y0), (x1, y1) = _bbox_cells(bbox, level)
+        inside = (cells['x'] >= x0) & (cells['x'] <= x1) & (cells['y'] >= y0) & (cells['y'] <= y1)
+        return {name: column[inside] for name, column in cells.items()}
+
+class SpatialIndex:
+    """Radius, nearest-neighbour, bbox and polygon lookups over one snapshot window.
+
+    Radius and nearest queries use a haversine BallTree, so distances follow
+    the same great-circle convention as calculate_distance. Box queries
+    binary-search a latitude-sorted copy of the points.
+    """
+
+    __slots__ = ('_positions', '_lats', '_lngs', '_tree', '_lat_order', '_sorted_lats')
+
+    def __init__(self, positions, lats, lngs):
+        self._positions = positions
+        self._lats = lats
+        self._lngs = lngs
+        self._tree = BallTree(np.radians(np.column_stack([lats, lngs])), metric='haversine') if len(positions) else None
+        self._lat_order = np.argsort(lats, kind='stable')
+        self._sorted_lats = lats[self._lat_order]
+
+    def __len__(self):
+        return len(self._positions)
+
+    def radius(self, lat, lng, miles):
+        """(positions, distances in miles) within miles of a point, nearest first"""
+        if self._tree is None:
+            return self._positions[:0], np.zeros(0)
+        indices, distances = self._tree.query_radius(np.radians([[lat, lng]]), r=miles / EARTH_RADIUS_MILES,
+                                                     return_distance=True, sort_results=True)
+        return self._positions[indices[0]], distances[0] * EARTH_RADIUS_MILES
+
+    def nearest(self, lat, lng, k):
+        """(positions, distances in miles) of the k nearest records, nearest first"""
+        if self._tree is None:
+            return self._positions[:0], np.zeros(0)
+        distances, indices = self._tree.query(np.radians([[lat, lng]]), k=min(k, len(self._positions)))
+        return self._positions[indices[0]], distances[0] * EARTH_RADIUS_MILES
+
+    def _box(self, min_lng, min_lat, max_lng, max_lat):
+        """Indexes of points inside a lat/lng box, in snapshot (newest first) order"""
+        start = np.searchsorted(self._sorted_lats, min_lat, side='left')
+        end = np.searchsorted(self._sorted_lats, max_lat, side='right')
+        candidates = self._lat_order[start:end]
+        lngs = self._lngs[candidates]
+        return np.sort(candidates[(lngs >= min_lng) & (lngs <= max_lng)])
+
+    def bbox(self, bbox):
+        """Positions inside a (min_lng, min_lat, max_lng, max_lat) box"""
+        return self._positions[self._box(*bbox)]
+
+    def polygon(self, vertices):
+        """Positions inside a polygon of (lat, lng) vertices - ray casting over the bounding box candidates"""
+        vertices = np.asarray(vertices, dtype=np.float64)
+        candidates = self._box(vertices[:, 1].min(), vertices[:, 0].min(), vertices[:, 1].max(), vertices[:, 0].max())
+        lats = self._lats[candidates]
+        lngs = self._lngs[candidates]
+
+        inside = np.zeros(len(candidates), dtype=bool)
+        for (lat1, lng1), (lat2, lng2) in zip(vertices, np.roll(vertices, -1, axis=0)):
+            crosses = (lat1 > lats) != (lat2 > lats)
+            if lat1 != lat2:
+                inside ^= crosses & (lngs < (lng2 - lng1) * (lats - lat1) / (lat2 - lat1) + lng1)
+        return self._positions[candidates[inside]]
+
+def _mercator_cells(lats, lngs, level):
+    """Integer Web Mercator cell coordinates of points at a grid level"""
+    size = 1 << level
+    lats = np.clip(np.asarray(lats, dtype=np.float64), -MAX_MERCATOR_LAT, MAX_MERCATOR_LAT)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    x = (lngs + 180.0) / 360.0 * size
+    y = (1.0 - np.log(np.tan(np.radians(lats)) + 1.0 / np.cos(np.radians(lats))) / math.pi) / 2.0 * size
+    return (np.clip(x.astype(np.int64), 0, size - 1),
+            np.clip(y.astype(np.int64), 0, size - 1))
+
+def _bbox_cells(bbox, level):
+    """Top-left and bottom-right cells of a (min_lng, min_lat, max_lng, max_lat) box"""
+    min_lng, min_lat, max_lng, max_lat = bbox
+    x, y = _mercator_cells([max_lat, min_lat], [min_lng, max_lng], level)
+    return (int(x[0]), int(y[0])), (int(x[1]), int(y[1]))
+
+def _stable_opportunity_id(restaurant_data):
+    """Content-derived opportunity id - the same restaurant closure gets the same id on every run.
+
+    Built from the restaurant's CAMIS number and inspection date, falling back
+    to name and address, and kept under 2**53 so JavaScript reads it exactly.
+    """
+    source = restaurant_data.get('camis') or f"{restaurant_data['name']}|{restaurant_data['address']}"
+    inspection_date = (restaurant_data.get('inspection_date') or '')[:10]
+    return int(hashlib.sha1(f"{source}|{inspection_date}".encode('utf-8')).hexdigest()[:13], 16)
+
+def _window_min_ordinal(days_back, now=None):
+    """Earliest violation date ordinal inside the last days_back days (before now, if given).
+
+    A date-only violation is on or after the cutoff if it is a later day, or the
+    same day when the cutoff falls exactly on midnight.
+    """
+    cutoff_date = (now or datetime.now()) - timedelta(days=days_back)
+    min_ordinal = cutoff_date.toordinal()
+    if cutoff_date.time() != datetime.min.time():
+        min_ordinal += 1
+    return min_ordinal
+
+def _in_window(opp, min_ordinal):
+    """Whether an opportunity's violation date is on or after min_ordinal"""
+    try:
+        return datetime.fromisoformat(opp.get('violationDate', '')).toordinal() >= min_ordinal
+    except:
+        return False
 
-        all_cached_opportunities = self.cached_data.get('opportunities', [])
+class EncodedResponse:
+    """A response body serialized once and stored in every supported content-coding"""
 
-        # Filter cached data by the requested time period
-        cutoff_date = datetime.now() - timedelta(days=days_back)
-        filtered_opportunities = []
+    __slots__ = ('etag', 'bodies', 'mimetype')
 
-        for opp in all_cached_opportunities:
-            violation_date_str = opp.get('violationDate', '')
-            if violation_date_str:
-                try:
-                    violation_date = datetime.fromisoformat(violation_date_str)
-                    if violation_date >= cutoff_date:
-                        filtered_opportunities.append(opp)
-                except:
-                    continue
+    def __init__(self, body, mimetype='application/json'):
+        self.mimetype = mimetype
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.bodies = {
+            'identity': body,
+            'gzip': gzip.compress(body, compresslevel=GZIP_LEVEL)
+        }
+        if brotli is not None:
+            self.bodies['br'] = brotli.compress(body, quality=BROTLI_QUALITY)
+
+    @classmethod
+    def from_payload(cls, payload, wire_format='json'):
+        """Serialize a payload compactly - as MessagePack for format=msgpack - and encode it"""
+        if wire_format == 'msgpack':
+            return cls(msgpack.packb(payload, use_bin_type=True), MSGPACK_MIMETYPE)
+        return cls(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+
+    def etag_for(self, coding):
+        """Strong ETag for one representation - each content-coding gets its own tag"""
+        return self.etag if coding == 'identity' else f"{self.etag}-{coding}"
+
+    def to_response(self):
+        """Serve the best encoding the client accepts, or 304 if its copy is current"""
+        coding = 'identity'
+        for candidate in ('br', 'gzip'):
+            if candidate in self.bodies and request.accept_encodings[candidate] > 0:
+                coding = candidate
+                break
+
+        etags = [self.etag_for(c) for c in self.bodies]
+        if any(request.if_none_match.contains(tag) for tag in etags):
+            response = Response(status=304)
+        else:
+            response = Response(self.bodies[coding], mimetype=self.mimetype)
+            if coding != 'identity':
+                response.headers['Content-Encoding'] = coding
+
+        response.set_etag(self.etag_for(coding))
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+def _calculate_stats(opportunities):
+    """Summary stats shown in the dashboard stats bar"""
+    total_opportunities = len(opportunities)
+    if not total_opportunities:
+        return {}
 
-        print(f"🎯 Filtered cache: {len(filtered_opportunities)} opportunities for last {days_back} days")
-        return filtered_opportunities
+    return {
+        'total_opportunities': total_opportunities,
+        'average_value': sum(opp['totalValue'] for opp in opportunities) / total_opportunities,
+        'total_neighborhoods': len(set(opp['neighborhood'] for opp in opportunities)),
+        'average_confidence': sum(opp['mlConfidence'] for opp in opportunities) / total_opportunities
+    }
+
+def _grouped_value_summary(codes, names, values):
+    """Count, mean and quartiles of values for each dictionary-encoded group"""
+    if not len(codes):
+        return []
+
+    order = np.lexsort((values, codes))
+    sorted_codes = codes[order]
+    sorted_values = values[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    groups = np.split(sorted_values, starts[1:])
+
+    summary = []
+    for start, group in zip(starts, groups):
+        p25, p50, p75 = np.quantile(group, [0.25, 0.5, 0.75])
+        summary.append({
+            'name': names[sorted_codes[start]],
+            'count': int(len(group)),
+            'mean_value': float(group.mean()),
+            'quantiles': {'p25': float(p25), 'p50': float(p50), 'p75': float(p75)}
+        })
+    summary.sort(key=lambda group: -group['count'])
+    return summary
+
+def _build_opportunities_payload(snapshot, opportunities, days):
+    """Successful /api/opportunities body for a filtered window of a snapshot"""
+    return {
+        'success': True,
+        'opportunities': list(opportunities),
+        'stats': _calculate_stats(opportunities),
+        'version': snapshot.version if snapshot is not None else None,
+        'generated_at': snapshot.generated_at if snapshot is not None else None,
+        'message': f'Found {len(opportunities)} real restaurant closure opportunities (last {days} days)'
+    }
+
+def _cache_metadata(cache):
+    """A violations cache dict without its records, which live in the snapshot instead"""
+    if not cache:
+        return cache
+    return {key: value for key, value in cache.items() if key != 'opportunities'}
+
+def _columnar_records(opportunities):
+    """Opportunity dicts as column arrays, with repeated strings replaced by dictionary codes.
+
+    Every field seen in any record gets a column, null where a record lacks it.
+    Fields in DICTIONARY_ENCODED_FIELDS hold indexes into dictionaries[field].
+    """
+    fields = list(OPPORTUNITY_FIELDS)
+    seen = set(fields)
+    for opp in opportunities:
+        for field in opp:
+            if field not in seen:
+                seen.add(field)
+                fields.append(field)
+
+    columns = {}
+    dictionaries = {}
+    for field in fields:
+        values = [opp.get(field) for opp in opportunities]
+        if field in DICTIONARY_ENCODED_FIELDS:
+            codes = {}
+            values = [codes.setdefault(value, len(codes)) for value in values]
+            dictionaries[field] = list(codes)
+        columns[field] = values
+
+    return {
+        'count': len(opportunities),
+        'fields': fields,
+        'columns': columns,
+        'dictionaries': dictionaries
+    }
+
+def _wire_payload(payload, wire_format):
+    """An /api/opportunities payload in the requested wire format"""
+    if wire_format == 'json':
+        return payload
+    return dict(payload, format='columnar', opportunities=_columnar_records(payload['opportunities']))
+
+def _wire_format_arg():
+    """The format query parameter, validated against what this server can produce"""
+    wire_format = request.args.get('format', 'json').lower()
+    if wire_format not in WIRE_FORMATS:
+        raise ValueError(f"'format' must be one of: {', '.join(WIRE_FORMATS)}")
+    if wire_format == 'msgpack' and msgpack is None:
+        raise ValueError("format=msgpack needs msgpack installed on the server, use format=columnar")
+    return wire_format
+
+def _atomic_write_json(path, data):
+    """Write JSON to a temp file in the same directory, then rename it over path"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+class PropertyOwnerService:
+    """Property owner lookups against NYC public records, with a persistent cache.
+
+    Never touches the ML model, so owner lookups stay cheap. Concurrent requests
+    for the same address share one upstream lookup (single-flight).
+    """
+
+    def __init__(self, owner_cache_file='owner_lookup_cache.json'):
+        self.hmc_url = "https://data.cityofnewyork.us/resource/wvxf-dwi5.json"
+        self.owner_cache_file = owner_cache_file
+        self.owner_cache_expiry_days = 30  # Refresh owner lookups after 30 days
+        self._cache_lock = threading.RLock()
+        self._flight_lock = threading.Lock()
+        self._in_flight = {}  # cache key -> Future for the lookup in progress
+        self.owner_cache = self._load_owner_cache()
+
+        # Clean up expired cache entries on startup
+        self._cleanup_expired_cache()
+
+    @staticmethod
+    def _cache_key(address, borough):
+        return f"{address.strip().upper()}|{borough.strip().upper()}"
+
+    def get_owner(self, address, borough):
+        """Owner for one address - concurrent calls for the same address wait on a single lookup"""
+        if not address or not borough:
+            return self._lookup(address, borough)
+
+        key = self._cache_key(address, borough)
+        with self._flight_lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = concurrent.futures.Future()
+                self._in_flight[key] = future
+
+        if not leader:
+            print(f"  🔗 Joining in-flight owner lookup for {address}, {borough}")
+            return future.result()
+
+        try:
+            owner = self._lookup(address, borough)
+            future.set_result(owner)
+            return owner
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._flight_lock:
+                del self._in_flight[key]
 
     def _load_owner_cache(self):
         """Load cached owner lookup results"""
@@ -838,18 +2393,22 @@ class RestaurantScraper:
 
         return {}
 
-    def _save_owner_cache(self):
+    def save(self):
         """Save owner lookup cache to disk"""
         try:
-            with open(self.owner_cache_file, 'w') as f:
-                json.dump(self.owner_cache, f, indent=2)
+            with self._cache_lock:
+                _atomic_write_json(self.owner_cache_file, self.owner_cache)
             print(f"💾 Saved {len(self.owner_cache)} owner lookups to cache")
         except Exception as e:
             print(f"⚠️ Could not save owner cache: {e}")
 
     def get_cached_owner(self, address, borough):
         """Get owner from cache using address+borough as key, checking expiry"""
-        cache_key = f"{address.strip().upper()}|{borough.strip().upper()}"
+        cache_key = self._cache_key(address, borough)
+        with self._cache_lock:
+            return self._get_cached_entry(cache_key, address, borough)
+
+    def _get_cached_entry(self, cache_key, address, borough):
         cached_entry = self.owner_cache.get(cache_key)
 
         if cached_entry:
@@ -874,111 +2433,61 @@ class RestaurantScraper:
 
     def cache_owner_result(self, address, borough, owner):
         """Cache an owner lookup result"""
-        cache_key = f"{address.strip().upper()}|{borough.strip().upper()}"
-        self.owner_cache[cache_key] = {
-            'owner': owner,
-            'timestamp': datetime.now().isoformat(),
-            'address': address,
-            'borough': borough
-        }
-        # Periodically save cache and cleanup (every 10 new entries)
-        if len(self.owner_cache) % 10 == 0:
-            self._cleanup_expired_cache()
-            self._save_owner_cache()
+        cache_key = self._cache_key(address, borough)
+        with self._cache_lock:
+            self.owner_cache[cache_key] = {
+                'owner': owner,
+                'timestamp': datetime.now().isoformat(),
+                'address': address,
+                'borough': borough
+            }
+            # Periodically save cache and cleanup (every 10 new entries)
+            if len(self.owner_cache) % 10 == 0:
+                self._cleanup_expired_cache()
+                self.save()
 
     def _cleanup_expired_cache(self):
         """Remove expired entries from owner cache"""
         try:
-            expired_keys = []
-            expiry_time = timedelta(days=self.owner_cache_expiry_days)
-            current_time = datetime.now()
-
-            for cache_key, cached_entry in self.owner_cache.items():
-                try:
-                    cached_time = datetime.fromisoformat(cached_entry['timestamp'])
-                    if current_time - cached_time > expiry_time:
+            with self._cache_lock:
+                expired_keys = []
+                expiry_time = timedelta(days=self.owner_cache_expiry_days)
+                current_time = datetime.now()
+
+                for cache_key, cached_entry in self.owner_cache.items():
+                    try:
+                        cached_time = datetime.fromisoformat(cached_entry['timestamp'])
+                        if current_time - cached_time > expiry_time:
+                            expired_keys.append(cache_key)
+                    except:
+                        # Invalid timestamp, mark for removal
                         expired_keys.append(cache_key)
-                except:
-                    # Invalid timestamp, mark for removal
-                    expired_keys.append(cache_key)
 
-            # Remove expired entries
-            for key in expired_keys:
-                del self.owner_cache[key]
+                # Remove expired entries
+                for key in expired_keys:
+                    del self.owner_cache[key]
 
-            if expired_keys:
-                print(f"🧹 Cleaned up {len(expired_keys)} expired owner cache entries")
+                if expired_keys:
+                    print(f"🧹 Cleaned up {len(expired_keys)} expired owner cache entries")
 
         except Exception as e:
             print(f"⚠️ Error cleaning cache: {e}")
 
-    def get_closed_restaurants(self, days_back=30, limit=None):
-        """Fetch ALL closed restaurants from NYC Open Data API within the specified period"""
+    def _lookup(self, address, borough):
+        """Multi-method property owner lookup using various NYC APIs (same as Colab) with caching"""
         try:
-            print(f"📊 Fetching ALL restaurant closures from last {days_back} days...")
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days_back)
-            start_date_str = start_date.strftime('%Y-%m-%dT%H:%M:%S.000')
-            print(f"🗓️ Date filter: from {start_date_str} to now")
-
-            # Fetch ALL violations (no limit) within the time period
-            all_data = []
-            offset = 0
-            batch_size = 1000
+            if not address or not borough:
+                return "Address incomplete"
 
-            while True:
-                # Use EXACT same query as Colab notebook
-                params = {
-                    '$limit': batch_size,
-                    '$offset': offset,
-                    '$where': f"inspection_date >= '{start_date_str}' AND (action LIKE '%Closed%' OR action LIKE '%Suspended%')",
-                    '$order': 'inspection_date DESC'
-                }
+            address_clean = address.strip()
+            borough_clean = borough.strip().upper()
 
-                print(f"🔍 Fetching batch {offset//batch_size + 1} (offset: {offset})...")
-                print(f"🌐 Query params: {params}")
-                response = requests.get(self.api_base_url, params=params, timeout=30)
-
-                if response.status_code != 200:
-                    print(f"❌ API Error: {response.text}")
-                    break
-
-                batch_data = response.json()
-                print(f"✅ Retrieved {len(batch_data)} records in this batch")
-
-                if not batch_data:
-                    break
-
-                all_data.extend(batch_data)
-
-                # If we got less than batch_size records, we've reached the end
-                if len(batch_data) < batch_size:
-                    break
-
-                offset += batch_size
-
-            print(f"🎯 TOTAL: Retrieved {len(all_data)} violation records for {days_back} day period")
-            return all_data
-
-        except Exception as e:
-            print(f"❌ Error fetching data: {e}")
-            return []
-
-    def get_property_owner(self, address, borough):
-        """Multi-method property owner lookup using various NYC APIs (same as Colab) with caching"""
-        try:
-            if not address or not borough:
-                return "Address incomplete"
-
-            address_clean = address.strip()
-            borough_clean = borough.strip().upper()
-
-            # Check cache first
-            cached_result = self.get_cached_owner(address_clean, borough_clean)
-            if cached_result:
-                owner = cached_result['owner']
-                print(f"  🎯 Cache hit for {address_clean}, {borough_clean} -> {owner}")
-                return owner
+            # Check cache first
+            cached_result = self.get_cached_owner(address_clean, borough_clean)
+            if cached_result:
+                owner = cached_result['owner']
+                print(f"  🎯 Cache hit for {address_clean}, {borough_clean} -> {owner}")
+                return owner
 
             address_parts = address_clean.split()
             if len(address_parts) < 2:
@@ -1076,13 +2585,13 @@ class RestaurantScraper:
             self.cache_owner_result(address_clean, borough_clean, result)
             return result
 
-    def get_property_owner_batch(self, address_borough_pairs):
+    def get_owners(self, address_borough_pairs):
         """Parallel batch owner lookup for multiple properties"""
         print(f"🚀 Starting parallel owner lookup for {len(address_borough_pairs)} properties...")
 
         def lookup_single_owner(address_borough):
             address, borough = address_borough
-            return self.get_property_owner(address, borough)
+            return self.get_owner(address, borough)
 
         # Use ThreadPoolExecutor for parallel API calls
         with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
@@ -1091,17 +2600,269 @@ class RestaurantScraper:
         print(f"✅ Completed batch owner lookup: {len(results)} results")
         return results
 
+_owner_service = None
+_owner_service_lock = threading.Lock()
+
+def _get_owner_service():
+    """The process-wide PropertyOwnerService, created on first use"""
+    global _owner_service
+    if _owner_service is None:
+        with _owner_service_lock:
+            if _owner_service is None:
+                _owner_service = PropertyOwnerService()
+    return _owner_service
+
+class RestaurantScraper:
+    def __init__(self, lazy_init=False):
+        self.api_base_url = "https://data.cityofnewyork.us/resource/43nn-pn8j.json"
+
+        # Only initialize heavy ML model if not in lazy mode
+        if not lazy_init:
+            self.re_predictor = NYCRealEstatePricePredictor()
+        else:
+            self.re_predictor = None  # Initialize later if needed
+
+        # Caching system
+        self.cache_file = 'violations_cache.json'
+        self.cache_expiry_hours = 24  # Cache is valid for 24 hours (updated by scheduler)
+        self.cache_version = 0  # Last snapshot version written to the cache file
+        self._snapshot_lock = threading.RLock()
+        self._predictor_lock = threading.Lock()
+        self.snapshot = None
+        cache = self._load_cache()
+        self.cached_data = _cache_metadata(cache)
+        if cache:
+            self.snapshot = OpportunitySnapshot.from_cache(cache)
+
+        # Owner lookups and their cache are shared with /api/property-owner
+        self.owner_service = _get_owner_service()
+
+        # Set global instance for cleanup (only if predictor exists)
+        global predictor_instance
+        if self.re_predictor:
+            predictor_instance = self.re_predictor
+
+    def _ensure_predictor_loaded(self):
+        """Load the price predictor if not already loaded (lazy loading)"""
+        if self.re_predictor is not None:
+            return
+        # Scan workers can get here at the same time - only one of them builds the model
+        with self._predictor_lock:
+            if self.re_predictor is None:
+                print("🔄 Loading price predictor for processing...")
+                self.re_predictor = NYCRealEstatePricePredictor()
+                global predictor_instance
+                predictor_instance = self.re_predictor
+
+    def _load_cache(self):
+        """Load cached violation data"""
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, 'r') as f:
+                    cache = json.load(f)
+                    self.cache_version = cache.get('version', 0)
+                    cache_time = datetime.fromisoformat(cache.get('timestamp', '2000-01-01T00:00:00'))
+
+                    # Check if cache is still fresh (within expiry hours)
+                    if datetime.now() - cache_time < timedelta(hours=self.cache_expiry_hours):
+                        print(f"📋 Loaded fresh cache with {len(cache.get('opportunities', []))} opportunities")
+                        return cache
+                    else:
+                        print(f"⏰ Cache expired ({self.cache_expiry_hours}h limit), will refresh")
+        except Exception as e:
+            print(f"⚠️ Could not load cache: {e}")
+
+        return None
+
+    def _save_cache(self, opportunities_data):
+        """Save opportunities data to cache and swap it in as the serving snapshot"""
+        with self._snapshot_lock:
+            cache = {
+                'timestamp': datetime.now().isoformat(),
+                'version': self.cache_version + 1,
+                'opportunities': opportunities_data,
+                'total_count': len(opportunities_data)
+            }
+            try:
+                _atomic_write_json(self.cache_file, cache)
+                print(f"💾 Cached {len(opportunities_data)} opportunities (version {cache['version']})")
+            except Exception as e:
+                print(f"⚠️ Could not save cache: {e}")
+
+            # Serve the fresh data even if the write failed
+            self._publish_snapshot(cache)
+
+    def merge_into_snapshot(self, opportunities):
+        """Publish scan results, keeping snapshot records the scan did not cover"""
+        with self._snapshot_lock:
+            snapshot = self.snapshot
+            if snapshot is None:
+                self._save_cache(list(opportunities))
+                return
+
+            existing = {(opp['name'], opp['address']): opp for opp in snapshot.opportunities}
+            merged = []
+            for opp in opportunities:
+                previous = existing.pop((opp['name'], opp['address']), None)
+                # A scan without owner lookups should not erase owners found earlier
+                if previous and opp.get('propertyOwner') == 'Owner lookup disabled':
+                    opp = dict(opp, propertyOwner=previous.get('propertyOwner'))
+                merged.append(opp)
+            merged.extend(existing.values())
+
+            self._save_cache(merged)
+
+    def _publish_snapshot(self, cache):
+        """Atomically replace the in-memory snapshot used by the API"""
+        snapshot = OpportunitySnapshot.from_cache(cache, previous=self.snapshot)
+        snapshot.warm()
+        self.cache_version = snapshot.version
+        self.cached_data = _cache_metadata(cache)
+        self.snapshot = snapshot
+        snapshot_events.publish()
+        print(f"🔄 Serving snapshot version {snapshot.version} ({len(snapshot)} opportunities)")
+
+    def get_cached_opportunities(self, days_back=30):
+        """Get opportunities from cache, filtering by requested time period"""
+        snapshot = self.snapshot
+        if snapshot is None:
+            return None
+
+        filtered_opportunities = snapshot.get_opportunities(days_back)
+        print(f"🎯 Filtered cache: {len(filtered_opportunities)} opportunities for last {days_back} days")
+        return filtered_opportunities
+
+    def get_closed_restaurants(self, days_back=30, limit=None):
+        """Fetch ALL closed restaurants from NYC Open Data API within the specified period"""
+        all_data = []
+        for batch_data in self.iter_closed_restaurant_pages(days_back=days_back):
+            all_data.extend(batch_data)
+
+        print(f"🎯 TOTAL: Retrieved {len(all_data)} violation records for {days_back} day period")
+        return all_data
+
+    def iter_closed_restaurant_pages(self, days_back=30):
+        """Yield closed-restaurant violation records one API page at a time"""
+        try:
+            print(f"📊 Fetching ALL restaurant closures from last {days_back} days...")
+            end_date = datetime.now()
+            start_date = end_date - timedelta(days=days_back)
+            start_date_str = start_date.strftime('%Y-%m-%dT%H:%M:%S.000')
+            print(f"🗓️ Date filter: from {start_date_str} to now")
+
+            # Fetch ALL violations (no limit) within the time period
+            offset = 0
+            batch_size = 1000
+
+            while True:
+                # Use EXACT same query as Colab notebook
+                params = {
+                    '$limit': batch_size,
+                    '$offset': offset,
+                    '$where': f"inspection_date >= '{start_date_str}' AND (action LIKE '%Closed%' OR action LIKE '%Suspended%')",
+                    '$order': 'inspection_date DESC'
+                }
+
+                print(f"🔍 Fetching batch {offset//batch_size + 1} (offset: {offset})...")
+                print(f"🌐 Query params: {params}")
+                response = requests.get(self.api_base_url, params=params, timeout=30)
+
+                if response.status_code != 200:
+                    print(f"❌ API Error: {response.text}")
+                    break
+
+                batch_data = response.json()
+                print(f"✅ Retrieved {len(batch_data)} records in this batch")
+
+                if not batch_data:
+                    break
+
+                yield batch_data
+
+                # If we got less than batch_size records, we've reached the end
+                if len(batch_data) < batch_size:
+                    break
+
+                offset += batch_size
+
+        except Exception as e:
+            print(f"❌ Error fetching data: {e}")
+
+    @property
+    def owner_cache(self):
+        return self.owner_service.owner_cache
+
+    def _save_owner_cache(self):
+        """Save owner lookup cache to disk"""
+        self.owner_service.save()
+
+    def get_property_owner(self, address, borough):
+        """Owner lookup through the shared PropertyOwnerService"""
+        return self.owner_service.get_owner(address, borough)
+
+    def get_property_owner_batch(self, address_borough_pairs):
+        """Parallel batch owner lookup for multiple properties"""
+        return self.owner_service.get_owners(address_borough_pairs)
+
     def clean_and_process_data(self, raw_data, include_owner_lookup=False, include_real_estate=False):
         """Clean and process the raw violation data"""
         if not raw_data:
             return []
 
+        return list(self.iter_opportunities([raw_data], include_owner_lookup, include_real_estate))
+
+    def iter_opportunities(self, pages, include_owner_lookup=False, include_real_estate=False):
+        """Yield finished opportunity records as pages of raw violation data arrive.
+
+        Every field of an opportunity comes from the first (most recent) record of
+        its restaurant, so a restaurant is finalized as soon as it is first seen;
+        later records only add to its violations list.
+        """
         # Ensure predictor is loaded if we need real estate predictions
         if include_real_estate or include_owner_lookup:
             self._ensure_predictor_loaded()
 
-        # Group violations by restaurant
         restaurant_groups = {}
+        current_count = 0
+        memo = self.re_predictor.prediction_memo if include_real_estate else None
+        memo_start = memo.stats() if memo is not None else None
+
+        for raw_data in pages:
+            new_restaurants = self._group_restaurants(raw_data, restaurant_groups)
+            if not new_restaurants:
+                continue
+
+            # Batch process owner lookups for efficiency (parallel processing)
+            if include_owner_lookup:
+                print("🚀 Performing batch owner lookups in parallel...")
+                address_borough_pairs = [(data['address'], data['borough']) for data in new_restaurants]
+                owner_results = self.get_property_owner_batch(address_borough_pairs)
+            else:
+                owner_results = ["Owner lookup disabled"] * len(new_restaurants)
+
+            # Value the page's restaurants with a single model call
+            if include_real_estate:
+                valuations = self.re_predictor.predict_real_estate_values(
+                    [(data['address'], data['borough']) for data in new_restaurants])
+            else:
+                valuations = [None] * len(new_restaurants)
+
+            # Process each unique restaurant
+            for restaurant_data, owner, re_data in zip(new_restaurants, owner_results, valuations):
+                current_count += 1
+                print(f"Processing {current_count}: {restaurant_data['name'][:40]}...")
+                yield self._build_opportunity(restaurant_data, current_count, owner, re_data)
+
+        if include_real_estate:
+            self.re_predictor.save_feature_store()
+        if memo is not None:
+            run = memo.stats(since=memo_start)
+            print(f"🧠 Prediction memo: {run['hits']} hits, {run['misses']} misses "
+                  f"({run['hit_rate']:.0%} hit rate, {run['size']} entries)")
+
+    def _group_restaurants(self, raw_data, restaurant_groups):
+        """Group violation records by restaurant, returning restaurants seen for the first time"""
+        new_restaurants = []
 
         for record in raw_data:
             try:
@@ -1117,6 +2878,7 @@ class RestaurantScraper:
 
                 if key not in restaurant_groups:
                     restaurant_groups[key] = {
+                        'camis': record.get('camis', ''),
                         'name': restaurant_name,
                         'address': f"{record.get('building', '')} {record.get('street', '')}".strip(),
                         'borough': record.get('boro', '').strip(),
@@ -1129,6 +2891,7 @@ class RestaurantScraper:
                         'violation_type': action,
                         'violations': []
                     }
+                    new_restaurants.append(restaurant_groups[key])
 
                 # Add violation details
                 violation_code = record.get('violation_code', '').strip()
@@ -1141,87 +2904,55 @@ class RestaurantScraper:
             except Exception as e:
                 continue
 
-        # Batch process owner lookups for efficiency (parallel processing)
-        if include_owner_lookup:
-            print("🚀 Performing batch owner lookups in parallel...")
-            address_borough_pairs = [(data['address'], data['borough']) for data in restaurant_groups.values()]
-            owner_results = self.get_property_owner_batch(address_borough_pairs)
+        return new_restaurants
 
-            # Create lookup dictionary
-            restaurant_list = list(restaurant_groups.values())
-            owner_lookup = {i: owner_results[i] for i in range(len(restaurant_list))}
+    def _build_opportunity(self, restaurant_data, current_count, owner, re_data=None):
+        """Geocode one restaurant into an opportunity record, with its valuation if there is one"""
+        # Get coordinates for the restaurant - use real geocoding with caching
+        # Only use real geocoding for first 10 restaurants to balance accuracy vs speed
+        if current_count <= 10:
+            coords = self.re_predictor.geocode_address(restaurant_data['address'], restaurant_data['borough'])
         else:
-            owner_lookup = {}
-
-        # Process each unique restaurant
-        opportunities = []
-        total_restaurants = len(restaurant_groups)
-        current_count = 0
-
-        for idx, restaurant_data in enumerate(restaurant_groups.values()):
-            current_count += 1
-            print(f"Processing {current_count}/{total_restaurants}: {restaurant_data['name'][:40]}...")
-
-            # Get property owner from batch results
-            if include_owner_lookup:
-                owner = owner_lookup.get(idx, "Owner lookup failed")
-            else:
-                owner = "Owner lookup disabled"
-
-            # Get coordinates for the restaurant - use real geocoding with caching
-            # Only use real geocoding for first 10 restaurants to balance accuracy vs speed
-            if current_count <= 10:
-                coords = self.re_predictor.geocode_address(restaurant_data['address'], restaurant_data['borough'])
+            # For remaining restaurants, check cache first, then use pattern matching
+            cache_key = f"{restaurant_data['address']}|{restaurant_data['borough']}"
+            if cache_key in self.re_predictor.geocoding_cache:
+                coords = self.re_predictor.geocoding_cache[cache_key]
+                print(f"🎯 Cache hit for {restaurant_data['address']}")
             else:
-                # For remaining restaurants, check cache first, then use pattern matching
-                cache_key = f"{restaurant_data['address']}|{restaurant_data['borough']}"
-                if cache_key in self.re_predictor.geocoding_cache:
-                    coords = self.re_predictor.geocoding_cache[cache_key]
-                    print(f"🎯 Cache hit for {restaurant_data['address']}")
-                else:
-                    coords = self.re_predictor._geocode_with_pattern_matching(restaurant_data['address'], restaurant_data['borough'])
-                    self.re_predictor._add_to_cache(cache_key, coords)
+                coords = self.re_predictor._geocode_with_pattern_matching(restaurant_data['address'], restaurant_data['borough'])
+                self.re_predictor._add_to_cache(cache_key, coords)
 
-            # Get real estate prediction if requested
-            if include_real_estate:
-                re_data = self.re_predictor.predict_real_estate_value(
-                    restaurant_data['address'],
-                    restaurant_data['borough']
-                )
-            else:
-                re_data = {
-                    'price_per_sqft': 300,
-                    'estimated_sqft': 3000,
-                    'total_value': 900000,
-                    'neighborhood': 'Unknown',
-                    'ml_confidence': 85
-                }
-
-            # Create opportunity record
-            opportunity = {
-                'id': current_count,
-                'name': restaurant_data['name'],
-                'address': restaurant_data['address'],
-                'neighborhood': re_data.get('neighborhood', 'Unknown'),
-                'borough': restaurant_data['borough'],
-                'lat': coords['lat'],  # Real coordinates from geocoding
-                'lng': coords['lng'],  # Real coordinates from geocoding
-                'totalValue': re_data.get('total_value', 900000),
-                'pricePerSqft': re_data.get('price_per_sqft', 300),
-                'sqft': re_data.get('estimated_sqft', 3000),
-                'violationDate': restaurant_data['inspection_date'][:10] if restaurant_data['inspection_date'] else '',
-                'violationType': restaurant_data['violation_type'],
-                'mlConfidence': re_data.get('ml_confidence', 85),
-                'waterScore': re_data.get('water_score', 7.5),
-                'transitScore': re_data.get('transit_score', 8.0),
-                'safetyScore': re_data.get('safety_score', 7.0),
-                'propertyOwner': owner,
-                'phone': restaurant_data['phone']
+        # Placeholder values when real estate predictions weren't requested
+        if re_data is None:
+            re_data = {
+                'price_per_sqft': 300,
+                'estimated_sqft': 3000,
+                'total_value': 900000,
+                'neighborhood': 'Unknown',
+                'ml_confidence': 85
             }
 
-            opportunities.append(opportunity)
-
-        return opportunities
+        # Create opportunity record
+        return {
+            'id': _stable_opportunity_id(restaurant_data),
+            'name': restaurant_data['name'],
+            'address': restaurant_data['address'],
+            'neighborhood': re_data.get('neighborhood', 'Unknown'),
+            'borough': restaurant_data['borough'],
+            'lat': coords['lat'],  # Real coordinates from geocoding
+            'lng': coords['lng'],  # Real coordinates from geocoding
+            'totalValue': re_data.get('total_value', 900000),
+            'pricePerSqft': re_data.get('price_per_sqft', 300),
+            'sqft': re_data.get('estimated_sqft', 3000),
+            'violationDate': restaurant_data['inspection_date'][:10] if restaurant_data['inspection_date'] else '',
+            'violationType': restaurant_data['violation_type'],
+            'mlConfidence': re_data.get('ml_confidence', 85),
+            'waterScore': re_data.get('water_score', 7.5),
+            'transitScore': re_data.get('transit_score', 8.0),
+            'safetyScore': re_data.get('safety_score', 7.0),
+            'propertyOwner': owner,
+            'phone': restaurant_data['phone']
+        }
 
     def update_data_background(self, days_back=30):
         """Background method to update data - called by scheduler"""
@@ -1291,7 +3022,7 @@ class BackgroundScheduler:
 
     def _check_initial_update(self):
         """Check if we need an initial update on startup"""
-        if not self.scraper.cached_data or not self.scraper.cached_data.get('opportunities'):
+        if not self.scraper.cached_data or not self.scraper.snapshot:
             print("🚀 No cached data found, running initial background update...")
             threading.Thread(target=self.scraper.update_data_background, daemon=True).start()
         else:
@@ -1347,6 +3078,238 @@ class BackgroundScheduler:
             self.thread.join(timeout=5)
         print("🛑 Background scheduler stopped")
 
+class ScanQueueFull(Exception):
+    """Raised when too many distinct scans are already queued or running"""
+
+class ScanJob:
+    """One scan run by the ScanJobQueue, shared by every request that asked for the same scan"""
+
+    def __init__(self, job_id, days, include_owner_lookup):
+        self.id = job_id
+        self.days = days
+        self.include_owner_lookup = include_owner_lookup
+        self.status = 'queued'
+        self.subscribers = 1
+        self.pages_fetched = 0
+        self.records_fetched = 0
+        self.opportunities_processed = 0
+        self.opportunities = None
+        self.results = []  # Grows as opportunities are processed, for streams following the job
+        self.error = None
+        self.submitted_at = datetime.now().isoformat()
+        self.started_at = None
+        self.finished_at = None
+        self._done = threading.Event()
+        self._progress = threading.Condition()
+
+    @property
+    def key(self):
+        return (self.days, self.include_owner_lookup)
+
+    def wait(self, timeout=None):
+        """Block until the job has finished, returns False on timeout"""
+        return self._done.wait(timeout)
+
+    def add_result(self, opp):
+        with self._progress:
+            self.results.append(opp)
+            self.opportunities_processed += 1
+            self._progress.notify_all()
+
+    def finish(self):
+        with self._progress:
+            self._done.set()
+            self._progress.notify_all()
+
+    def follow(self, timeout=SCAN_WAIT_SECONDS):
+        """Yield the job's opportunities from the first one as they are processed.
+
+        Raises TimeoutError if nothing new arrives within timeout seconds, and
+        RuntimeError if the scan failed.
+        """
+        position = 0
+        while True:
+            with self._progress:
+                if not self._progress.wait_for(lambda: position < len(self.results) or self._done.is_set(), timeout):
+                    raise TimeoutError(f'scan {self.id} made no progress for {timeout} seconds')
+                batch = self.results[position:]
+                done = self._done.is_set()
+
+            for opp in batch:
+                yield opp
+            position += len(batch)
+
+            if done:
+                if self.error:
+                    raise RuntimeError(self.error)
+                return
+
+    def to_dict(self, include_results=False):
+        job = {
+            'job_id': self.id,
+            'status': self.status,
+            'days': self.days,
+            'include_owner_lookup': self.include_owner_lookup,
+            'subscribers': self.subscribers,
+            'progress': {
+                'pages_fetched': self.pages_fetched,
+                'records_fetched': self.records_fetched,
+                'opportunities_processed': self.opportunities_processed
+            },
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+        if self.error:
+            job['error'] = self.error
+        if include_results and self.opportunities is not None:
+            job['opportunities'] = self.opportunities
+            job['stats'] = _calculate_stats(self.opportunities)
+        return job
+
+class ScanJobQueue:
+    """Bounded worker pool for scans that coalesces identical in-flight requests.
+
+    Scans run on the shared scraper, so the ML model and caches are loaded once,
+    and their results are merged into the serving snapshot.
+    """
+
+    def __init__(self, get_scraper, max_workers=SCAN_WORKERS, max_pending=MAX_PENDING_SCANS):
+        self._get_scraper = get_scraper
+        self._max_workers = max_workers
+        self._max_pending = max_pending
+        self._executor = None
+        self._lock = threading.Lock()
+        self._jobs = {}  # job id -> ScanJob, oldest first
+        self._in_flight = {}  # (days, include_owner_lookup) -> ScanJob
+
+    def submit(self, days=30, include_owner_lookup=False):
+        """Queue a scan, or join the identical one already in flight. Returns (job, coalesced)"""
+        key = (int(days), bool(include_owner_lookup))
+        with self._lock:
+            job = self._in_flight.get(key)
+            if job is not None:
+                job.subscribers += 1
+                print(f"🔗 Joined in-flight scan {job.id} ({job.subscribers} subscribers)")
+                return job, True
+
+            if len(self._in_flight) >= self._max_pending:
+                raise ScanQueueFull(f"{len(self._in_flight)} scans already queued or running")
+
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self._max_workers, thread_name_prefix='scan')
+
+            job = ScanJob(uuid.uuid4().hex, *key)
+            self._jobs[job.id] = job
+            self._in_flight[key] = job
+            self._prune()
+            self._executor.submit(self._run, job)
+            print(f"📥 Queued scan {job.id} (days={job.days}, owners={job.include_owner_lookup})")
+            return job, False
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond MAX_FINISHED_SCANS"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished_at]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_SCANS)]:
+            del self._jobs[job_id]
+
+    def _run(self, job):
+        job.status = 'running'
+        job.started_at = datetime.now().isoformat()
+        try:
+            scraper = self._get_scraper()
+
+            def counted_pages():
+                for page in scraper.iter_closed_restaurant_pages(days_back=job.days):
+                    job.pages_fetched += 1
+                    job.records_fetched += len(page)
+                    yield page
+
+            for opp in scraper.iter_opportunities(counted_pages(), job.include_owner_lookup, include_real_estate=True):
+                job.add_result(opp)
+
+            opportunities = job.results
+            if opportunities:
+                scraper.merge_into_snapshot(opportunities)
+            job.opportunities = opportunities
+            job.status = 'done'
+            print(f"✅ Scan {job.id} finished: {len(opportunities)} opportunities")
+        except Exception as e:
+            print(f"❌ Scan {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished_at = datetime.now().isoformat()
+            with self._lock:
+                if self._in_flight.get(job.key) is job:
+                    del self._in_flight[job.key]
+            job.finish()
+
+class SnapshotEvents:
+    """Wakes /api/events streams when a snapshot is published.
+
+    Idle streams block on one shared condition instead of polling, so an idle
+    client costs a parked greenlet (under gevent workers) or thread and nothing
+    else. The generation counter closes the gap between a stream checking the
+    snapshot and starting to wait.
+    """
+
+    def __init__(self, max_clients=MAX_SSE_CLIENTS):
+        self.max_clients = max_clients
+        self._condition = threading.Condition()
+        self._generation = 0
+        self._clients = 0
+
+    @property
+    def generation(self):
+        return self._generation
+
+    @property
+    def clients(self):
+        return self._clients
+
+    def publish(self):
+        """Wake every waiting stream"""
+        with self._condition:
+            self._generation += 1
+            self._condition.notify_all()
+
+    def wait(self, generation, timeout):
+        """Block until a publish after generation, True if one happened before timeout"""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._generation != generation, timeout)
+
+    def connect(self):
+        """Register a stream, False if the server is at max_clients"""
+        with self._condition:
+            if self._clients >= self.max_clients:
+                return False
+            self._clients += 1
+            return True
+
+    def disconnect(self):
+        with self._condition:
+            self._clients -= 1
+
+snapshot_events = SnapshotEvents()
+
+_scraper_lock = threading.Lock()
+
+def _get_scraper_instance():
+    """The shared scraper used by every route, created on first use"""
+    global scraper_instance
+    if scraper_instance is None:
+        with _scraper_lock:
+            if scraper_instance is None:
+                scraper_instance = RestaurantScraper(lazy_init=True)  # Only load cache, not ML model
+    return scraper_instance
+
+scan_jobs = ScanJobQueue(_get_scraper_instance)
+
 # Flask routes
 @app.route('/')
 def serve_index():
@@ -1364,202 +3327,606 @@ def get_opportunities():
     try:
         days = int(request.args.get('days', 30))
         quick_mode = request.args.get('quick', 'false').lower() == 'true'
-        global scraper_instance
-
+        try:
+            wire_format = _wire_format_arg()
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': f'Invalid query: {str(e)}',
+                'opportunities': [],
+                'stats': {}
+            }), 400
         # Use global scraper instance for consistent caching
-        if scraper_instance is None:
-            scraper_instance = RestaurantScraper(lazy_init=True)  # Only load cache, not ML model
-
-        # ALWAYS try cache first for fast loading
-        cached_opportunities = scraper_instance.get_cached_opportunities(days_back=days)
-
-        if cached_opportunities:
-            print(f"⚡ Fast response from cache: {len(cached_opportunities)} opportunities")
-            opportunities = cached_opportunities
-        elif quick_mode:
-            # Quick mode: return any cached data (even if expired) or empty results
-            print(f"🚀 Quick mode: checking for any cached data...")
-            cache_data = scraper_instance.cached_data
-            if cache_data and cache_data.get('opportunities'):
-                all_cached = cache_data.get('opportunities', [])
-                cutoff_date = datetime.now() - timedelta(days=days)
-                opportunities = []
-                for opp in all_cached:
-                    violation_date_str = opp.get('violationDate', '')
-                    if violation_date_str:
-                        try:
-                            violation_date = datetime.fromisoformat(violation_date_str)
-                            if violation_date >= cutoff_date:
-                                opportunities.append(opp)
-                        except:
-                            continue
-
-                if opportunities:
-                    print(f"⚡ Quick mode: serving cached data: {len(opportunities)} opportunities")
-                else:
-                    print(f"⚡ Quick mode: no valid cached data, returning empty")
-                    opportunities = []
-            else:
-                print(f"⚡ Quick mode: no cache available, returning empty")
-                opportunities = []
-        else:
-            print(f"⚠️ No cache available - checking for background update in progress...")
-
-            # Check if a background update is running
-            cache_data = scraper_instance.cached_data
-            if cache_data and cache_data.get('opportunities'):
-                # We have some cached data, even if expired - use it for fast response
-                all_cached = cache_data.get('opportunities', [])
-                cutoff_date = datetime.now() - timedelta(days=days)
-                opportunities = []
-                for opp in all_cached:
-                    violation_date_str = opp.get('violationDate', '')
-                    if violation_date_str:
-                        try:
-                            violation_date = datetime.fromisoformat(violation_date_str)
-                            if violation_date >= cutoff_date:
-                                opportunities.append(opp)
-                        except:
-                            continue
-
-                if opportunities:
-                    print(f"📋 Serving slightly stale cache for fast response: {len(opportunities)} opportunities")
-                    print("💡 Fresh data will be available on next request (background updating)")
-                else:
-                    opportunities = []
-            else:
-                # No cache at all - we have to fetch (slow path)
-                print(f"🐌 No cache found, forced to fetch fresh data (this will be slow)...")
-                raw_data = scraper_instance.get_closed_restaurants(days_back=30, limit=None)
-                if not raw_data:
-                    return jsonify({
-                        'success': False,
-                        'message': 'No data available from NYC API',
-                        'opportunities': [],
-                        'stats': {}
-                    })
+        scraper = _get_scraper_instance()
+
+        # Read the snapshot reference once so the whole response comes from one version
+        snapshot = scraper.snapshot
 
-                # Quick processing without owner lookups for faster response
-                all_opportunities = scraper_instance.clean_and_process_data(
-                    raw_data,
-                    include_owner_lookup=False,  # Skip owners for speed
-                    include_real_estate=True
-                )
+        if snapshot is None and not quick_mode and _wants_ndjson():
+            # No cache at all - stream records as each page is processed
+            print(f"🐌 No cache found, streaming fresh data as NDJSON...")
+            return _stream_cold_opportunities(scraper, days)
 
-                if not all_opportunities:
+        if snapshot is None and not quick_mode:
+            # No cache at all - we have to fetch (slow path). Concurrent requests share one scan job.
+            print(f"🐌 No cache found, forced to fetch fresh data (this will be slow)...")
+            try:
+                job, _ = scan_jobs.submit(days=30, include_owner_lookup=False)  # Skip owners for speed
+            except ScanQueueFull as e:
+                return _retry_later({
+                    'success': False,
+                    'message': f'Too many scans in progress, try again shortly ({str(e)})',
+                    'opportunities': [],
+                    'stats': {}
+                }, 429)
+
+            if not job.wait(SCAN_WAIT_SECONDS):
+                return _retry_later({
+                    'success': False,
+                    'job_id': job.id,
+                    'status_url': f'/api/scan/{job.id}',
+                    'message': 'Still fetching fresh data, try again shortly',
+                    'opportunities': [],
+                    'stats': {}
+                }, 503)
+
+            if job.status == 'failed' or not job.opportunities:
+                return jsonify({
+                    'success': False,
+                    'message': 'No data available from NYC API' if job.status == 'failed' or not job.records_fetched
+                               else 'No restaurant closures found in the 30-day period',
+                    'opportunities': [],
+                    'stats': {}
+                })
+
+            # The job merged its results into the serving snapshot
+            snapshot = scraper.snapshot
+
+        if snapshot is not None:
+            if _wants_ndjson():
+                return _ndjson_response(_stream_ndjson(
+                    snapshot.get_opportunities(days),
+                    lambda emitted: {'version': snapshot.version, 'generated_at': snapshot.generated_at}
+                ))
+
+            # Delta sync - only what changed since the client's version
+            if 'since' in request.args:
+                try:
+                    since = int(request.args['since'])
+                except ValueError:
                     return jsonify({
                         'success': False,
-                        'message': 'No restaurant closures found in the 30-day period',
+                        'message': "Invalid query: 'since' must be a snapshot version number",
                         'opportunities': [],
                         'stats': {}
-                    })
-
-                # Cache the processed data
-                scraper_instance._save_cache(all_opportunities)
-
-                # Filter for the requested time period
-                cutoff_date = datetime.now() - timedelta(days=days)
-                opportunities = []
-                for opp in all_opportunities:
-                    violation_date_str = opp.get('violationDate', '')
-                    if violation_date_str:
-                        try:
-                            violation_date = datetime.fromisoformat(violation_date_str)
-                            if violation_date >= cutoff_date:
-                                opportunities.append(opp)
-                        except:
-                            continue
+                    }), 400
+                return snapshot.encoded_delta(since, days).to_response()
+
+            # Filtering, sorting and pagination come from the snapshot's precomputed indexes
+            if any(param in request.args for param in QUERY_PARAMS):
+                return _query_opportunities(snapshot, days, wire_format)
+
+            # ALWAYS try cache first for fast loading - served as pre-encoded bytes
+            encoded = snapshot.encoded_response(days, wire_format)
+            if encoded is not None:
+                print(f"⚡ Fast response from snapshot v{snapshot.version} ({days} days)")
+                return encoded.to_response()
+        else:
+            # Quick mode never blocks on a fetch
+            print(f"⚡ Quick mode: no cache available, returning empty")
 
-        if not opportunities:
+        return jsonify({
+            'success': False,
+            'message': f'No restaurant closures found in the last {days} days',
+            'opportunities': [],
+            'stats': {}
+        })
+
+    except Exception as e:
+        print(f"Error in get_opportunities: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Error fetching opportunities: {str(e)}',
+            'opportunities': [],
+            'stats': {}
+        }), 500
+
+def _retry_later(body, status):
+    """JSON error response telling the client when to try again"""
+    response = jsonify(body)
+    response.headers['Retry-After'] = str(SCAN_RETRY_AFTER_SECONDS)
+    return response, status
+
+def _wants_ndjson():
+    """Whether the client asked for progressive NDJSON results"""
+    return request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+def _ndjson_line(obj):
+    return json.dumps(obj, separators=(',', ':')) + '\n'
+
+def _stream_ndjson(opportunities, finish=None):
+    """Yield each opportunity as an NDJSON line as soon as it exists, then a summary line.
+
+    finish is called with every emitted opportunity once the source is exhausted
+    and returns extra fields for the summary.
+    """
+    emitted = []
+    try:
+        for opp in opportunities:
+            emitted.append(opp)
+            yield _ndjson_line({'type': 'opportunity', 'opportunity': opp})
+
+        summary = {'type': 'summary', 'success': bool(emitted), 'stats': _calculate_stats(emitted)}
+        if finish:
+            summary.update(finish(emitted))
+    except Exception as e:
+        print(f"❌ Error while streaming opportunities: {e}")
+        summary = {'type': 'summary', 'success': False, 'stats': _calculate_stats(emitted),
+                   'message': f'Error after {len(emitted)} opportunities: {str(e)}'}
+
+    yield _ndjson_line(summary)
+
+def _ndjson_response(lines):
+    response = Response(stream_with_context(lines), mimetype=NDJSON_MIMETYPE)
+    # Ask reverse proxies not to buffer, or the first record waits for the last
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def _stream_cold_opportunities(scraper, days):
+    """NDJSON for the no-cache path: follow the shared 30-day scan job and emit records as it processes them"""
+    try:
+        job, _ = scan_jobs.submit(days=30, include_owner_lookup=False)
+    except ScanQueueFull as e:
+        return _retry_later({
+            'success': False,
+            'message': f'Too many scans in progress, try again shortly ({str(e)})',
+            'opportunities': [],
+            'stats': {}
+        }, 429)
+    min_ordinal = _window_min_ordinal(days)
+
+    def in_window():
+        for opp in job.follow():
+            if _in_window(opp, min_ordinal):
+                yield opp
+
+    def finish(emitted):
+        # The job has merged everything it fetched into the snapshot by the time it finishes
+        snapshot = scraper.snapshot
+        if not job.results or snapshot is None:
+            return {'message': 'No data available from NYC API'}
+
+        return {
+            'version': snapshot.version,
+            'generated_at': snapshot.generated_at,
+            'message': f'Found {len(emitted)} real restaurant closure opportunities (last {days} days)'
+        }
+
+    return _ndjson_response(_stream_ndjson(in_window(), finish))
+
+def _number_arg(name, cast=float):
+    """Optional numeric query parameter - raises ValueError with a readable message"""
+    value = request.args.get(name)
+    if value is None or value == '':
+        return None
+    try:
+        return cast(value)
+    except ValueError:
+        raise ValueError(f"'{name}' must be a number, got '{value}'")
+
+def _query_positions(snapshot, days):
+    """Run the listing filters and sort from the request args against a snapshot"""
+    return snapshot.query(
+        days_back=days,
+        boroughs=[borough for borough in request.args.get('borough', '').split(',') if borough.strip()],
+        min_value=_number_arg('min_value'),
+        max_value=_number_arg('max_value'),
+        min_confidence=_number_arg('min_confidence'),
+        sort=request.args.get('sort', 'value_desc')
+    )
+
+def _query_opportunities(snapshot, days, wire_format='json'):
+    """Filtered, sorted and paginated /api/opportunities response"""
+    try:
+        top = _number_arg('top', int)
+        limit = top if top is not None else (_number_arg('limit', int) or DEFAULT_PAGE_SIZE)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        offset = 0
+        cursor = request.args.get('cursor')
+        if cursor and top is None:
+            cursor_version, _, cursor_offset = cursor.partition(':')
+            if cursor_version != str(snapshot.version):
+                raise ValueError("Cursor belongs to an older snapshot, restart from the first page")
+            offset = max(0, int(cursor_offset))
+
+        positions = _query_positions(snapshot, days)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': f'Invalid query: {str(e)}',
+            'opportunities': [],
+            'stats': {}
+        }), 400
+
+    page = positions[offset:offset + limit]
+    next_offset = offset + len(page)
+    next_cursor = f"{snapshot.version}:{next_offset}" if top is None and next_offset < len(positions) else None
+
+    return _wire_response({
+        'success': True,
+        'opportunities': snapshot.records(page),
+        'stats': snapshot.stats_for(positions),
+        'total_matches': int(len(positions)),
+        'next_cursor': next_cursor,
+        'version': snapshot.version,
+        'generated_at': snapshot.generated_at,
+        'message': f'Found {len(positions)} matching restaurant closure opportunities (last {days} days)'
+    }, wire_format)
+
+def _wire_response(payload, wire_format):
+    """Serve a payload built per request in the requested wire format"""
+    payload = _wire_payload(payload, wire_format)
+    if wire_format == 'msgpack':
+        return Response(msgpack.packb(payload, use_bin_type=True), mimetype=MSGPACK_MIMETYPE)
+    return jsonify(payload)
+
+@app.route('/api/aggregates')
+def get_aggregates():
+    """Value histogram and borough/neighborhood/violation summaries for a days window"""
+    try:
+        days = int(request.args.get('days', 30))
+        # Use global scraper instance for consistent caching
+        scraper = _get_scraper_instance()
+
+        snapshot = scraper.snapshot
+        if snapshot is None:
             return jsonify({
                 'success': False,
-                'message': f'No restaurant closures found in the last {days} days',
-                'opportunities': [],
-                'stats': {}
+                'message': 'No cached data available yet'
             })
 
-        # Calculate stats
-        total_opportunities = len(opportunities)
-        average_value = sum(opp['totalValue'] for opp in opportunities) / total_opportunities if opportunities else 0
-        neighborhoods = len(set(opp['neighborhood'] for opp in opportunities)) if opportunities else 0
-        average_confidence = sum(opp['mlConfidence'] for opp in opportunities) / total_opportunities if opportunities else 0
-
-        stats = {
-            'total_opportunities': total_opportunities,
-            'average_value': average_value,
-            'total_neighborhoods': neighborhoods,
-            'average_confidence': average_confidence
-        }
+        try:
+            bin_edges = None
+            if request.args.get('bin_edges'):
+                bin_edges = [float(edge) for edge in request.args['bin_edges'].split(',')]
+                if (len(bin_edges) < 2 or not all(math.isfinite(edge) for edge in bin_edges) or
+                        any(b <= a for a, b in zip(bin_edges, bin_edges[1:]))):
+                    raise ValueError("'bin_edges' must be at least two increasing finite numbers")
+            bin_size = _number_arg('bin_size')
+            if bin_size is None:
+                bin_size = HISTOGRAM_BIN_SIZE
+            elif not math.isfinite(bin_size) or bin_size <= 0:
+                raise ValueError("'bin_size' must be a positive number")
+
+            bin_count = len(bin_edges) - 1 if bin_edges else math.ceil(snapshot.max_value(days) / bin_size)
+            if bin_count > MAX_HISTOGRAM_BINS:
+                raise ValueError(f"Histogram would have {bin_count} bins, the limit is {MAX_HISTOGRAM_BINS}")
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': f'Invalid query: {str(e)}'
+            }), 400
+
+        return snapshot.encoded_aggregates(days, bin_edges, bin_size).to_response()
+
+    except Exception as e:
+        print(f"Error in get_aggregates: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Error computing aggregates: {str(e)}'
+        }), 500
+
+@app.route('/api/clusters')
+def get_clusters():
+    """Map markers for a viewport as GeoJSON - clusters with count and value totals, or single opportunities"""
+    try:
+        days = int(request.args.get('days', 30))
+        scraper = _get_scraper_instance()
+
+        snapshot = scraper.snapshot
+        if snapshot is None:
+            return jsonify({
+                'success': False,
+                'message': 'No cached data available yet'
+            })
+
+        try:
+            bbox = [float(part) for part in request.args.get('bbox', '-180,-85,180,85').split(',')]
+            if len(bbox) != 4 or bbox[0] > bbox[2] or bbox[1] > bbox[3]:
+                raise ValueError("'bbox' must be min_lng,min_lat,max_lng,max_lat")
+            zoom = int(request.args.get('zoom', 12))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': f'Invalid query: {str(e)}'
+            }), 400
+
+        index = snapshot.cluster_index(days)
+        level = index.level_for(bbox, zoom)
+        cells = index.query(bbox, level)
+
+        singles = cells['count'] == 1
+        records = iter(snapshot.records(cells['position'][singles]))
+        features = []
+        for x, y, count, value, lat, lng, single in zip(
+                cells['x'].tolist(), cells['y'].tolist(), cells['count'].tolist(), cells['value'].tolist(),
+                cells['lat'].tolist(), cells['lng'].tolist(), singles.tolist()):
+            if single:
+                properties = dict(next(records), cluster=False)
+            else:
+                properties = {
+                    'cluster': True,
+                    'cluster_id': f'{level}/{x}/{y}',
+                    'count': count,
+                    'total_value': value,
+                    'average_value': value / count
+                }
+            features.append({
+                'type': 'Feature',
+                'geometry': {'type': 'Point', 'coordinates': [lng, lat]},
+                'properties': properties
+            })
+
+        return jsonify({
+            'success': True,
+            'type': 'FeatureCollection',
+            'features': features,
+            'version': snapshot.version,
+            'days': days,
+            'zoom': zoom,
+            'level': level
+        })
+
+    except Exception as e:
+        print(f"Error in get_clusters: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Error building map clusters: {str(e)}'
+        }), 500
+
+@app.route('/api/spatial')
+def spatial_query():
+    """Opportunities within a radius of a point, the k nearest, or inside a bbox or polygon"""
+    try:
+        days = int(request.args.get('days', 30))
+        scraper = _get_scraper_instance()
+
+        snapshot = scraper.snapshot
+        if snapshot is None:
+            return jsonify({
+                'success': False,
+                'message': 'No cached data available yet',
+                'opportunities': []
+            })
+
+        index = snapshot.spatial_index(days)
+        distances = None
+        try:
+            limit = max(1, min(_number_arg('limit', int) or MAX_SPATIAL_RESULTS, MAX_SPATIAL_RESULTS))
+            if 'polygon' in request.args:
+                vertices = [[float(part) for part in vertex.split(',')] for vertex in request.args['polygon'].split(';')]
+                if len(vertices) < 3 or any(len(vertex) != 2 for vertex in vertices):
+                    raise ValueError("'polygon' must be at least three lat,lng vertices separated by ';'")
+                positions = index.polygon(vertices)
+                description = 'inside the polygon'
+            elif 'bbox' in request.args:
+                bbox = [float(part) for part in request.args['bbox'].split(',')]
+                if len(bbox) != 4 or bbox[0] > bbox[2] or bbox[1] > bbox[3]:
+                    raise ValueError("'bbox' must be min_lng,min_lat,max_lng,max_lat")
+                positions = index.bbox(bbox)
+                description = 'inside the bbox'
+            else:
+                lat, lng = _number_arg('lat'), _number_arg('lng')
+                if lat is None or lng is None:
+                    raise ValueError("pass lat and lng with radius_miles or k, or a bbox or polygon")
+                radius_miles, k = _number_arg('radius_miles'), _number_arg('k', int)
+                if radius_miles is not None and radius_miles > 0:
+                    positions, distances = index.radius(lat, lng, radius_miles)
+                    description = f'within {radius_miles:g} miles'
+                elif k is not None and 0 < k <= MAX_NEAREST:
+                    positions, distances = index.nearest(lat, lng, k)
+                    description = f'nearest {k}'
+                else:
+                    raise ValueError(f"pass a positive radius_miles, or k between 1 and {MAX_NEAREST}")
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': f'Invalid query: {str(e)}',
+                'opportunities': []
+            }), 400
+
+        opportunities = snapshot.records(positions[:limit])
+        if distances is not None:
+            opportunities = [dict(opp, distance_miles=round(float(distance), 4))
+                             for opp, distance in zip(opportunities, distances[:limit])]
 
         return jsonify({
             'success': True,
             'opportunities': opportunities,
-            'stats': stats,
-            'message': f'Found {total_opportunities} real restaurant closure opportunities (last {days} days)'
+            'total_matches': int(len(positions)),
+            'version': snapshot.version,
+            'generated_at': snapshot.generated_at,
+            'message': f'Found {len(positions)} opportunities {description} (last {days} days)'
         })
 
     except Exception as e:
-        print(f"Error in get_opportunities: {e}")
+        print(f"Error in spatial_query: {e}")
         return jsonify({
             'success': False,
-            'message': f'Error fetching opportunities: {str(e)}',
-            'opportunities': [],
-            'stats': {}
+            'message': f'Error running spatial query: {str(e)}',
+            'opportunities': []
         }), 500
 
-@app.route('/api/scan', methods=['POST'])
-def scan_opportunities():
-    """Scan for new opportunities"""
+def _export_row(opp):
+    """One export row, matching the columns of the dashboard's old CSV export"""
+    return [
+        opp.get('name', ''),
+        opp.get('address', ''),
+        opp.get('borough', ''),
+        opp.get('neighborhood', ''),
+        opp.get('totalValue', ''),
+        opp.get('pricePerSqft') or 'N/A',
+        opp.get('sqft') or 'N/A',
+        opp.get('violationDate', ''),
+        opp.get('violationType') or 'Health Violation',
+        opp.get('mlConfidence') or 'N/A'
+    ]
+
+def _stream_csv(snapshot, positions):
+    """Yield CSV text EXPORT_CHUNK_ROWS rows at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+    writer.writerow(EXPORT_HEADERS)
+
+    for start in range(0, len(positions), EXPORT_CHUNK_ROWS):
+        for opp in snapshot.records(positions[start:start + EXPORT_CHUNK_ROWS]):
+            writer.writerow(_export_row(opp))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def _stream_xlsx(snapshot, positions):
+    """Write a write-only workbook to a temp file, then yield it in chunks.
+
+    XLSX is a zip archive, so it cannot be produced incrementally over the wire;
+    openpyxl's write-only mode keeps memory flat while the rows are written.
+    """
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('Opportunities')
+    sheet.append(EXPORT_HEADERS)
+    for start in range(0, len(positions), EXPORT_CHUNK_ROWS):
+        for opp in snapshot.records(positions[start:start + EXPORT_CHUNK_ROWS]):
+            sheet.append(_export_row(opp))
+
+    with tempfile.TemporaryFile() as f:
+        workbook.save(f)
+        f.seek(0)
+        while True:
+            chunk = f.read(64 * 1024)
+            if not chunk:
+                break
+            yield chunk
+
+@app.route('/api/export')
+def export_opportunities():
+    """Stream the current snapshot as CSV (default) or XLSX, with the listing API's filters"""
     try:
-        data = request.get_json()
-        days = data.get('days', 30)
-        include_owner_lookup = data.get('include_owner_lookup', False)
+        days = int(request.args.get('days', 30))
+        export_format = request.args.get('format', 'csv').lower()
+        # Use global scraper instance for consistent caching
+        scraper = _get_scraper_instance()
 
-        scraper = RestaurantScraper()
+        snapshot = scraper.snapshot
+        if snapshot is None:
+            return jsonify({
+                'success': False,
+                'message': 'No cached data available yet'
+            }), 404
 
-        # Get real data from NYC API
-        raw_data = scraper.get_closed_restaurants(days_back=days, limit=1000)
-        if not raw_data:
+        if export_format not in ('csv', 'xlsx'):
             return jsonify({
                 'success': False,
-                'message': 'No data available from NYC API',
-                'opportunities': [],
-                'stats': {}
-            })
+                'message': f"Invalid query: 'format' must be csv or xlsx, got '{export_format}'"
+            }), 400
+        if export_format == 'xlsx' and openpyxl is None:
+            return jsonify({
+                'success': False,
+                'message': 'XLSX export needs openpyxl installed on the server, use format=csv'
+            }), 501
 
-        # Process with enhanced features
-        opportunities = scraper.clean_and_process_data(
-            raw_data,
-            include_owner_lookup=include_owner_lookup,
-            include_real_estate=True
-        )
+        try:
+            positions = _query_positions(snapshot, days)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': f'Invalid query: {str(e)}'
+            }), 400
+
+        filename = f"nyc_opportunities_{datetime.now().strftime('%Y-%m-%d')}.{export_format}"
+        print(f"📤 Exporting {len(positions)} opportunities from snapshot v{snapshot.version} as {export_format}")
+        if export_format == 'csv':
+            body = _stream_csv(snapshot, positions)
+            mimetype = 'text/csv'
+        else:
+            body = _stream_xlsx(snapshot, positions)
+            mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+        # No Content-Length, so the server sends the generator with chunked transfer encoding
+        response = Response(stream_with_context(body), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    except Exception as e:
+        print(f"Error in export_opportunities: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Error exporting opportunities: {str(e)}'
+        }), 500
+
+@app.route('/api/scan', methods=['POST'])
+def scan_opportunities():
+    """Scan for new opportunities, sharing the identical scan already running if there is one.
+
+    Responds with the results once the scan is done; "async": true in the body
+    or a Prefer: respond-async header gets a 202 with the job to poll instead.
+    """
+    try:
+        data = request.get_json() or {}
+        days = int(data.get('days', 30))
+        include_owner_lookup = bool(data.get('include_owner_lookup', False))
+        respond_async = bool(data.get('async', False)) or 'respond-async' in request.headers.get('Prefer', '').lower()
+
+        try:
+            job, coalesced = scan_jobs.submit(days=days, include_owner_lookup=include_owner_lookup)
+        except ScanQueueFull as e:
+            return _retry_later({
+                'success': False,
+                'message': f'Too many scans in progress, try again shortly ({str(e)})'
+            }, 429)
+
+        if _wants_ndjson():
+            # Emit each opportunity as soon as the job has processed it
+            return _ndjson_response(_stream_ndjson(
+                job.follow(),
+                lambda emitted: {'job_id': job.id, 'coalesced': coalesced,
+                                 'message': f'Scan complete! Found {len(emitted)} real investment opportunities from NYC health violation data'}
+            ))
+
+        # Synchronous callers still share the job with everyone else, and get its status if it outlasts the wait
+        if respond_async or not job.wait(SCAN_WAIT_SECONDS):
+            response = job.to_dict()
+            response.update({
+                'success': True,
+                'coalesced': coalesced,
+                'status_url': f'/api/scan/{job.id}',
+                'message': 'Still scanning, poll status_url for the results' if not respond_async
+                           else 'Joined a scan already in progress' if coalesced else 'Scan queued'
+            })
+            return jsonify(response), 202
 
+        opportunities = job.opportunities or []
         if not opportunities:
             return jsonify({
                 'success': False,
-                'message': 'No restaurant closures found in the specified time period',
+                'job_id': job.id,
+                'message': job.error or 'No restaurant closures found in the specified time period',
                 'opportunities': [],
                 'stats': {}
             })
 
-        # Calculate stats
-        total_opportunities = len(opportunities)
-        average_value = sum(opp['totalValue'] for opp in opportunities) / total_opportunities
-        neighborhoods = len(set(opp['neighborhood'] for opp in opportunities))
-        average_confidence = sum(opp['mlConfidence'] for opp in opportunities) / total_opportunities
-
-        stats = {
-            'total_opportunities': total_opportunities,
-            'average_value': average_value,
-            'total_neighborhoods': neighborhoods,
-            'average_confidence': average_confidence
-        }
+        stats = _calculate_stats(opportunities)
 
         return jsonify({
             'success': True,
+            'job_id': job.id,
             'opportunities': opportunities,
             'stats': stats,
-            'message': f'Scan complete! Found {total_opportunities} real investment opportunities from NYC health violation data'
+            'message': f'Scan complete! Found {stats["total_opportunities"]} real investment opportunities from NYC health violation data'
         })
 
     except Exception as e:
@@ -1571,6 +3938,76 @@ def scan_opportunities():
             'stats': {}
         }), 500
 
+@app.route('/api/scan/<job_id>')
+def get_scan_job(job_id):
+    """Poll a scan job's progress; results are included once it is done"""
+    job = scan_jobs.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'message': f'Unknown scan job {job_id}'
+        }), 404
+
+    response = job.to_dict(include_results=True)
+    response['success'] = job.status != 'failed'
+    return jsonify(response)
+
+@app.route('/api/events')
+def stream_events():
+    """Server-Sent Events: opportunities added, changed or removed by each data refresh"""
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('since')
+    try:
+        days = int(request.args.get('days', 30))
+        since = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'message': "Invalid query: 'days' and 'since' / Last-Event-ID must be numbers"
+        }), 400
+
+    if not snapshot_events.connect():
+        return jsonify({
+            'success': False,
+            'message': 'Too many live connections, poll /api/opportunities?since= instead'
+        }), 503
+
+    response = Response(stream_with_context(_stream_snapshot_events(_get_scraper_instance(), since, days)),
+                        mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Don't let a proxy buffer the stream
+    response.call_on_close(snapshot_events.disconnect)
+    return response
+
+def _sse_event(event, event_id, data):
+    """One SSE message; data is a single line of compact JSON"""
+    return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n"
+
+def _stream_snapshot_events(scraper, since, days):
+    """Push a delta event whenever the snapshot version moves past since.
+
+    Without since, the stream starts with a version event for the current
+    snapshot. Every message id is a snapshot version, so EventSource resumes
+    from the last one it saw. Streams end after SSE_MAX_STREAM_SECONDS to
+    bound how long a connection is held; the retry field makes the browser
+    reconnect.
+    """
+    deadline = time.monotonic() + SSE_MAX_STREAM_SECONDS
+    yield f"retry: {SSE_RETRY_MS}\n\n"
+
+    while time.monotonic() < deadline:
+        generation = snapshot_events.generation
+        snapshot = scraper.snapshot
+        if snapshot is not None and since is None:
+            since = snapshot.version
+            yield _sse_event('version', since, json.dumps({'version': since}))
+        elif snapshot is not None and snapshot.version != since:
+            body = snapshot.encoded_delta(since, days).bodies['identity'].decode('utf-8')
+            since = snapshot.version
+            yield _sse_event('opportunities', since, body)
+        elif not snapshot_events.wait(generation, min(SSE_HEARTBEAT_SECONDS, deadline - time.monotonic())):
+            # Comment line - keeps proxies from closing an idle connection
+            yield ": heartbeat\n\n"
+
 @app.route('/api/property-owner', methods=['POST'])
 def get_property_owner():
     """Get property owner information"""
@@ -1579,8 +4016,7 @@ def get_property_owner():
         address = data.get('address', '')
         borough = data.get('borough', '')
 
-        scraper = RestaurantScraper()
-        owner = scraper.get_property_owner(address, borough)
+        owner = _get_owner_service().get_owner(address, borough)
 
         return jsonify({
             'success': True,
@@ -1596,6 +4032,36 @@ def get_property_owner():
             'message': f'Error looking up owner: {str(e)}'
         }), 500
 
+@app.route('/api/property-owner/batch', methods=['POST'])
+def get_property_owners():
+    """Get owners for a list of {address, borough} properties in one request"""
+    try:
+        data = request.get_json() or {}
+        properties = data.get('properties', [])
+        if not isinstance(properties, list) or len(properties) > MAX_OWNER_BATCH:
+            return jsonify({
+                'success': False,
+                'message': f"'properties' must be a list of at most {MAX_OWNER_BATCH} addresses"
+            }), 400
+
+        pairs = [(prop.get('address', ''), prop.get('borough', '')) for prop in properties]
+        owners = _get_owner_service().get_owners(pairs)
+
+        return jsonify({
+            'success': True,
+            'owners': [
+                {'address': address, 'borough': borough, 'owner': owner}
+                for (address, borough), owner in zip(pairs, owners)
+            ]
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'owners': [],
+            'message': f'Error looking up owners: {str(e)}'
+        }), 500
+
 # Global variable to access the predictor for cleanup
 predictor_instance = None
 
@@ -1619,6 +4085,7 @@ if __name__ == '__main__':
         # Save caches
         if predictor_instance and hasattr(predictor_instance, '_save_cache'):
             predictor_instance._save_cache()
+            predictor_instance.save_feature_store()
 
         if scraper_instance:
             scraper_instance._save_owner_cache()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Benchmark Random Forest inference: sklearn's predict vs the flattened NumPy forest
+"""
+
+import os
+import pickle
+import sys
+import time
+import numpy as np
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import FlatForest
+
+MODEL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nyc_commercial_rf_model.pkl')
+
+BATCH_SIZES = (1, 10, 100, 1000, 10000, 100000)
+
+def time_per_call(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+def main():
+    with open(MODEL_FILE, 'rb') as f:
+        model = pickle.load(f)['model']
+
+    start = time.perf_counter()
+    forest = FlatForest.from_model(model)
+    print(f"📊 Forest inference, {forest.n_trees} trees, {len(forest.value):,} nodes, depth {forest.max_depth}")
+    print(f"   Flatten (once per model load): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    rng = np.random.default_rng(0)
+    print(f"   {'rows':>7s} {'sklearn':>12s} {'flat':>12s} {'speedup':>8s}")
+    for rows in BATCH_SIZES:
+        X = rng.normal(size=(rows, forest.feature.max() + 1))
+        assert np.array_equal(forest.predict(X), model.predict(X)), "flat forest disagrees with sklearn"
+
+        repeat = max(1, 2000 // rows)
+        sklearn_time = time_per_call(lambda: model.predict(X), repeat)
+        flat_time = time_per_call(lambda: forest.predict(X), repeat)
+        print(f"   {rows:7,d} {sklearn_time * 1000:9.3f} ms {flat_time * 1000:9.3f} ms {sklearn_time / flat_time:7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark model loading: unpickling nyc_commercial_rf_model.pkl vs memory-mapping the .npy artifact.
+
+Each load runs in a fresh process. Memory is read from /proc (Linux): anonymous
+RSS is private to the worker, file-backed RSS is page cache shared by every
+worker that maps the same artifact. The fork test mimics gunicorn --preload:
+the parent loads once, then each child collects garbage, reads the whole model
+and reports how much memory it had to copy.
+"""
+
+import gc
+import json
+import os
+import pickle
+import subprocess
+import sys
+import time
+import numpy as np
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import MODEL_ARTIFACT_DIR, FlatForest, _load_model_artifact
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MODEL_FILE = os.path.join(HERE, 'nyc_commercial_rf_model.pkl')
+WORKERS = 4
+
+def memory_kb():
+    """Anonymous, file-backed and private dirty (copied) RSS of this process in kB"""
+    fields = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(('RssAnon:', 'RssFile:')):
+                name, value = line.split(':')
+                fields[name] = int(value.split()[0])
+    with open('/proc/self/smaps_rollup') as f:
+        fields['Private_Dirty'] = sum(int(line.split()[1]) for line in f if line.startswith('Private_Dirty:'))
+    return fields
+
+def touch(forest):
+    """Read every page of the model arrays, as serving predictions eventually does"""
+    if forest is None:
+        return 0.0
+    return sum(float(np.asarray(array).sum()) for array in
+               (forest.feature, forest.threshold, forest.children, forest.value, forest.roots))
+
+def load(kind):
+    if kind == 'none':
+        return None, None
+    if kind == 'pickle':
+        with open(MODEL_FILE, 'rb') as f:
+            model_data = pickle.load(f)
+        # What the predictor does after unpickling
+        forest = FlatForest.from_model(model_data['model'])
+        return forest, model_data
+    forest, _, _, manifest = _load_model_artifact(os.path.join(HERE, MODEL_ARTIFACT_DIR))
+    return forest, manifest
+
+def measure_cold_load(kind):
+    """Run in a fresh process: load time and memory growth, after touching every node"""
+    before = memory_kb()
+    start = time.perf_counter()
+    forest, _ = load(kind)
+    load_ms = (time.perf_counter() - start) * 1000
+    touch(forest)
+    after = memory_kb()
+    return {'load_ms': load_ms, **{name: after[name] - before[name] for name in before}}
+
+def measure_forked_workers(kind):
+    """Run in a fresh process: load once, fork workers, report each worker's private memory growth"""
+    forest, keep_alive = load(kind)
+    reads = []
+    for _ in range(WORKERS):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            before = memory_kb()['Private_Dirty']
+            # A worker's garbage collections write to every tracked object's header
+            gc.collect()
+            touch(forest)
+            os.write(write_fd, str(memory_kb()['Private_Dirty'] - before).encode())
+            os._exit(0)
+        os.close(write_fd)
+        reads.append((pid, read_fd))
+
+    growth = []
+    for pid, read_fd in reads:
+        growth.append(int(os.read(read_fd, 64)))
+        os.close(read_fd)
+        os.waitpid(pid, 0)
+    return {'worker_private_kb': growth}
+
+def run(mode, kind):
+    output = subprocess.run([sys.executable, __file__, mode, kind], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    print("📊 Model loading, fresh process per measurement")
+    # Forked workers copy some interpreter memory whatever the model, so report growth over no model
+    baseline = np.mean(run('--fork', 'none')['worker_private_kb'])
+    for kind in ('pickle', 'artifact'):
+        cold = run('--cold', kind)
+        forked = np.mean(run('--fork', kind)['worker_private_kb']) - baseline
+        print(f"   {kind:8s} load {cold['load_ms']:7.1f} ms | private RSS +{cold['RssAnon'] / 1024:5.1f} MB, "
+              f"shared file RSS +{cold['RssFile'] / 1024:5.1f} MB | "
+              f"per forked worker +{forked / 1024:5.2f} MB copied")
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        measure = measure_cold_load if sys.argv[1] == '--cold' else measure_forked_workers
+        print(json.dumps(measure(sys.argv[2])))
+    else:
+        main()
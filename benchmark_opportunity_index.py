@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark days-window filtering: per-request date parsing vs the snapshot's date index
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import OpportunitySnapshot
+
+def make_opportunities(count):
+    """Synthetic opportunities spread over the last year"""
+    today = datetime.now()
+    return [{
+        'id': i,
+        'name': f'Restaurant {i}',
+        'totalValue': random.randint(300000, 3000000),
+        'neighborhood': 'Chelsea',
+        'mlConfidence': 90,
+        'violationDate': (today - timedelta(days=random.randint(0, 365))).strftime('%Y-%m-%d')
+    } for i in range(count)]
+
+def filter_by_parsing(opportunities, days_back):
+    """The previous implementation - parses every violationDate on every request"""
+    cutoff_date = datetime.now() - timedelta(days=days_back)
+    filtered_opportunities = []
+    for opp in opportunities:
+        violation_date_str = opp.get('violationDate', '')
+        if violation_date_str:
+            try:
+                violation_date = datetime.fromisoformat(violation_date_str)
+                if violation_date >= cutoff_date:
+                    filtered_opportunities.append(opp)
+            except:
+                continue
+    return filtered_opportunities
+
+def time_per_call(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+def main(count=10000, repeat=50):
+    print(f"📊 Window filtering over {count:,} opportunities ({repeat} runs each)")
+    opportunities = make_opportunities(count)
+
+    start = time.perf_counter()
+    snapshot = OpportunitySnapshot(opportunities, 1, datetime.now().isoformat())
+    print(f"   Index build (once per snapshot): {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    start = time.perf_counter()
+    snapshot.get_opportunities(7)
+    print(f"   First window read (builds the shared 90-day records once per snapshot): "
+          f"{(time.perf_counter() - start) * 1000:.2f} ms")
+
+    for days in (7, 30, 90):
+        before = time_per_call(lambda: filter_by_parsing(opportunities, days), repeat)
+        after = time_per_call(lambda: snapshot.get_opportunities(days), repeat)
+        assert len(filter_by_parsing(opportunities, days)) == len(snapshot.get_opportunities(days))
+        print(f"   {days:3d} days: parse {before * 1000:8.3f} ms | index {after * 1000:7.3f} ms | {before / after:6.0f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark the prediction memo: hit rate, forest time saved and quantization error per precision
+"""
+
+import os
+import random
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import NYCRealEstatePricePredictor, PredictionMemo, PREDICTION_MEMO_DECIMALS, PREDICTION_MEMO_MAX_ERROR
+
+STREETS = [('Broadway', 'Manhattan'), ('Spring Street', 'Manhattan'), ('Wall Street', 'Manhattan'),
+           ('Lexington Avenue', 'Manhattan'), ('Columbus Avenue', 'Manhattan'), ('125th Street', 'Manhattan'),
+           ('Bleecker Street', 'Manhattan'), ('Bedford Avenue', 'Brooklyn'), ('Atlantic Avenue', 'Brooklyn'),
+           ('Fulton Street', 'Brooklyn'), ('Jay Street', 'Brooklyn'), ('Ditmars Blvd', 'Queens'),
+           ('Roosevelt Avenue', 'Queens'), ('Main St', 'Queens'), ('Grand Concourse', 'Bronx'),
+           ('Victory Blvd', 'Staten Island')]
+
+def sample_features(predictor, count, seed=3):
+    """Scaled feature rows for addresses geocoded the way a scan geocodes them"""
+    rng = random.Random(seed)
+    coords = []
+    for _ in range(count):
+        street, borough = rng.choice(STREETS)
+        coords.append(predictor._geocode_with_pattern_matching(f"{rng.randint(1, 999)} {street}", borough))
+    _, features = predictor.feature_matrix([c['lat'] for c in coords], [c['lng'] for c in coords])
+    return predictor.scale_features(features)
+
+def main(count=5000, batch=50):
+    predictor = NYCRealEstatePricePredictor()
+    model_predict = predictor.forest.predict
+    features_scaled = sample_features(predictor, count)
+    print(f"📊 Prediction memo over {count:,} scan addresses, batches of {batch}")
+
+    start = time.perf_counter()
+    for i in range(0, count, batch):
+        model_predict(features_scaled[i:i + batch])
+    forest = time.perf_counter() - start
+    print(f"   Forest only:        {forest * 1000:8.1f} ms")
+
+    passed = False
+    for decimals in (1, 2, 3):
+        memo = PredictionMemo(decimals=decimals)
+        start = time.perf_counter()
+        for i in range(0, count, batch):
+            memo.predict(features_scaled[i:i + batch], model_predict)
+        elapsed = time.perf_counter() - start
+        stats = memo.stats()
+        error = memo.quantization_error(features_scaled, model_predict)
+        ok = error['mean'] <= PREDICTION_MEMO_MAX_ERROR
+        if decimals == PREDICTION_MEMO_DECIMALS:
+            passed = ok
+        print(f"   {decimals} decimals: {elapsed * 1000:8.1f} ms, {stats['hit_rate']:.1%} hits, {stats['size']} entries, "
+              f"error mean ${error['mean']:.2f} max ${error['max']:.2f} /sqft {'✅' if ok else '⚠️'}")
+
+    print(f"   Threshold: mean error under ${PREDICTION_MEMO_MAX_ERROR:.2f} /sqft at the default {PREDICTION_MEMO_DECIMALS} decimals")
+    return passed
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark snapshot memory: opportunity dicts loaded from the cache vs the columnar store
+"""
+
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import OpportunitySnapshot
+
+BOROUGHS = ['Manhattan', 'Brooklyn', 'Queens', 'Bronx', 'Staten Island']
+VIOLATION_TYPES = ['Establishment Closed by DOHMH. Violations were cited in the following area(s) and those requiring immediate action were addressed.',
+                   'Establishment re-closed by DOHMH.']
+
+def make_opportunities(count):
+    """Synthetic opportunities with the full _build_opportunity layout"""
+    today = datetime.now()
+    return [{
+        'id': i,
+        'name': f'RESTAURANT {i}',
+        'address': f'{random.randint(1, 2000)} {random.choice(["BROADWAY", "5TH AVENUE", "ATLANTIC AVENUE"])}',
+        'neighborhood': f'Neighborhood {random.randint(1, 200)}',
+        'borough': random.choice(BOROUGHS),
+        'lat': 40.5 + random.random() / 2,
+        'lng': -74.2 + random.random() / 2,
+        'totalValue': random.randint(300000, 3000000),
+        'pricePerSqft': random.randint(200, 1500),
+        'sqft': random.randint(1500, 6000),
+        'violationDate': (today - timedelta(days=random.randint(0, 365))).strftime('%Y-%m-%d'),
+        'violationType': random.choice(VIOLATION_TYPES),
+        'mlConfidence': random.randint(75, 95),
+        'waterScore': round(random.uniform(1, 10), 1),
+        'transitScore': round(random.uniform(1, 10), 1),
+        'safetyScore': round(random.uniform(1, 10), 1),
+        'propertyOwner': 'Owner lookup disabled',
+        'phone': f'212{random.randint(1000000, 9999999)}'
+    } for i in range(count)]
+
+def traced_bytes():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+def main(count=100000):
+    print(f"📊 Resident memory for {count:,} opportunities")
+    payload = json.dumps(make_opportunities(count))
+
+    tracemalloc.start()
+    baseline = traced_bytes()
+    # Records as the scraper used to hold them - parsed from violations_cache.json
+    opportunities = json.loads(payload)
+    dict_bytes = traced_bytes() - baseline
+
+    snapshot = OpportunitySnapshot(opportunities, 1, datetime.now().isoformat())
+    del opportunities
+    snapshot_bytes = traced_bytes() - baseline
+    tracemalloc.stop()
+
+    print(f"   List of dicts:        {dict_bytes / 2**20:8.1f} MB")
+    print(f"   Columnar snapshot:    {snapshot_bytes / 2**20:8.1f} MB (store {snapshot.store.nbytes / 2**20:.1f} MB"
+          f" + query index) | {dict_bytes / snapshot_bytes:.1f}x smaller")
+
+    opportunities = json.loads(payload)
+    start = time.perf_counter()
+    OpportunitySnapshot(opportunities, 1, datetime.now().isoformat())
+    print(f"   Snapshot build:       {(time.perf_counter() - start) * 1000:8.0f} ms (once per refresh)")
+
+    start = time.perf_counter()
+    records = snapshot.get_opportunities(30)
+    print(f"   Materialize 30 days:  {(time.perf_counter() - start) * 1000:8.1f} ms ({len(records):,} dicts)")
+    assert sorted(snapshot.opportunities, key=lambda opp: opp['id']) == opportunities
+
+if __name__ == "__main__":
+    main()
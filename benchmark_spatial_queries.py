@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark spatial queries: scanning every opportunity with calculate_distance vs the snapshot's SpatialIndex
+"""
+
+import os
+import sys
+import time
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import NYCRealEstatePricePredictor, OpportunitySnapshot
+from benchmark_snapshot_memory import make_opportunities
+
+SITE = (40.7580, -73.9855)
+
+def scan_radius(opportunities, lat, lng, miles):
+    """What clients did before - filter the full list with the haversine formula"""
+    nearby = []
+    for opp in opportunities:
+        distance = NYCRealEstatePricePredictor.calculate_distance(None, lat, lng, opp['lat'], opp['lng'])
+        if distance <= miles:
+            nearby.append((distance, opp))
+    return sorted(nearby, key=lambda item: item[0])
+
+def time_per_call(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+def main(count=100000, repeat=200):
+    print(f"📊 Spatial queries over {count:,} opportunities")
+    opportunities = make_opportunities(count)
+    snapshot = OpportunitySnapshot(opportunities, 1, datetime.now().isoformat())
+
+    start = time.perf_counter()
+    index = snapshot.spatial_index(365)
+    print(f"   Index build (once per snapshot window): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    positions, _ = index.radius(*SITE, 0.5)
+    assert len(positions) == len(scan_radius(opportunities, *SITE, 0.5))
+    scan = time_per_call(lambda: scan_radius(opportunities, *SITE, 0.5), 3)
+    print(f"   Full scan, 0.5 mi radius:  {scan * 1000:8.3f} ms")
+
+    queries = {
+        '0.5 mi radius': lambda: index.radius(*SITE, 0.5),
+        '10 nearest': lambda: index.nearest(*SITE, 10),
+        'bbox (Midtown)': lambda: index.bbox((-74.0, 40.75, -73.97, 40.77)),
+        'polygon (triangle)': lambda: index.polygon([(40.75, -74.0), (40.75, -73.97), (40.77, -73.985)])
+    }
+    for name, query in queries.items():
+        result = query()
+        matches = len(result[0]) if isinstance(result, tuple) else len(result)
+        print(f"   Index, {name:18s} {time_per_call(query, repeat) * 1000:8.3f} ms ({matches} results)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark /api/opportunities wire formats: payload size and client parse time
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import EncodedResponse, OpportunitySnapshot, _build_opportunities_payload, _wire_payload, msgpack
+from benchmark_snapshot_memory import make_opportunities
+from test_wire_format import decode_columnar
+
+# Times JSON.parse plus script.js's decodeColumnar on each payload file
+NODE_HARNESS = """
+const fs = require('fs');
+%s
+for (const path of process.argv.slice(1)) {
+    const text = fs.readFileSync(path, 'utf8');
+    const repeat = 20;
+    const start = process.hrtime.bigint();
+    for (let i = 0; i < repeat; i++) {
+        const data = JSON.parse(text);
+        if (data.format === 'columnar') decodeColumnar(data.opportunities);
+    }
+    console.log(Number(process.hrtime.bigint() - start) / 1e6 / repeat);
+}
+"""
+
+def time_per_call(func, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+def node_parse_times(bodies):
+    """Browser-side parse time in Node, using decodeColumnar from script.js"""
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'script.js')) as f:
+        decoder = re.search(r'^function decodeColumnar\(.*?^}$', f.read(), re.S | re.M).group(0)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = []
+        for name, body in bodies.items():
+            paths.append(os.path.join(tmp_dir, f'{name}.json'))
+            with open(paths[-1], 'wb') as f:
+                f.write(body)
+        output = subprocess.run(['node', '-e', NODE_HARNESS % decoder] + paths,
+                                capture_output=True, text=True, check=True).stdout
+    return dict(zip(bodies, (float(line) for line in output.split())))
+
+def main(count=5000):
+    print(f"📊 /api/opportunities payload for {count:,} opportunities")
+    snapshot = OpportunitySnapshot(make_opportunities(count), 1, datetime.now().isoformat())
+    payload = _build_opportunities_payload(snapshot, snapshot.get_opportunities(365), 365)
+
+    formats = ['json', 'columnar'] + (['msgpack'] if msgpack is not None else [])
+    encoded = {wire_format: EncodedResponse.from_payload(_wire_payload(payload, wire_format), wire_format)
+               for wire_format in formats}
+
+    print(f"   {'format':10s} {'identity':>10s} {'gzip':>10s} {'br':>10s}")
+    for wire_format, response in encoded.items():
+        sizes = [f"{len(response.bodies[c]) / 1024:8.0f}KB" if c in response.bodies else f"{'-':>10s}"
+                 for c in ('identity', 'gzip', 'br')]
+        print(f"   {wire_format:10s} {' '.join(sizes)}")
+
+    parsers = {
+        'json': lambda body: json.loads(body)['opportunities'],
+        'columnar': lambda body: decode_columnar(json.loads(body)['opportunities']),
+        'msgpack': lambda body: decode_columnar(msgpack.unpackb(body, raw=False)['opportunities'])
+    }
+    node_times = node_parse_times({f: encoded[f].bodies['identity'] for f in ('json', 'columnar')}) \
+        if shutil.which('node') else {}
+
+    print("   Parse + decode to records:")
+    for wire_format, response in encoded.items():
+        body = response.bodies['identity']
+        line = f"   {wire_format:10s} python {time_per_call(lambda: parsers[wire_format](body)) * 1000:7.2f} ms"
+        if wire_format in node_times:
+            line += f" | node {node_times[wire_format]:6.2f} ms"
+        print(line)
+
+if __name__ == "__main__":
+    main()
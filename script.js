@@ -1,5 +1,10 @@
 // Global variables
-let allOpportunities = [];
+const API_BASE = 'https://health-violation-data-scaper-backend.onrender.com';
+const PAGE_SIZE = 50;
+let loadedOpportunities = [];  // Pages fetched so far, in the server's sort order
+let nextCursor = null;
+let totalMatches = 0;
+let liveUpdates = null;
 let histogramChart = null;
 
 // Auto-load opportunities when page loads
@@ -7,31 +12,59 @@ document.addEventListener('DOMContentLoaded', async () => {
     console.log('Page loaded, fetching opportunities...');
     await loadOpportunities();
 
-    // Set up sort control event listener
-    document.getElementById('sortSelect').addEventListener('change', (e) => {
-        sortOpportunities(e.target.value);
-    });
+    // Sorting and filtering run on the server's precomputed indexes, so a change refetches the first page
+    document.getElementById('sortSelect').addEventListener('change', () => loadOpportunities());
+    document.getElementById('boroughSelect').addEventListener('change', () => loadOpportunities());
 });
 
-async function loadOpportunities() {
-    try {
-        // Use the same API call that worked with the test load button
-        const response = await fetch('https://health-violation-data-scaper-backend.onrender.com/api/opportunities?days=30&quick=false&auto=' + Date.now());
+function opportunitiesUrl(cursor) {
+    const params = new URLSearchParams({
+        days: 30,
+        quick: 'false',
+        format: 'columnar',
+        sort: document.getElementById('sortSelect').value,
+        limit: PAGE_SIZE
+    });
+    const borough = document.getElementById('boroughSelect').value;
+    if (borough) params.set('borough', borough);
+    if (cursor) params.set('cursor', cursor);
+    return `${API_BASE}/api/opportunities?${params}`;
+}
 
-        if (!response.ok) {
-            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
-        }
+async function fetchOpportunitiesPage(cursor) {
+    // The server revalidates with an ETag, so the browser cache never serves stale data
+    // Columnar format: column arrays plus string dictionaries, decoded below
+    const response = await fetch(opportunitiesUrl(cursor));
+
+    if (!response.ok) {
+        throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+    }
+
+    const data = await response.json();
+    if (data && data.format === 'columnar') {
+        data.opportunities = decodeColumnar(data.opportunities);
+    }
+    return data;
+}
 
-        const data = await response.json();
+async function loadOpportunities() {
+    try {
+        const data = await fetchOpportunitiesPage(null);
         console.log('API Response:', data);
 
         if (data && data.success && data.opportunities && data.opportunities.length > 0) {
-            allOpportunities = data.opportunities;
-            // Start with default sort (value high to low)
-            sortOpportunities('value_desc');
+            loadedOpportunities = data.opportunities;
+            nextCursor = data.next_cursor;
+            totalMatches = data.total_matches;
+            displayOpportunities();
             // Create histogram
             createHistogram();
+            // Live updates from here on
+            subscribeToUpdates(data.version);
         } else {
+            loadedOpportunities = [];
+            nextCursor = null;
+            totalMatches = 0;
             showError('No opportunities found');
         }
     } catch (error) {
@@ -40,44 +73,65 @@ async function loadOpportunities() {
     }
 }
 
-function sortOpportunities(sortType) {
-    if (!allOpportunities || allOpportunities.length === 0) return;
-
-    let sortedOpportunities = [...allOpportunities];
-
-    switch(sortType) {
-        case 'value_desc':
-            sortedOpportunities.sort((a, b) => b.totalValue - a.totalValue);
-            break;
-        case 'value_asc':
-            sortedOpportunities.sort((a, b) => a.totalValue - b.totalValue);
-            break;
-        case 'name_asc':
-            sortedOpportunities.sort((a, b) => a.name.localeCompare(b.name));
-            break;
-        case 'name_desc':
-            sortedOpportunities.sort((a, b) => b.name.localeCompare(a.name));
-            break;
-        case 'date_desc':
-            sortedOpportunities.sort((a, b) => new Date(b.violationDate) - new Date(a.violationDate));
-            break;
-        case 'date_asc':
-            sortedOpportunities.sort((a, b) => new Date(a.violationDate) - new Date(b.violationDate));
-            break;
+async function loadMoreOpportunities() {
+    if (!nextCursor) return;
+    try {
+        const data = await fetchOpportunitiesPage(nextCursor);
+        loadedOpportunities = loadedOpportunities.concat(data.opportunities);
+        nextCursor = data.next_cursor;
+        totalMatches = data.total_matches;
+        displayOpportunities();
+    } catch (error) {
+        // Cursors belong to one snapshot - after a data refresh start over from the first page
+        console.error('Error loading more opportunities:', error);
+        await loadOpportunities();
     }
+}
+
+// Refetch the listing whenever /api/events reports a data refresh
+function subscribeToUpdates(version) {
+    if (liveUpdates || !window.EventSource || version === null || version === undefined) return;
+
+    // EventSource reconnects on its own and resumes with Last-Event-ID
+    liveUpdates = new EventSource(`${API_BASE}/api/events?days=30&since=${version}`);
+    liveUpdates.addEventListener('opportunities', (event) => {
+        const delta = JSON.parse(event.data);
+        console.log(`Live update to version ${delta.version}: ${delta.message}`);
+        // Sort order and page boundaries come from the server, so reload rather than patch the list
+        loadOpportunities();
+    });
+}
+
+// Rebuild opportunity objects from a columnar payload
+function decodeColumnar(table) {
+    const { count, fields, columns, dictionaries } = table;
+    const decoded = fields.map(field => {
+        const dictionary = dictionaries[field];
+        return dictionary ? columns[field].map(code => dictionary[code]) : columns[field];
+    });
 
-    displayOpportunities(sortedOpportunities);
-    console.log(`Sorted opportunities by ${sortType}`);
+    const opportunities = new Array(count);
+    for (let i = 0; i < count; i++) {
+        const opportunity = {};
+        for (let f = 0; f < fields.length; f++) {
+            const value = decoded[f][i];
+            if (value !== null) {
+                opportunity[fields[f]] = value;
+            }
+        }
+        opportunities[i] = opportunity;
+    }
+    return opportunities;
 }
 
-function displayOpportunities(opportunities) {
+function displayOpportunities() {
     const listContainer = document.getElementById('opportunitiesList');
 
     // Clear loading message
     listContainer.innerHTML = '';
 
     // Display each opportunity
-    opportunities.forEach(opportunity => {
+    loadedOpportunities.forEach(opportunity => {
         const opportunityElement = document.createElement('div');
         opportunityElement.className = 'opportunity';
         opportunityElement.onclick = () => selectOpportunity(opportunity);
@@ -91,7 +145,15 @@ function displayOpportunities(opportunities) {
         listContainer.appendChild(opportunityElement);
     });
 
-    console.log(`Displayed ${opportunities.length} opportunities`);
+    if (nextCursor) {
+        const moreButton = document.createElement('button');
+        moreButton.className = 'load-more-button';
+        moreButton.textContent = `Load more (${loadedOpportunities.length} of ${totalMatches})`;
+        moreButton.onclick = loadMoreOpportunities;
+        listContainer.appendChild(moreButton);
+    }
+
+    console.log(`Displayed ${loadedOpportunities.length} of ${totalMatches} opportunities`);
 }
 
 function selectOpportunity(opportunity) {
@@ -130,7 +192,7 @@ async function getOwnerInfo(address, borough) {
     button.disabled = true;
 
     try {
-        const response = await fetch('https://health-violation-data-scaper-backend.onrender.com/api/property-owner', {
+        const response = await fetch(`${API_BASE}/api/property-owner`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ address, borough })
@@ -161,50 +223,29 @@ function formatCurrency(amount) {
     return '$' + amount.toLocaleString();
 }
 
-function createHistogram() {
-    if (!allOpportunities || allOpportunities.length === 0) return;
-
-    const ctx = document.getElementById('histogramChart').getContext('2d');
-
-    // Create $50K bins
-    const binSize = 50000;
-    const values = allOpportunities.map(opp => opp.totalValue || 0);
-    const maxValue = Math.max(...values);
-    const numBins = Math.ceil(maxValue / binSize);
-
-    // Initialize bins
-    const bins = {};
-    const labels = [];
-
-    for (let i = 0; i <= numBins; i++) {
-        const binStart = i * binSize;
-        const binEnd = (i + 1) * binSize;
-        const label = formatValueRange(binStart, binEnd);
-        labels.push(label);
-        bins[label] = 0;
+async function createHistogram() {
+    // Bins are computed once per data refresh on the server
+    let aggregates;
+    try {
+        const response = await fetch(`${API_BASE}/api/aggregates?days=30&bin_size=50000`);
+        aggregates = await response.json();
+    } catch (error) {
+        console.error('Error loading aggregates:', error);
+        return;
     }
+    if (!aggregates || !aggregates.success) return;
 
-    // Count opportunities in each bin
-    allOpportunities.forEach(opp => {
-        const value = opp.totalValue || 0;
-        const binIndex = Math.floor(value / binSize);
-        const binStart = binIndex * binSize;
-        const binEnd = (binIndex + 1) * binSize;
-        const label = formatValueRange(binStart, binEnd);
-
-        if (bins[label] !== undefined) {
-            bins[label]++;
-        }
-    });
+    const ctx = document.getElementById('histogramChart').getContext('2d');
+    const { edges, counts } = aggregates.value_histogram;
 
     // Filter out empty bins
     const nonEmptyLabels = [];
     const nonEmptyData = [];
 
-    labels.forEach(label => {
-        if (bins[label] > 0) {
-            nonEmptyLabels.push(label);
-            nonEmptyData.push(bins[label]);
+    counts.forEach((count, i) => {
+        if (count > 0) {
+            nonEmptyLabels.push(formatValueRange(edges[i], edges[i + 1]));
+            nonEmptyData.push(count);
         }
     });
 
@@ -279,41 +320,18 @@ function formatValueRange(start, end) {
 }
 
 function exportToExcel() {
-    if (!allOpportunities || allOpportunities.length === 0) {
+    if (!totalMatches) {
         alert('No data to export');
         return;
     }
 
-    // Create CSV content
-    const headers = ['Name', 'Address', 'Borough', 'Neighborhood', 'Total Value', 'Price per SqFt', 'Square Feet', 'Violation Date', 'Violation Type', 'ML Confidence'];
-
-    const rows = allOpportunities.map(opp => [
-        opp.name,
-        opp.address,
-        opp.borough,
-        opp.neighborhood,
-        opp.totalValue,
-        opp.pricePerSqft || 'N/A',
-        opp.sqft || 'N/A',
-        opp.violationDate,
-        opp.violationType || 'Health Violation',
-        opp.mlConfidence || 'N/A'
-    ]);
-
-    const csvContent = [headers, ...rows]
-        .map(row => row.map(field => `"${field}"`).join(','))
-        .join('\n');
-
-    // Create and download file
-    const blob = new Blob([csvContent], { type: 'text/csv;charset=utf-8;' });
-    const url = URL.createObjectURL(blob);
+    // The server streams the file row by row, so the tab never builds it in memory
     const link = document.createElement('a');
-    link.href = url;
+    link.href = `${API_BASE}/api/export?days=30&format=csv`;
     link.download = `nyc_opportunities_${new Date().toISOString().slice(0, 10)}.csv`;
     link.click();
-    URL.revokeObjectURL(url);
 
-    console.log('Exported', allOpportunities.length, 'opportunities to CSV');
+    console.log('Requested CSV export of the last 30 days of opportunities');
 }
 
 function showError(message) {
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test the precomputed /api/aggregates endpoint
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from test_snapshot import make_opportunity, make_scraper
+from test_response_encoding import fetch
+
+def make_aggregate_scraper(tmp_dir):
+    opportunities = [make_opportunity(i, i, value=i * 100000) for i in range(1, 11)]
+    for opp in opportunities[:4]:
+        opp['borough'] = 'Brooklyn'
+        opp['neighborhood'] = 'Park Slope'
+    opportunities[0]['violationType'] = 'Establishment re-closed by DOHMH.'
+
+    scraper = make_scraper(tmp_dir)
+    scraper._save_cache(opportunities)
+    return scraper
+
+def test_default_histogram_and_groups():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_aggregate_scraper(tmp_dir)
+        data = fetch(scraper, '/api/aggregates?days=30&bin_size=250000').get_json()
+
+        assert data['success']
+        assert data['version'] == scraper.snapshot.version
+        assert data['value_histogram']['edges'] == [0, 250000, 500000, 750000, 1000000]
+        assert data['value_histogram']['counts'] == [2, 2, 3, 3]
+        assert data['stats']['total_opportunities'] == 10
+
+        boroughs = {group['name']: group for group in data['boroughs']}
+        assert boroughs['Brooklyn']['count'] == 4
+        assert boroughs['Brooklyn']['mean_value'] == 250000
+        assert boroughs['Manhattan']['quantiles']['p50'] == 750000
+
+        violation_types = {group['name']: group['count'] for group in data['violation_types']}
+        assert violation_types == {'Establishment re-closed by DOHMH.': 1, 'Establishment Closed by DOHMH.': 9}
+
+def test_window_and_custom_edges():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_aggregate_scraper(tmp_dir)
+        data = fetch(scraper, '/api/aggregates?days=5&bin_edges=0,300000,1000000').get_json()
+        assert data['value_histogram']['counts'] == [2, 2]
+        assert [group['name'] for group in data['neighborhoods']] == ['Park Slope']
+
+        # Aggregates are computed once per snapshot and window
+        assert scraper.snapshot.encoded_aggregates(5, [0, 300000, 1000000]) is \
+            scraper.snapshot.encoded_aggregates(5, [0, 300000, 1000000])
+
+def test_invalid_bins():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_aggregate_scraper(tmp_dir)
+        assert fetch(scraper, '/api/aggregates?bin_edges=5,1').status_code == 400
+        assert fetch(scraper, '/api/aggregates?bin_size=1').status_code == 400
+        for bin_size in ('0', '-5', 'inf', 'nan'):
+            assert fetch(scraper, f'/api/aggregates?bin_size={bin_size}').status_code == 400
+        for bin_edges in ('0,nan,10', 'nan,1', '0,inf', '-inf,0'):
+            assert fetch(scraper, f'/api/aggregates?bin_edges={bin_edges}').status_code == 400
+
+if __name__ == "__main__":
+    test_default_histogram_and_groups()
+    test_window_and_custom_edges()
+    test_invalid_bins()
+    print("✅ Aggregates tests passed")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test server-side map clustering on /api/clusters
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from test_snapshot import make_opportunity, make_scraper
+from test_response_encoding import fetch
+
+NYC = '-74.3,40.4,-73.6,41.0'
+
+def make_cluster_scraper(tmp_dir):
+    """Three closures in Midtown, two in Downtown Brooklyn and one in the Bronx"""
+    points = [(40.7549, -73.9840), (40.7569, -73.9860), (40.7529, -73.9820),
+              (40.6928, -73.9903), (40.6948, -73.9883), (40.8448, -73.8648)]
+    opportunities = []
+    for i, (lat, lng) in enumerate(points, start=1):
+        opp = make_opportunity(i, i, value=i * 100000)
+        opp['lat'], opp['lng'] = lat, lng
+        opportunities.append(opp)
+    opportunities.append(dict(make_opportunity(7, 1), lat=0.0, lng=0.0))  # Never geocoded
+
+    scraper = make_scraper(tmp_dir)
+    scraper._save_cache(opportunities)
+    return scraper
+
+def test_zoom_levels():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_cluster_scraper(tmp_dir)
+
+        city = fetch(scraper, f'/api/clusters?bbox={NYC}&zoom=10').get_json()
+        assert city['success'] and city['type'] == 'FeatureCollection'
+        clusters = [f['properties'] for f in city['features'] if f['properties']['cluster']]
+        assert sorted(c['count'] for c in clusters) == [2, 3]
+        assert sum(c['total_value'] for c in clusters) == 1500000
+        singles = [f for f in city['features'] if not f['properties']['cluster']]
+        assert [f['properties']['id'] for f in singles] == [6]
+        assert singles[0]['geometry']['coordinates'] == [-73.8648, 40.8448]
+
+        street = fetch(scraper, '/api/clusters?bbox=-73.99,40.75,-73.98,40.76&zoom=17').get_json()
+        assert street['level'] == 17 + app_module.CLUSTER_CELL_BITS
+        assert sorted(f['properties']['id'] for f in street['features']) == [1, 2, 3]
+
+        # Only Midtown is in view
+        midtown = fetch(scraper, '/api/clusters?bbox=-74.0,40.75,-73.97,40.76&zoom=10').get_json()
+        assert [f['properties']['count'] for f in midtown['features']] == [3]
+
+def test_feature_count_is_bounded():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_cluster_scraper(tmp_dir)
+        data = fetch(scraper, '/api/clusters?bbox=-180,-85,180,85&zoom=18').get_json()
+        level = data['level']
+        assert level < 18 + app_module.CLUSTER_CELL_BITS
+        (x0, y0), (x1, y1) = app_module._bbox_cells((-180, -85, 180, 85), level)
+        assert (x1 - x0 + 1) * (y1 - y0 + 1) <= app_module.MAX_CLUSTER_FEATURES
+
+        # Built once per snapshot window, however many other results are cached meanwhile
+        snapshot = scraper.snapshot
+        index = snapshot.cluster_index(30)
+        other = snapshot.cluster_index(45)
+        for days in range(100, 100 + app_module.MAX_ENCODED_WINDOWS + 5):
+            snapshot.encoded_response(days)
+        assert snapshot.cluster_index(30) is index and snapshot.cluster_index(45) is other
+
+def test_invalid_bbox():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_cluster_scraper(tmp_dir)
+        assert fetch(scraper, '/api/clusters?bbox=1,2,3').status_code == 400
+        assert fetch(scraper, '/api/clusters?bbox=-73,40,-74,41').status_code == 400
+
+if __name__ == "__main__":
+    test_zoom_levels()
+    test_feature_count_is_bounded()
+    test_invalid_bbox()
+    print("✅ Cluster tests passed")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Test the columnar opportunity store behind OpportunitySnapshot
+"""
+
+import json
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import OpportunitySnapshot
+from test_snapshot import make_opportunity, make_scraper
+
+def test_records_round_trip_exactly():
+    opportunities = [make_opportunity(i, i, value=i * 100000) for i in range(1, 6)]
+    opportunities[0]['mlConfidence'] = 87.5  # Mixed int/float column
+    opportunities[1]['name'] = 'Café Olé'
+    opportunities[2]['propertyOwner'] = 'ACME HOLDINGS LLC'
+    snapshot = OpportunitySnapshot(opportunities, 1, '2025-01-01T00:00:00')
+
+    records = snapshot.get_opportunities(30)
+    assert json.dumps(records) == json.dumps(opportunities)
+    assert type(records[0]['mlConfidence']) is float and type(records[1]['mlConfidence']) is int
+    assert records[0] is not opportunities[0]
+
+    # Repeated strings are stored once
+    assert snapshot.store.categories('violationType') == ['Establishment Closed by DOHMH.']
+    assert snapshot.store.categories('propertyOwner') == ['Owner lookup disabled', 'ACME HOLDINGS LLC']
+
+def test_irregular_records_are_kept_as_is():
+    partial = {'id': 7, 'name': 'Partial', 'violationDate': make_opportunity(7, 2)['violationDate'],
+               'totalValue': None, 'extra': [1, 2]}
+    undated = dict(make_opportunity(8, 1), violationDate='')
+    snapshot = OpportunitySnapshot([make_opportunity(1, 1), partial, undated], 1, '2025-01-01T00:00:00')
+
+    assert snapshot.get_opportunities(30)[1] is partial
+    assert [opp['id'] for opp in snapshot.opportunities] == [1, 7, 8]
+    assert len(snapshot.query(days_back=30, min_value=1)) == 1
+
+def test_scraper_keeps_only_cache_metadata():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir)
+        scraper._save_cache([make_opportunity(1, 1), make_opportunity(2, 3)])
+
+        assert 'opportunities' not in scraper.cached_data
+        assert scraper.cached_data['version'] == scraper.snapshot.version
+        assert len(scraper.snapshot) == 2
+
+if __name__ == "__main__":
+    test_records_round_trip_exactly()
+    test_irregular_records_are_kept_as_is()
+    test_scraper_keeps_only_cache_metadata()
+    print("✅ Columnar store tests passed")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test the compact model distilled from the full Random Forest
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sklearn.ensemble import RandomForestRegressor
+
+from app import FlatForest, ModelRegistry, _load_model_artifact, _save_model_artifact
+from test_feature_store import make_predictor
+from train_model import distill_model_version
+
+PROPERTIES = [('123 Broadway', 'Manhattan'), ('456 Spring Street', 'Manhattan'),
+              ('789 Bedford Avenue', 'Brooklyn'), ('30 Ditmars Blvd', 'Queens')]
+
+def test_learned_spread_round_trips():
+    rng = np.random.default_rng(9)
+    X = rng.normal(size=(400, 8))
+    y = np.column_stack([X[:, 0] * 100 + 300, np.abs(X[:, 1]) * 20])
+    model = RandomForestRegressor(n_estimators=5, max_depth=6, random_state=0).fit(X, y)
+    forest = FlatForest.from_model(model)
+
+    outputs = forest.predict_with_spread(X)
+    assert np.array_equal(outputs[:, 0], model.predict(X)[:, 0])
+    assert np.allclose(outputs[:, 1], model.predict(X)[:, 1])
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'model')
+        _save_model_artifact(path, forest, np.zeros(8), np.ones(8))
+        loaded, _, _, manifest = _load_model_artifact(path)
+        assert manifest['learned_spread']
+        assert np.array_equal(loaded.predict_with_spread(X), outputs)
+
+def test_distilled_model_tracks_full_model():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        predictor = make_predictor(tmp_dir)
+        predictor.prediction_memo = None
+        predictor.model_registry = registry = ModelRegistry(os.path.join(tmp_dir, 'registry'))
+        full = predictor.predict_real_estate_values(PROPERTIES)
+
+        version, manifest = distill_model_version(predictor, registry, rows=4000, holdout_rows=1000, promote=True)
+        report = manifest['validation']
+        assert manifest['source'] == 'distilled' and manifest['n_trees'] == 10
+        assert report['rows'] == 1000 and report['mae'] < 15
+        assert report['compact_bytes'] < report['full_bytes']
+
+        # Promoting it switches the running predictor to compact mode
+        assert predictor.reload_model_if_promoted(force=True)
+        assert predictor.model_version == version and predictor.forest.spread is not None
+        compact = predictor.predict_real_estate_values(PROPERTIES)
+        for full_result, compact_result in zip(full, compact):
+            assert abs(compact_result['price_per_sqft'] - full_result['price_per_sqft']) < 50
+            assert abs(compact_result['ml_confidence'] - full_result['ml_confidence']) < 15
+
+if __name__ == "__main__":
+    test_learned_spread_round_trips()
+    test_distilled_model_tracks_full_model()
+    print("✅ Compact model tests passed")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test stable opportunity ids and /api/opportunities?since= deltas
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import OpportunitySnapshot, _stable_opportunity_id
+from test_snapshot import make_opportunity, make_scraper
+from test_response_encoding import fetch
+
+def ids(records):
+    return sorted(opp['id'] for opp in records)
+
+def test_stable_ids():
+    closure = {'camis': '50012345', 'name': 'PIZZA', 'address': '1 BROADWAY',
+               'inspection_date': '2025-03-01T00:00:00.000'}
+    assert _stable_opportunity_id(closure) == _stable_opportunity_id(dict(closure, name='PIZZA PLACE'))
+    assert _stable_opportunity_id(closure) != _stable_opportunity_id(dict(closure, inspection_date='2025-03-02'))
+    assert _stable_opportunity_id(dict(closure, camis='')) != _stable_opportunity_id(closure)
+    assert _stable_opportunity_id(closure) < 2 ** 53
+
+def test_deltas_across_versions():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir)
+        scraper._save_cache([make_opportunity(1, 1), make_opportunity(2, 2), make_opportunity(3, 3)])
+        first = scraper.snapshot.version
+
+        scraper._save_cache([make_opportunity(1, 1, value=2000000), make_opportunity(2, 2), make_opportunity(4, 4)])
+        data = fetch(scraper, f'/api/opportunities?since={first}').get_json()
+        assert not data['full']
+        assert data['version'] == first + 1
+        assert ids(data['added']) == [4]
+        assert ids(data['changed']) == [1]
+        assert data['removed'] == [3]
+
+        # Added then changed is still an addition; deltas combine across versions
+        scraper._save_cache([make_opportunity(1, 1, value=2000000), make_opportunity(2, 2),
+                             make_opportunity(4, 4, value=5), make_opportunity(5, 40)])
+        data = fetch(scraper, f'/api/opportunities?since={first}&days=30').get_json()
+        assert ids(data['added']) == [4]
+        assert ids(data['changed']) == [1]
+        assert data['removed'] == [3]
+
+        data = fetch(scraper, f'/api/opportunities?since={first}&days=90').get_json()
+        assert ids(data['added']) == [4, 5]
+
+        current = fetch(scraper, f'/api/opportunities?since={scraper.snapshot.version}').get_json()
+        assert not current['full'] and current['added'] == current['changed'] == current['removed'] == []
+
+def test_records_leaving_the_window_are_removed():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir)
+        scraper._save_cache([make_opportunity(1, 1), make_opportunity(2, 2)])
+        first = scraper.snapshot.version
+
+        # Record 2 now has an older date - it still exists, but not in the 30-day window
+        scraper._save_cache([make_opportunity(1, 1), make_opportunity(2, 40)])
+        data = fetch(scraper, f'/api/opportunities?since={first}&days=30').get_json()
+        assert data['added'] == data['changed'] == [] and data['removed'] == [2]
+
+        data = fetch(scraper, f'/api/opportunities?since={first}&days=90').get_json()
+        assert ids(data['changed']) == [2] and data['removed'] == []
+
+    # Unchanged records age out of the window between versions too
+    generated_at = (datetime.now() - timedelta(days=5)).isoformat()
+    old = OpportunitySnapshot([make_opportunity(1, 1), make_opportunity(2, 28)], 1, generated_at)
+    new = OpportunitySnapshot([make_opportunity(1, 1), make_opportunity(2, 28), make_opportunity(3, 2)], 2,
+                              datetime.now().isoformat(), previous=old)
+    data = new.delta(1, days_back=30)
+    assert ids(data['added']) == [3] and data['removed'] == []
+    data = new.delta(1, days_back=25)
+    assert ids(data['added']) == [3] and data['removed'] == [2]
+    assert OpportunitySnapshot(old.opportunities, 1, generated_at).delta(1, days_back=25)['removed'] == [2]
+
+def test_records_edited_into_the_window_are_added():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir)
+        scraper._save_cache([make_opportunity(1, 1), make_opportunity(2, 40)])
+        first = scraper.snapshot.version
+
+        # Record 2 existed, but outside the 30-day window, so the client never received it
+        scraper._save_cache([make_opportunity(1, 1), make_opportunity(2, 3)])
+        data = fetch(scraper, f'/api/opportunities?since={first}&days=30').get_json()
+        assert ids(data['added']) == [2] and data['changed'] == [] and data['removed'] == []
+
+        data = fetch(scraper, f'/api/opportunities?since={first}&days=90').get_json()
+        assert data['added'] == [] and ids(data['changed']) == [2]
+
+def test_full_resync_when_outside_changelog():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir)
+        scraper._save_cache([make_opportunity(1, 1), make_opportunity(2, 50)])
+
+        data = fetch(scraper, '/api/opportunities?since=0&days=30').get_json()
+        assert data['full']
+        assert ids(data['added']) == [1]
+        assert fetch(scraper, '/api/opportunities?since=latest').status_code == 400
+
+if __name__ == "__main__":
+    test_stable_ids()
+    test_deltas_across_versions()
+    test_records_leaving_the_window_are_removed()
+    test_records_edited_into_the_window_are_added()
+    test_full_resync_when_outside_changelog()
+    print("✅ Delta sync tests passed")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test the streaming /api/export endpoint
+"""
+
+import csv
+import io
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from app import app, EXPORT_CHUNK_ROWS
+from test_snapshot import make_opportunity, make_scraper
+
+def export(scraper, path):
+    """Stream an export and return the response plus the chunks it yielded"""
+    previous = app_module.scraper_instance
+    app_module.scraper_instance = scraper
+    try:
+        app.config['TESTING'] = True
+        with app.test_client() as client:
+            response = client.get(path, buffered=False)
+            chunks = list(response.response)
+            response.close()
+            return response, chunks
+    finally:
+        app_module.scraper_instance = previous
+
+def test_csv_export_streams_in_chunks():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir)
+        count = EXPORT_CHUNK_ROWS * 2 + 10
+        scraper._save_cache([make_opportunity(i, 1 + i % 20, value=i) for i in range(1, count + 1)])
+
+        response, chunks = export(scraper, '/api/export?days=30')
+        assert response.status_code == 200
+        assert response.mimetype == 'text/csv'
+        assert 'Content-Length' not in response.headers
+        assert 'attachment' in response.headers['Content-Disposition']
+        assert len(chunks) == 3
+
+        rows = list(csv.reader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+        assert rows[0][:2] == ['Name', 'Address']
+        assert len(rows) == count + 1
+        # Default sort matches the dashboard: highest value first
+        assert rows[1][4] == str(count)
+
+def test_csv_export_applies_filters():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir)
+        opportunities = [make_opportunity(i, i, value=i * 100000) for i in range(1, 6)]
+        opportunities[0]['borough'] = 'Queens'
+        scraper._save_cache(opportunities)
+
+        response, chunks = export(scraper, '/api/export?borough=Manhattan&max_value=400000&sort=value_asc')
+        rows = list(csv.reader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+        assert [row[0] for row in rows[1:]] == ['Restaurant 2', 'Restaurant 3', 'Restaurant 4']
+
+def test_invalid_format():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir)
+        scraper._save_cache([make_opportunity(1, 1)])
+        response, _ = export(scraper, '/api/export?format=pdf')
+        assert response.status_code == 400
+
+if __name__ == "__main__":
+    test_csv_export_streams_in_chunks()
+    test_csv_export_applies_filters()
+    test_invalid_format()
+    print("✅ Export tests passed")
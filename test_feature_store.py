@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test the persistent per-address feature store used by the price predictor
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import NEIGHBORHOOD_PROFILES, NYCRealEstatePricePredictor, NeighborhoodRegistry
+
+def make_predictor(tmp_dir):
+    """Predictor whose geocoding cache and feature store live in tmp_dir"""
+    predictor = NYCRealEstatePricePredictor()
+    predictor.cache_file = os.path.join(tmp_dir, 'geocoding_cache.json')
+    predictor.feature_store_file = os.path.join(tmp_dir, 'address_features.json')
+    predictor.feature_store = predictor._load_feature_store()
+    return predictor
+
+def fail(*args):
+    raise AssertionError("feature was recomputed")
+
+def test_rerun_skips_feature_engineering():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        predictor = make_predictor(tmp_dir)
+        first = predictor.predict_real_estate_value('123 Broadway', 'Manhattan')
+        predictor.save_feature_store()
+
+        rerun = make_predictor(tmp_dir)
+        assert len(rerun.feature_store) == 1
+        rerun.feature_matrix = fail
+        assert rerun.predict_real_estate_value('123 Broadway', 'Manhattan') == first
+
+def test_landmark_or_neighborhood_change_invalidates():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        predictor = make_predictor(tmp_dir)
+        predictor.predict_real_estate_value('456 Spring Street', 'Manhattan')
+        predictor.save_feature_store()
+
+        moved = make_predictor(tmp_dir)
+        moved.enhanced_transit_hubs.append({"name": "New Hub", "lat": 40.72, "lng": -74.0, "weight": 3.0, "type": "major_hub"})
+        assert moved._load_feature_store() == {}
+
+        safer = make_predictor(tmp_dir)
+        safer.registry = NeighborhoodRegistry([dict(profile, baseSafety=9.0) if profile['name'] == 'SoHo' else profile
+                                               for profile in NEIGHBORHOOD_PROFILES])
+        assert safer._load_feature_store() == {}
+
+def test_geocode_change_recomputes_entry():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        predictor = make_predictor(tmp_dir)
+        before = predictor.predict_real_estate_value('789 Bedford Avenue', 'Brooklyn')
+        assert before['neighborhood'] == 'Williamsburg'
+
+        # The address now geocodes into Park Slope
+        key = f"{predictor._normalize_nyc_address('789 Bedford Avenue')}|Brooklyn"
+        predictor.geocoding_cache[key] = {"lat": 40.6719, "lng": -73.9832}
+        after = predictor.predict_real_estate_value('789 Bedford Avenue', 'Brooklyn')
+        assert after['neighborhood'] == 'Park Slope'
+        assert predictor.feature_store[key]['coords'] == [40.6719, -73.9832]
+
+if __name__ == "__main__":
+    test_rerun_skips_feature_engineering()
+    test_landmark_or_neighborhood_change_invalidates()
+    test_geocode_change_recomputes_entry()
+    print("✅ Feature store tests passed")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test that the flattened NumPy forest reproduces sklearn's predictions exactly
+"""
+
+import os
+import sys
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import FlatForest
+
+def make_model(n_estimators=10, max_depth=None):
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(400, 8))
+    y = X[:, 0] * 100 + np.sin(X[:, 1]) * 50 + rng.normal(size=400)
+    return RandomForestRegressor(n_estimators=n_estimators, max_depth=max_depth, random_state=0).fit(X, y)
+
+def test_matches_sklearn_exactly():
+    model = make_model()
+    forest = FlatForest.from_model(model)
+    X = np.random.default_rng(2).normal(size=(5000, 8))
+    assert np.array_equal(forest.predict(X), model.predict(X))
+    assert forest.leaf_values(X).shape == (5000, 10)
+
+def test_rows_on_split_thresholds():
+    model = make_model(max_depth=6)
+    forest = FlatForest.from_model(model)
+
+    # Rows sitting exactly on, and one float32 step either side of, every split
+    thresholds = np.concatenate([estimator.tree_.threshold[estimator.tree_.children_left >= 0]
+                                 for estimator in model.estimators_])
+    features = np.concatenate([estimator.tree_.feature[estimator.tree_.children_left >= 0]
+                               for estimator in model.estimators_])
+    rows = []
+    for value in (thresholds, thresholds.astype(np.float32),
+                  np.nextafter(thresholds.astype(np.float32), np.float32(np.inf)),
+                  np.nextafter(thresholds.astype(np.float32), np.float32(-np.inf))):
+        X = np.zeros((len(thresholds), 8))
+        X[np.arange(len(thresholds)), features] = value
+        rows.append(X)
+    X = np.concatenate(rows)
+    assert np.array_equal(forest.predict(X), model.predict(X))
+
+def test_single_row_and_scaling():
+    model = make_model()
+    forest = FlatForest.from_model(model)
+    scaler = StandardScaler().fit(np.random.default_rng(3).normal(5, 2, size=(100, 8)))
+    features = np.random.default_rng(4).normal(5, 2, size=(1, 8))
+
+    # The predictor scales with the fitted parameters directly, skipping sklearn's validation
+    scaled = (features - scaler.mean_) / scaler.scale_
+    assert np.array_equal(scaled, scaler.transform(features))
+    assert np.array_equal(forest.predict(scaled), model.predict(scaled))
+
+if __name__ == "__main__":
+    test_matches_sklearn_exactly()
+    test_rows_on_split_thresholds()
+    test_single_row_and_scaling()
+    print("✅ Flat forest tests passed")
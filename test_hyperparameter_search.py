@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test the cached training matrix and the parallel hyperparameter search
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from test_feature_store import fail, make_predictor
+from train_model import cached_training_matrix, choose_candidate, run_search, search_candidates
+
+def test_training_matrix_is_cached_until_inputs_change():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        predictor = make_predictor(tmp_dir)
+        path = os.path.join(tmp_dir, 'training_features.npz')
+        X, y = cached_training_matrix(predictor, path, seed=1, samples_per_anchor=5)
+
+        synthesize = predictor.synthesize_training_data
+        predictor.synthesize_training_data = fail
+        cached_X, cached_y = cached_training_matrix(predictor, path, seed=1, samples_per_anchor=5)
+        assert np.array_equal(X, cached_X) and np.array_equal(y, cached_y)
+
+        # Another seed or another landmark table rebuilds it
+        predictor.synthesize_training_data = synthesize
+        assert not np.array_equal(cached_training_matrix(predictor, path, seed=2, samples_per_anchor=5)[1], y)
+        predictor.business_districts = predictor.business_districts[:-1]
+        rebuilt, _ = cached_training_matrix(predictor, path, seed=2, samples_per_anchor=5)
+        assert not np.array_equal(rebuilt[:, 2], X[:, 2])
+
+def test_search_reports_every_candidate():
+    grid = {'n_estimators': [3, 6], 'max_depth': [2, 4], 'min_samples_leaf': [2]}
+    assert len(search_candidates(grid)) == 4
+    assert len(search_candidates(grid, sample=3)) == 3
+    assert search_candidates(grid, sample=3) == search_candidates(grid, sample=3)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'training_features.npz')
+        cached_training_matrix(make_predictor(tmp_dir), path, samples_per_anchor=10)
+        candidates = search_candidates(grid)
+        results = run_search(path, candidates, folds=3, workers=2)
+
+    assert [result['params'] for result in results] == candidates
+    for result in results:
+        assert -1 < result['r2'] <= 1 and result['rmse'] > 0
+        assert result['nodes'] > 0 and result['model_bytes'] > 0
+        assert result['latency_1_ms'] > 0 and result['latency_1000_ms'] > 0
+
+    # The smallest forest that clears the bar wins, even if a bigger one scores higher
+    best = max(results, key=lambda result: result['r2'])
+    chosen = choose_candidate(results, min_r2=-1)
+    assert chosen['model_bytes'] == min(result['model_bytes'] for result in results)
+    assert choose_candidate(results, tolerance=0) is best
+    assert choose_candidate(results, min_r2=2) is None
+
+if __name__ == "__main__":
+    test_training_matrix_is_cached_until_inputs_change()
+    test_search_reports_every_candidate()
+    print("✅ Hyperparameter search tests passed")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test the memory-mapped .npy model artifact
+"""
+
+import json
+import os
+import pickle
+import sys
+import tempfile
+import numpy as np
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import FlatForest, NYCRealEstatePricePredictor, _load_model_artifact, _save_model_artifact
+from test_flat_forest import make_model
+
+def test_round_trip_is_memory_mapped():
+    model = make_model()
+    forest = FlatForest.from_model(model)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'model')
+        _save_model_artifact(path, forest, np.zeros(8), np.ones(8), {'note': 'test'})
+        # Saving again replaces the artifact in place
+        _save_model_artifact(path, forest, np.zeros(8), np.ones(8), {'note': 'replaced'})
+        assert sorted(os.listdir(tmp_dir)) == ['model']
+
+        loaded, mean, scale, manifest = _load_model_artifact(path)
+        assert manifest['note'] == 'replaced' and manifest['n_trees'] == 10
+        assert isinstance(loaded.threshold.base, np.memmap)
+        assert np.array_equal(mean, np.zeros(8)) and np.array_equal(scale, np.ones(8))
+
+        X = np.random.default_rng(5).normal(size=(1000, 8))
+        assert np.array_equal(loaded.predict(X), model.predict(X))
+
+def test_unknown_format_version_is_rejected():
+    forest = FlatForest.from_model(make_model(n_estimators=2))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'model')
+        _save_model_artifact(path, forest, np.zeros(8), np.ones(8))
+        manifest_path = os.path.join(path, 'manifest.json')
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        manifest['format_version'] += 1
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f)
+        try:
+            _load_model_artifact(path)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("a newer artifact format should not load")
+
+def test_predictor_serves_from_artifact():
+    predictor = NYCRealEstatePricePredictor()
+    assert predictor.random_forest_model is None
+    assert predictor.model_trained
+
+    # The shipped artifact is the shipped pickle, flattened
+    with open('nyc_commercial_rf_model.pkl', 'rb') as f:
+        model_data = pickle.load(f)
+    features = np.random.default_rng(6).normal(3, 2, size=(500, 8))
+    assert np.array_equal(predictor.scale_features(features), model_data['scaler'].transform(features))
+    scaled = predictor.scale_features(features)
+    assert np.array_equal(predictor.forest.predict(scaled), model_data['model'].predict(scaled))
+
+if __name__ == "__main__":
+    test_round_trip_is_memory_mapped()
+    test_unknown_format_version_is_rejected()
+    test_predictor_serves_from_artifact()
+    print("✅ Model artifact tests passed")
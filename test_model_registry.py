@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test vectorized training, the versioned model registry and hot-swapping promoted models
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import NEIGHBORHOODS, ModelRegistry, fit_random_forest, train_model_version
+from test_feature_store import make_predictor
+
+SMALL_FOREST = {'n_estimators': 5, 'max_depth': 6}
+PROPERTIES = [('123 Broadway', 'Manhattan'), ('789 Bedford Avenue', 'Brooklyn')]
+
+def test_synthetic_data_is_seeded_and_uses_feature_engine():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        predictor = make_predictor(tmp_dir)
+        X, y = predictor.synthesize_training_data(seed=1, samples_per_anchor=10)
+        assert X.shape == (10 * len(NEIGHBORHOODS.training_ids), 8)
+
+        again, again_y = predictor.synthesize_training_data(seed=1, samples_per_anchor=10)
+        assert np.array_equal(X, again) and np.array_equal(y, again_y)
+        assert not np.array_equal(y, predictor.synthesize_training_data(seed=2, samples_per_anchor=10)[1])
+
+        # Prices stay inside each anchor's range
+        anchors = np.repeat(np.arange(len(NEIGHBORHOODS.training_ids)), 10)
+        assert np.all(y >= NEIGHBORHOODS.anchor_min_price[anchors])
+        assert np.all(y <= NEIGHBORHOODS.anchor_max_price[anchors])
+        assert np.all((X[:, 4] >= 4.0) & (X[:, 4] <= 9.0))
+
+def test_versions_record_how_they_were_trained():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        predictor = make_predictor(tmp_dir)
+        registry = ModelRegistry(os.path.join(tmp_dir, 'registry'))
+        first, manifest = train_model_version(predictor, registry, seed=3, params=SMALL_FOREST)
+        second, _ = train_model_version(predictor, registry, seed=3, params=SMALL_FOREST)
+
+        assert (first, second) == ('v0001', 'v0002')
+        assert registry.versions() == ['v0001', 'v0002'] and registry.promoted() is None
+        assert manifest['seed'] == 3 and manifest['hyperparameters']['n_estimators'] == 5
+        assert manifest['feature_fingerprint'] == predictor._feature_fingerprint()
+        assert set(manifest['metrics']) == {'r2', 'rmse', 'mae'}
+
+        # The same seed trains the same forest
+        assert np.array_equal(registry.load(first)[0].value, registry.load(second)[0].value)
+
+def test_promoted_version_is_hot_swapped():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        predictor = make_predictor(tmp_dir)
+        predictor.model_registry = registry = ModelRegistry(os.path.join(tmp_dir, 'registry'))
+        before = predictor.predict_real_estate_values(PROPERTIES)
+
+        version, _ = train_model_version(predictor, registry, params=SMALL_FOREST, promote=True)
+        # Not picked up until the next check is due
+        assert predictor.reload_model_if_promoted() is False
+        predictor._next_model_check = 0.0
+        after = predictor.predict_real_estate_values(PROPERTIES)
+        assert predictor.model_version == version and predictor.forest.n_trees == 5
+        assert after != before
+
+        # Versions trained on other features are never served
+        stale, _ = train_model_version(predictor, registry, params=SMALL_FOREST)
+        manifest_path = os.path.join(registry.path(stale), 'manifest.json')
+        with open(manifest_path) as f:
+            manifest = f.read()
+        with open(manifest_path, 'w') as f:
+            f.write(manifest.replace(predictor._feature_fingerprint(), 'other'))
+        registry.promote(stale)
+        assert predictor.reload_model_if_promoted(force=True) is False
+        assert predictor.model_version == version
+
+def test_served_model_is_refit_on_every_row():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        X, y = make_predictor(tmp_dir).synthesize_training_data(seed=1, samples_per_anchor=10)
+
+    model, scaler, metadata = fit_random_forest(X, y, params=SMALL_FOREST)
+    assert scaler.n_samples_seen_ == len(X) and metadata['refit_on_all_rows']
+    assert metadata['training_rows'] == len(X) and 0 < metadata['holdout_rows'] < len(X)
+
+    # Holdout-only fits are opt-in, and score the same held-out rows
+    held_model, held_scaler, held_metadata = fit_random_forest(X, y, params=SMALL_FOREST, refit=False)
+    assert held_scaler.n_samples_seen_ == len(X) - metadata['holdout_rows']
+    assert held_metadata['training_rows'] + held_metadata['holdout_rows'] == len(X)
+    assert held_metadata['metrics'] == metadata['metrics']
+    assert not np.array_equal(model.predict(scaler.transform(X)), held_model.predict(held_scaler.transform(X)))
+
+if __name__ == "__main__":
+    test_synthetic_data_is_seeded_and_uses_feature_engine()
+    test_versions_record_how_they_were_trained()
+    test_served_model_is_refit_on_every_row()
+    test_promoted_version_is_hot_swapped()
+    print("✅ Model registry tests passed")
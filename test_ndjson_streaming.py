@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test progressive NDJSON results for the cold-cache /api/opportunities path
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from app import app, NYCRealEstatePricePredictor, ScanJobQueue
+from test_snapshot import make_scraper
+
+NDJSON = {'Accept': 'application/x-ndjson'}
+
+def make_record(camis, name, days_ago, building='123', street='BROADWAY'):
+    """A raw violation record shaped like the NYC Open Data API response"""
+    return {
+        'camis': camis,
+        'dba': name,
+        'building': building,
+        'street': street,
+        'boro': 'Manhattan',
+        'phone': '2125550100',
+        'cuisine_description': 'Pizza',
+        'inspection_date': (datetime.now() - timedelta(days=days_ago)).strftime('%Y-%m-%dT00:00:00.000'),
+        'action': 'Establishment Closed by DOHMH.',
+        'violation_code': '04L',
+        'violation_description': 'Evidence of mice'
+    }
+
+def make_cold_scraper(tmp_dir, pages, fetched):
+    """Scraper with no snapshot whose API pages come from a list"""
+    scraper = make_scraper(tmp_dir)
+    scraper.re_predictor = NYCRealEstatePricePredictor()
+    scraper.re_predictor.cache_file = os.path.join(tmp_dir, 'geocoding_cache.json')
+    scraper.re_predictor.feature_store_file = os.path.join(tmp_dir, 'address_features.json')
+
+    def iter_pages(days_back=30):
+        for page in pages:
+            fetched.append(page)
+            yield page
+
+    scraper.iter_closed_restaurant_pages = iter_pages
+    return scraper
+
+def test_cold_cache_streams_each_page():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pages = [
+            [make_record('1', 'FIRST PIZZA', 1), make_record('1', 'FIRST PIZZA', 1), make_record('2', 'SECOND', 2, '45')],
+            [make_record('3', 'THIRD', 3, '67'), make_record('4', 'OLD', 20, '89')]
+        ]
+        fetched = []
+        scraper = make_cold_scraper(tmp_dir, pages, fetched)
+        release = threading.Event()
+        iter_pages = scraper.iter_closed_restaurant_pages
+
+        def held_pages(days_back=30):
+            for page in iter_pages(days_back):
+                yield page
+                release.wait(5)  # The next page stays in flight until the test lets it through
+
+        scraper.iter_closed_restaurant_pages = held_pages
+
+        previous_instance, previous_jobs = app_module.scraper_instance, app_module.scan_jobs
+        app_module.scraper_instance = scraper
+        app_module.scan_jobs = ScanJobQueue(lambda: scraper)
+        try:
+            app.config['TESTING'] = True
+            with app.test_client() as client:
+                response = client.get('/api/opportunities?days=7', headers=NDJSON, buffered=False)
+                assert response.mimetype == 'application/x-ndjson'
+                chunks = iter(response.response)
+
+                # The first record is out after a single page fetch
+                first = json.loads(next(chunks))
+                assert first['type'] == 'opportunity'
+                assert first['opportunity']['name'] == 'FIRST PIZZA'
+                assert len(fetched) == 1
+
+                # The stream follows the shared scan job, so other cold requests join it
+                job, coalesced = app_module.scan_jobs.submit(days=30)
+                assert coalesced and job.status == 'running'
+
+                release.set()
+                lines = [json.loads(chunk) for chunk in chunks]
+                response.close()
+        finally:
+            release.set()
+            app_module.scraper_instance, app_module.scan_jobs = previous_instance, previous_jobs
+
+        names = [first['opportunity']['name']] + [line['opportunity']['name'] for line in lines[:-1]]
+        assert names == ['FIRST PIZZA', 'SECOND', 'THIRD']
+
+        summary = lines[-1]
+        assert summary['type'] == 'summary'
+        assert summary['success']
+        assert summary['stats']['total_opportunities'] == 3
+        assert summary['version'] == 1
+
+        # Everything fetched, including records outside the window, is cached
+        assert len(scraper.snapshot) == 4
+
+if __name__ == "__main__":
+    test_cold_cache_streams_each_page()
+    print("✅ NDJSON streaming tests passed")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test the compiled neighborhood registry and batched valuation
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import NEIGHBORHOODS
+from test_feature_store import make_predictor
+
+def test_locate_matches_bounds_then_nearest_center():
+    ids = NEIGHBORHOODS.locate([40.720, 40.7195, 40.5], [-74.010, -74.0089, -74.2])
+    names = [NEIGHBORHOODS.names[nid] for nid in ids]
+    # Tribeca and SoHo overlap; the first profile in table order wins
+    assert names == ['Tribeca', 'Tribeca', 'St. George']
+
+    soho = NEIGHBORHOODS.ids['SoHo']
+    assert NEIGHBORHOODS.base_safety[soho] == 8.0
+    assert (NEIGHBORHOODS.min_price[soho], NEIGHBORHOODS.max_price[soho]) == (180, 900)
+
+    # Unlisted values fall back to the old per-call defaults
+    red_hook = NEIGHBORHOODS.ids['Red Hook']
+    assert NEIGHBORHOODS.building_age[red_hook] == 30
+    assert NEIGHBORHOODS.max_price[red_hook] == 500
+
+def test_batch_matches_single_lookups():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        predictor = make_predictor(tmp_dir)
+        rng = np.random.default_rng(7)
+        lats = rng.uniform(40.55, 40.92, 500)
+        lngs = rng.uniform(-74.10, -73.80, 500)
+
+        ids, features = predictor.feature_matrix(lats, lngs)
+        for lat, lng, nid, row in zip(lats[:50], lngs[:50], ids, features):
+            assert predictor.find_neighborhood(lat, lng)['name'] == NEIGHBORHOODS.names[nid]
+            assert row[0] == predictor._calculate_enhanced_water_proximity(lat, lng)
+            assert row[1] == predictor._calculate_enhanced_transit_accessibility(lat, lng)
+            assert row[2] == predictor._calculate_business_district_premium(lat, lng)
+
+        properties = [('123 Broadway', 'Manhattan'), ('789 Bedford Avenue', 'Brooklyn'), ('30 Ditmars Blvd', 'Queens')]
+        batch = predictor.predict_real_estate_values(properties)
+        single = [predictor.predict_real_estate_value(address, borough) for address, borough in properties]
+        assert batch == single
+
+if __name__ == "__main__":
+    test_locate_matches_bounds_then_nearest_center()
+    test_batch_matches_single_lookups()
+    print("✅ Neighborhood registry tests passed")
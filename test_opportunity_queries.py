@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test server-side filtering, sorting and pagination on /api/opportunities
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from test_snapshot import make_opportunity, make_scraper
+from test_response_encoding import fetch
+
+def make_queryable_scraper(tmp_dir):
+    """Scraper with a mix of boroughs, values and confidences"""
+    opportunities = []
+    for i in range(1, 13):
+        opp = make_opportunity(i, i, value=i * 100000)
+        opp['borough'] = 'Brooklyn' if i % 2 else 'Manhattan'
+        opp['mlConfidence'] = 80 + i
+        opportunities.append(opp)
+
+    scraper = make_scraper(tmp_dir)
+    scraper._save_cache(opportunities)
+    return scraper
+
+def test_filters_and_sort():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_queryable_scraper(tmp_dir)
+        data = fetch(scraper, '/api/opportunities?days=30&borough=brooklyn&min_value=300000'
+                              '&min_confidence=85&sort=value_asc').get_json()
+
+        assert data['success']
+        assert [opp['id'] for opp in data['opportunities']] == [5, 7, 9, 11]
+        assert data['total_matches'] == 4
+        assert data['stats']['total_opportunities'] == 4
+        assert data['stats']['average_value'] == 800000
+        assert data['next_cursor'] is None
+
+def test_window_still_applies():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_queryable_scraper(tmp_dir)
+        data = fetch(scraper, '/api/opportunities?days=5&sort=date_desc').get_json()
+        assert [opp['id'] for opp in data['opportunities']] == [1, 2, 3, 4]
+
+def test_cursor_pagination_and_top_k():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_queryable_scraper(tmp_dir)
+
+        seen = []
+        path = '/api/opportunities?days=30&sort=value_desc&limit=5'
+        data = fetch(scraper, path).get_json()
+        seen += [opp['id'] for opp in data['opportunities']]
+        while data['next_cursor']:
+            data = fetch(scraper, f"{path}&cursor={data['next_cursor']}").get_json()
+            seen += [opp['id'] for opp in data['opportunities']]
+        assert seen == list(range(12, 0, -1))
+
+        top = fetch(scraper, '/api/opportunities?days=30&top=3').get_json()
+        assert [opp['id'] for opp in top['opportunities']] == [12, 11, 10]
+        assert top['next_cursor'] is None
+        assert top['total_matches'] == 12
+
+def test_invalid_parameters():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_queryable_scraper(tmp_dir)
+        assert fetch(scraper, '/api/opportunities?sort=roi').status_code == 400
+        assert fetch(scraper, '/api/opportunities?min_value=cheap').status_code == 400
+
+        cursor = fetch(scraper, '/api/opportunities?limit=2').get_json()['next_cursor']
+        scraper._save_cache([make_opportunity(1, 1)])
+        assert fetch(scraper, f'/api/opportunities?limit=2&cursor={cursor}').status_code == 400
+
+if __name__ == "__main__":
+    test_filters_and_sort()
+    test_window_still_applies()
+    test_cursor_pagination_and_top_k()
+    test_invalid_parameters()
+    print("✅ Opportunity query tests passed")
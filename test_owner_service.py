@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test the property owner service: single-flight lookups and the batch endpoint
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from app import app, PropertyOwnerService
+
+def make_owner_service(tmp_dir, owners, release=None):
+    """Owner service with its cache in tmp_dir and lookups answered from a dict"""
+    service = PropertyOwnerService(os.path.join(tmp_dir, 'owner_lookup_cache.json'))
+    service.calls = []
+
+    def lookup(address, borough):
+        service.calls.append((address, borough))
+        if release is not None:
+            release.wait(5)
+        return owners.get(address, 'Owner information not available')
+
+    service._lookup = lookup
+    return service
+
+def test_concurrent_lookups_share_one_request():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        release = threading.Event()
+        service = make_owner_service(tmp_dir, {'123 Broadway': 'ACME LLC'}, release)
+
+        keyed = []
+        cache_key = service._cache_key
+        service._cache_key = lambda address, borough: keyed.append(address) or cache_key(address, borough)
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(service.get_owner('123 Broadway', 'Manhattan')))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        # Release the lookup only once every caller has asked for the same address
+        while len(keyed) < 5 or not service.calls:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert results == ['ACME LLC'] * 5
+        assert len(service.calls) == 1
+        assert not service._in_flight
+
+def test_batch_endpoint():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        service = make_owner_service(tmp_dir, {'1 MAIN ST': 'FIRST LLC', '2 MAIN ST': 'SECOND LLC'})
+
+        previous = app_module._owner_service
+        app_module._owner_service = service
+        try:
+            app.config['TESTING'] = True
+            with app.test_client() as client:
+                response = client.post('/api/property-owner/batch', json={'properties': [
+                    {'address': '1 MAIN ST', 'borough': 'Brooklyn'},
+                    {'address': '2 MAIN ST', 'borough': 'Queens'}
+                ]})
+                data = response.get_json()
+                assert data['success']
+                assert [entry['owner'] for entry in data['owners']] == ['FIRST LLC', 'SECOND LLC']
+                assert data['owners'][1]['borough'] == 'Queens'
+
+                single = client.post('/api/property-owner', json={'address': '1 MAIN ST', 'borough': 'Brooklyn'})
+                assert single.get_json()['owner'] == 'FIRST LLC'
+
+                too_many = [{'address': f'{i} MAIN ST', 'borough': 'Bronx'} for i in range(app_module.MAX_OWNER_BATCH + 1)]
+                assert client.post('/api/property-owner/batch', json={'properties': too_many}).status_code == 400
+        finally:
+            app_module._owner_service = previous
+
+if __name__ == "__main__":
+    test_concurrent_lookups_share_one_request()
+    test_batch_endpoint()
+    print("✅ Owner service tests passed")
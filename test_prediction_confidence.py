@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test that ml_confidence comes from the spread of per-tree predictions
+"""
+
+import json
+import os
+import sys
+import tempfile
+import numpy as np
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import FlatForest
+from test_feature_store import make_predictor
+from test_flat_forest import make_model
+
+PROPERTIES = [('123 Broadway', 'Manhattan'), ('456 Spring Street', 'Manhattan'),
+              ('789 Bedford Avenue', 'Brooklyn'), ('30 Ditmars Blvd', 'Queens')]
+
+def test_spread_matches_individual_trees():
+    model = make_model()
+    forest = FlatForest.from_model(model)
+    X = np.random.default_rng(8).normal(size=(300, 8))
+
+    outputs = forest.predict_with_spread(X)
+    per_tree = np.column_stack([estimator.predict(X.astype(np.float32)) for estimator in model.estimators_])
+    assert np.array_equal(outputs[:, 0], model.predict(X))
+    assert np.allclose(outputs[:, 1], per_tree.std(axis=1))
+
+def test_identical_inputs_give_identical_outputs():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        first = make_predictor(tmp_dir).predict_real_estate_values(PROPERTIES)
+        second = make_predictor(tmp_dir).predict_real_estate_values(PROPERTIES)
+        assert json.dumps(first) == json.dumps(second)
+
+        for result in first:
+            assert isinstance(result['ml_confidence'], int)
+            assert 0 <= result['ml_confidence'] <= 100
+
+def test_confidence_falls_as_trees_disagree():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        predictor = make_predictor(tmp_dir)
+        predictor.prediction_memo = None
+        entries = predictor.address_feature_entries(PROPERTIES)
+        scaled = predictor.scale_features([entry['features'] for entry in entries])
+        mean, spread = predictor.forest.predict_with_spread(scaled).T
+
+        confidences = [result['ml_confidence'] for result in predictor.predict_real_estate_values(PROPERTIES)]
+        expected = np.round(100 * (1 - spread / mean)).astype(int).tolist()
+        assert confidences == expected
+
+if __name__ == "__main__":
+    test_spread_matches_individual_trees()
+    test_identical_inputs_give_identical_outputs()
+    test_confidence_falls_as_trees_disagree()
+    print("✅ Prediction confidence tests passed")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test the quantized prediction memo in front of the Random Forest
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import PredictionMemo, PREDICTION_MEMO_MAX_ERROR, PREDICTION_MEMO_DECIMALS
+from benchmark_prediction_memo import sample_features
+from test_feature_store import make_predictor
+
+def counting_model(calls):
+    def model_predict(rows):
+        calls.append(len(rows))
+        return rows.sum(axis=1)
+    return model_predict
+
+def test_nearby_vectors_share_one_evaluation():
+    calls = []
+    memo = PredictionMemo(decimals=2)
+    rows = np.array([[1.001, -0.004], [0.998, 0.002], [3.0, 1.0]])
+
+    first = memo.predict(rows, counting_model(calls))
+    assert calls == [2]
+    # Both near-identical rows get the prediction for the rounded vector
+    assert first.tolist() == [1.0, 1.0, 4.0]
+
+    again = memo.predict(rows[:1], counting_model(calls))
+    assert calls == [2] and again.tolist() == [1.0]
+    assert memo.stats() == {'hits': 2, 'misses': 2, 'hit_rate': 0.5, 'size': 2}
+
+def test_lru_is_bounded():
+    calls = []
+    memo = PredictionMemo(decimals=0, max_size=2)
+    model_predict = counting_model(calls)
+    for value in (1.0, 2.0, 1.0, 3.0):
+        memo.predict(np.array([[value]]), model_predict)
+    assert len(memo) == 2
+
+    # 1.0 was used more recently than 2.0, so 2.0 was evicted
+    memo.predict(np.array([[1.0]]), model_predict)
+    memo.predict(np.array([[2.0]]), model_predict)
+    assert calls == [1, 1, 1, 1]
+
+def test_quantization_error_under_threshold():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        predictor = make_predictor(tmp_dir)
+        features_scaled = sample_features(predictor, 1000)
+        error = predictor.prediction_memo.quantization_error(features_scaled, predictor.forest.predict)
+        assert predictor.prediction_memo.decimals == PREDICTION_MEMO_DECIMALS
+        assert error['mean'] <= PREDICTION_MEMO_MAX_ERROR
+
+        # Valuations go through the memo and repeat exactly
+        first = predictor.predict_real_estate_value('123 Broadway', 'Manhattan')
+        second = predictor.predict_real_estate_value('123 Broadway', 'Manhattan')
+        assert first == second
+        assert predictor.prediction_memo.stats()['hits'] == 1
+
+if __name__ == "__main__":
+    test_nearby_vectors_share_one_evaluation()
+    test_lru_is_bounded()
+    test_quantization_error_under_threshold()
+    print("✅ Prediction memo tests passed")
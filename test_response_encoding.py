@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test pre-encoded /api/opportunities responses, content-coding and ETag revalidation
+"""
+
+import gzip
+import json
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from app import MAX_ENCODED_WINDOWS, app
+from test_snapshot import make_opportunity, make_scraper
+
+def fetch(scraper, path, headers=None):
+    """GET path against the app with scraper installed as the serving instance"""
+    previous = app_module.scraper_instance
+    app_module.scraper_instance = scraper
+    try:
+        app.config['TESTING'] = True
+        with app.test_client() as client:
+            return client.get(path, headers=headers or {})
+    finally:
+        app_module.scraper_instance = previous
+
+def test_common_windows_are_encoded_on_publish():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir)
+        scraper._save_cache([make_opportunity(1, 2), make_opportunity(2, 20)])
+
+        encoded = scraper.snapshot.encoded_response(30)
+        # Same object every time - encoded once per snapshot
+        assert encoded is scraper.snapshot.encoded_response(30)
+        assert 'gzip' in encoded.bodies
+
+        # The dashboard's columnar requests are served from the warmed snapshot too
+        wire_payload = app_module._wire_payload
+        app_module._wire_payload = None
+        try:
+            for days in app_module.PRECOMPUTED_WINDOWS:
+                assert scraper.snapshot.encoded_response(days, 'columnar') is not None
+                response = fetch(scraper, f'/api/opportunities?days={days}&format=columnar')
+                assert response.get_json()['format'] == 'columnar'
+        finally:
+            app_module._wire_payload = wire_payload
+
+def test_user_keyed_entries_do_not_evict_common_windows():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir)
+        scraper._save_cache([make_opportunity(i, i % 60) for i in range(1, 50)])
+        snapshot = scraper.snapshot
+        for size in range(1, MAX_ENCODED_WINDOWS + 10):
+            snapshot.encoded_aggregates(30, bin_edges=[0, size * 1000, 10 ** 7])
+        columnar = snapshot.encoded_response(30, 'columnar')
+        assert snapshot.encoded_response(30, 'columnar') is columnar
+
+        # Other windows are kept in a bounded LRU, most recently used last to go
+        other = snapshot.encoded_response(45)
+        for days in range(100, 100 + MAX_ENCODED_WINDOWS - 1):
+            snapshot.encoded_response(days)
+            assert snapshot.encoded_response(45) is other
+        for days in range(200, 200 + MAX_ENCODED_WINDOWS):
+            snapshot.encoded_response(days)
+        assert snapshot.encoded_response(45) is not other
+
+def test_gzip_response_and_not_modified():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir)
+        scraper._save_cache([make_opportunity(1, 2), make_opportunity(2, 20)])
+
+        response = fetch(scraper, '/api/opportunities?days=30', {'Accept-Encoding': 'gzip'})
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.headers['Vary'] == 'Accept-Encoding'
+        data = json.loads(gzip.decompress(response.data))
+        assert data['success']
+        assert len(data['opportunities']) == 2
+        assert data['stats']['total_opportunities'] == 2
+
+        etag = response.headers['ETag']
+        cached = fetch(scraper, '/api/opportunities?days=30', {'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        assert cached.status_code == 304
+        assert cached.data == b''
+
+def test_new_snapshot_changes_etag():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir)
+        scraper._save_cache([make_opportunity(1, 2)])
+        etag = fetch(scraper, '/api/opportunities?days=7').headers['ETag']
+
+        scraper._save_cache([make_opportunity(1, 2), make_opportunity(2, 3)])
+        response = fetch(scraper, '/api/opportunities?days=7', {'If-None-Match': etag})
+        assert response.status_code == 200
+        assert 'Content-Encoding' not in response.headers
+        assert len(response.get_json()['opportunities']) == 2
+
+if __name__ == "__main__":
+    test_common_windows_are_encoded_on_publish()
+    test_user_keyed_entries_do_not_evict_common_windows()
+    test_gzip_response_and_not_modified()
+    test_new_snapshot_changes_etag()
+    print("✅ Response encoding tests passed")
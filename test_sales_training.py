@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test out-of-core training from a sales CSV
+"""
+
+import csv
+import os
+import sys
+import tempfile
+import numpy as np
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import ModelRegistry, train_model_version
+from test_feature_store import make_predictor
+from train_model import ReservoirSample, sales_feature_chunks, sample_sales
+
+HEADER = ['BOROUGH', 'NEIGHBORHOOD', 'ADDRESS', 'GROSS SQUARE FEET', 'SALE PRICE', 'SALE DATE', 'Latitude', 'Longitude']
+SALES = [
+    ['1', 'TRIBECA', '12 FRANKLIN STREET', '4,000', '$2,400,000', '2024-03-01', '40.7195', '-74.0089'],
+    ['3', 'WILLIAMSBURG', '150 BEDFORD AVENUE', '2,500', '$1,000,000', '2024-03-02', '', ''],
+    ['4', 'ASTORIA', '30 DITMARS BLVD', '3,000', '0', '2024-03-03', '', ''],  # Not a market sale
+    ['2', 'FORDHAM', '2400 GRAND CONCOURSE', '0', '$900,000', '2024-03-04', '', ''],  # No floor area
+    ['MANHATTAN', 'SOHO', '100 SPRING STREET', '5,000', '$4,000,000', '2024-03-05', '', '']
+]
+
+def write_sales(path, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+
+def test_reservoir_is_bounded_and_uniform():
+    sample = ReservoirSample(1000, 1, seed=4)
+    values = np.arange(20000, dtype=np.float64)
+    for start in range(0, len(values), 700):
+        batch = values[start:start + 700]
+        sample.add(batch[:, None], batch)
+        assert len(sample) <= 1000
+
+    X, y = sample.data()
+    assert len(y) == 1000 and sample.seen == 20000
+    assert np.array_equal(X[:, 0], y) and len(np.unique(y)) == 1000
+    # Every row had the same chance, so about half come from each half of the stream
+    assert 0.44 < np.mean(y < 10000) < 0.56
+
+    small = ReservoirSample(10, 1)
+    small.add(values[:4, None], values[:4])
+    assert small.data()[1].tolist() == [0.0, 1.0, 2.0, 3.0]
+
+def test_sales_are_cleaned_geocoded_and_featurized():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        predictor = make_predictor(tmp_dir)
+        path = os.path.join(tmp_dir, 'sales.csv')
+        write_sales(path, SALES)
+        geocoding_cache = dict(predictor.geocoding_cache)
+
+        chunks = list(sales_feature_chunks(predictor, path, chunk_rows=2))
+        assert [rows_read for _, _, rows_read in chunks] == [2, 2, 1]
+        X = np.vstack([features for features, _, _ in chunks])
+        y = np.concatenate([prices for _, prices, _ in chunks])
+        assert y.tolist() == [600.0, 400.0, 800.0]
+
+        # Listed coordinates are used as is, the rest come from the pattern geocoder
+        points = [(40.7195, -74.0089), predictor._geocode_with_pattern_matching('150 BEDFORD AVENUE', 'Brooklyn'),
+                  predictor._geocode_with_pattern_matching('100 SPRING STREET', 'Manhattan')]
+        points = np.array([point if isinstance(point, tuple) else (point['lat'], point['lng']) for point in points])
+        assert np.array_equal(X, predictor.feature_matrix(points[:, 0], points[:, 1])[1])
+        assert predictor.geocoding_cache == geocoding_cache
+
+def test_sampled_sales_train_a_registered_version():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        predictor = make_predictor(tmp_dir)
+        path = os.path.join(tmp_dir, 'sales.csv')
+        write_sales(path, SALES * 40)
+
+        X, y, stats = sample_sales(predictor, path, chunk_rows=50, buffer_rows=60)
+        assert stats['rows_read'] == 200 and stats['rows_valid'] == 120 and stats['rows_sampled'] == 60
+        assert X.shape == (60, 8) and stats['rows_per_second'] > 0
+
+        registry = ModelRegistry(os.path.join(tmp_dir, 'registry'))
+        version, manifest = train_model_version(predictor, registry, params={'n_estimators': 5}, training_data=(X, y),
+                                                source='sales_csv', ingest=stats)
+        assert manifest['source'] == 'sales_csv' and manifest['ingest'] == stats
+        assert manifest['training_rows'] == 60 and manifest['holdout_rows'] == 12
+
+if __name__ == "__main__":
+    test_reservoir_is_bounded_and_uniform()
+    test_sales_are_cleaned_geocoded_and_featurized()
+    test_sampled_sales_train_a_registered_version()
+    print("✅ Sales CSV training tests passed")
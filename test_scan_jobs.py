@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Test the scan job queue: coalescing, progress polling and snapshot merging
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from app import app, ScanJobQueue, ScanQueueFull
+from test_snapshot import make_opportunity
+from test_ndjson_streaming import NDJSON, make_cold_scraper, make_record
+
+def make_blocking_scraper(tmp_dir, release):
+    """Scraper whose first API page is held back until release is set"""
+    fetched = []
+    pages = [[make_record('1', 'FIRST PIZZA', 1), make_record('2', 'SECOND', 2, '45')]]
+    scraper = make_cold_scraper(tmp_dir, pages, fetched)
+    iter_pages = scraper.iter_closed_restaurant_pages
+
+    def blocking_pages(days_back=30):
+        release.wait(5)
+        yield from iter_pages(days_back)
+
+    scraper.iter_closed_restaurant_pages = blocking_pages
+    return scraper, fetched
+
+def test_identical_scans_coalesce():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        release = threading.Event()
+        scraper, fetched = make_blocking_scraper(tmp_dir, release)
+        queue = ScanJobQueue(lambda: scraper)
+
+        first, coalesced_first = queue.submit(days=7)
+        second, coalesced_second = queue.submit(days=7)
+        other, _ = queue.submit(days=14)
+
+        assert not coalesced_first and coalesced_second
+        assert first is second
+        assert first.subscribers == 2
+        assert other is not first
+
+        release.set()
+        assert first.wait(10) and other.wait(10)
+        assert first.status == 'done'
+        assert first.to_dict()['progress'] == {'pages_fetched': 1, 'records_fetched': 2, 'opportunities_processed': 2}
+        # One crawl per distinct scan, not per request
+        assert len(fetched) == 2
+
+        # A finished job no longer absorbs new requests
+        third, coalesced_third = queue.submit(days=7)
+        assert not coalesced_third
+        third.wait(10)
+
+def test_queue_is_bounded():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        release = threading.Event()
+        scraper, _ = make_blocking_scraper(tmp_dir, release)
+        queue = ScanJobQueue(lambda: scraper, max_workers=1, max_pending=1)
+
+        job, _ = queue.submit(days=7)
+        try:
+            queue.submit(days=30)
+        except ScanQueueFull:
+            pass
+        else:
+            raise AssertionError("second distinct scan should be rejected")
+        finally:
+            release.set()
+            job.wait(10)
+
+def test_results_merge_into_snapshot_and_poll():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        release = threading.Event()
+        release.set()
+        scraper, _ = make_blocking_scraper(tmp_dir, release)
+        old = make_opportunity(99, 20)
+        scraper._save_cache([old])
+
+        previous_instance, previous_jobs = app_module.scraper_instance, app_module.scan_jobs
+        app_module.scraper_instance = scraper
+        app_module.scan_jobs = ScanJobQueue(lambda: scraper)
+        try:
+            app.config['TESTING'] = True
+            with app.test_client() as client:
+                response = client.post('/api/scan', json={'days': 7, 'async': True})
+                assert response.status_code == 202
+                job_id = response.get_json()['job_id']
+
+                app_module.scan_jobs.get(job_id).wait(10)
+                status = client.get(f'/api/scan/{job_id}').get_json()
+                assert status['status'] == 'done'
+                assert [opp['name'] for opp in status['opportunities']] == ['FIRST PIZZA', 'SECOND']
+
+                assert client.get('/api/scan/missing').status_code == 404
+        finally:
+            app_module.scraper_instance, app_module.scan_jobs = previous_instance, previous_jobs
+
+        names = {opp['name'] for opp in scraper.snapshot.opportunities}
+        assert names == {'FIRST PIZZA', 'SECOND', old['name']}
+
+def test_ndjson_scan_runs_through_the_queue():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        release = threading.Event()
+        release.set()
+        scraper, fetched = make_blocking_scraper(tmp_dir, release)
+
+        previous_instance, previous_jobs = app_module.scraper_instance, app_module.scan_jobs
+        app_module.scraper_instance = scraper
+        app_module.scan_jobs = ScanJobQueue(lambda: scraper)
+        try:
+            app.config['TESTING'] = True
+            with app.test_client() as client:
+                response = client.post('/api/scan', json={'days': 7}, headers=NDJSON)
+                lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        finally:
+            app_module.scraper_instance, app_module.scan_jobs = previous_instance, previous_jobs
+
+        assert [line['opportunity']['name'] for line in lines[:-1]] == ['FIRST PIZZA', 'SECOND']
+        summary = lines[-1]
+        assert summary['success'] and not summary['coalesced']
+        assert summary['job_id'] and len(fetched) == 1
+        # Streamed results are published like any other scan
+        assert {opp['name'] for opp in scraper.snapshot.opportunities} == {'FIRST PIZZA', 'SECOND'}
+
+def test_scan_responds_with_results_by_default():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        release = threading.Event()
+        release.set()
+        scraper, _ = make_blocking_scraper(tmp_dir, release)
+
+        previous_instance, previous_jobs = app_module.scraper_instance, app_module.scan_jobs
+        app_module.scraper_instance = scraper
+        app_module.scan_jobs = ScanJobQueue(lambda: scraper)
+        try:
+            app.config['TESTING'] = True
+            with app.test_client() as client:
+                response = client.post('/api/scan', json={'days': 7})
+        finally:
+            app_module.scraper_instance, app_module.scan_jobs = previous_instance, previous_jobs
+
+        data = response.get_json()
+        assert response.status_code == 200 and data['success']
+        assert [opp['name'] for opp in data['opportunities']] == ['FIRST PIZZA', 'SECOND']
+        assert data['stats']['total_opportunities'] == 2
+
+def test_busy_queue_and_slow_scans_ask_clients_to_retry():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        release = threading.Event()
+        scraper, _ = make_blocking_scraper(tmp_dir, release)
+
+        previous_instance, previous_jobs = app_module.scraper_instance, app_module.scan_jobs
+        previous_wait = app_module.SCAN_WAIT_SECONDS
+        app_module.scraper_instance = scraper
+        app_module.SCAN_WAIT_SECONDS = 0.1
+        try:
+            app.config['TESTING'] = True
+            with app.test_client() as client:
+                app_module.scan_jobs = ScanJobQueue(lambda: scraper, max_pending=0)
+                for response in (client.get('/api/opportunities'),
+                                 client.get('/api/opportunities', headers=NDJSON),
+                                 client.post('/api/scan', json={'days': 7}),
+                                 client.post('/api/scan', json={'days': 7}, headers=NDJSON)):
+                    assert response.status_code == 429
+                    assert response.headers['Retry-After'] == str(app_module.SCAN_RETRY_AFTER_SECONDS)
+
+                # A cold request gives up on a scan that outlasts the wait, but the scan keeps going
+                app_module.scan_jobs = ScanJobQueue(lambda: scraper)
+                response = client.get('/api/opportunities')
+                assert response.status_code == 503 and 'Retry-After' in response.headers
+                job_id = response.get_json()['job_id']
+
+                response = client.post('/api/scan', json={'days': 30})
+                assert response.status_code == 202
+                assert response.get_json()['job_id'] == job_id
+                response = client.post('/api/scan', json={'days': 30}, headers={'Prefer': 'respond-async'})
+                assert response.status_code == 202 and response.get_json()['coalesced']
+
+                release.set()
+                assert app_module.scan_jobs.get(job_id).wait(10)
+                assert client.get('/api/opportunities').get_json()['success']
+        finally:
+            release.set()
+            app_module.scraper_instance, app_module.scan_jobs = previous_instance, previous_jobs
+            app_module.SCAN_WAIT_SECONDS = previous_wait
+
+def test_predictor_is_built_once():
+    built = []
+
+    class SlowPredictor:
+        def __init__(self):
+            built.append(self)
+            time.sleep(0.1)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_cold_scraper(tmp_dir, [], [])
+        scraper.re_predictor = None
+        previous, previous_instance = app_module.NYCRealEstatePricePredictor, app_module.predictor_instance
+        app_module.NYCRealEstatePricePredictor = SlowPredictor
+        try:
+            workers = [threading.Thread(target=scraper._ensure_predictor_loaded) for _ in range(4)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        finally:
+            app_module.NYCRealEstatePricePredictor, app_module.predictor_instance = previous, previous_instance
+
+        assert len(built) == 1 and scraper.re_predictor is built[0]
+
+if __name__ == "__main__":
+    test_identical_scans_coalesce()
+    test_queue_is_bounded()
+    test_results_merge_into_snapshot_and_poll()
+    test_ndjson_scan_runs_through_the_queue()
+    test_scan_responds_with_results_by_default()
+    test_busy_queue_and_slow_scans_ask_clients_to_retry()
+    test_predictor_is_built_once()
+    print("✅ Scan job tests passed")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test that refreshed data is swapped into the serving snapshot atomically
+"""
+
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from app import app, RestaurantScraper, OpportunitySnapshot
+
+def make_opportunity(opp_id, days_ago, value=1000000):
+    """Build an opportunity record shaped like clean_and_process_data output"""
+    return {
+        'id': opp_id,
+        'name': f'Restaurant {opp_id}',
+        'address': f'{opp_id} BROADWAY',
+        'neighborhood': 'Financial District',
+        'borough': 'Manhattan',
+        'lat': 40.7074,
+        'lng': -74.0113,
+        'totalValue': value,
+        'pricePerSqft': 300,
+        'sqft': 3500,
+        'violationDate': (datetime.now() - timedelta(days=days_ago)).strftime('%Y-%m-%d'),
+        'violationType': 'Establishment Closed by DOHMH.',
+        'mlConfidence': 90,
+        'waterScore': 3.0,
+        'transitScore': 8.0,
+        'safetyScore': 7.5,
+        'propertyOwner': 'Owner lookup disabled',
+        'phone': ''
+    }
+
+def make_scraper(tmp_dir):
+    """Scraper whose violations cache lives in a temp directory"""
+    scraper = RestaurantScraper(lazy_init=True)
+    scraper.cache_file = os.path.join(tmp_dir, 'violations_cache.json')
+    scraper.snapshot = None
+    scraper.cached_data = None
+    scraper.cache_version = 0
+    return scraper
+
+def test_save_cache_publishes_new_snapshot():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir)
+
+        scraper._save_cache([make_opportunity(1, 2)])
+        first = scraper.snapshot
+        assert first.version == 1
+        assert len(first) == 1
+
+        scraper._save_cache([make_opportunity(1, 2), make_opportunity(2, 3)])
+        second = scraper.snapshot
+        assert second.version == 2
+        assert len(second) == 2
+        # The previous snapshot is untouched by the refresh
+        assert len(first) == 1
+
+        with open(scraper.cache_file) as f:
+            on_disk = json.load(f)
+        assert on_disk['version'] == 2
+        assert on_disk['total_count'] == 2
+        # No temp files are left behind by the rename
+        assert os.listdir(tmp_dir) == ['violations_cache.json']
+
+def test_snapshot_is_immutable():
+    snapshot = OpportunitySnapshot([make_opportunity(1, 1)], 3, '2025-01-01T00:00:00')
+    try:
+        snapshot.version = 4
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("snapshot attributes should not be assignable")
+    assert isinstance(snapshot.opportunities, tuple)
+
+def test_date_index_windows():
+    opportunities = [make_opportunity(1, 10), make_opportunity(2, 6), make_opportunity(3, 7),
+                     make_opportunity(4, 0), {'id': 5, 'violationDate': ''}, make_opportunity(6, 6)]
+    snapshot = OpportunitySnapshot(opportunities, 1, '2025-01-01T00:00:00')
+
+    # Newest first, same-day records keep their original order, undated records are skipped
+    assert [opp['id'] for opp in snapshot.get_opportunities(7)] == [4, 2, 6]
+    assert [opp['id'] for opp in snapshot.get_opportunities(30)] == [4, 2, 6, 3, 1]
+    assert snapshot.get_opportunities(0) == []
+
+    # Windows share one set of record dicts, records past the longest precomputed window included
+    assert snapshot.get_opportunities(7)[0] is snapshot.get_opportunities(30)[0] is snapshot.records([0])[0]
+    old = OpportunitySnapshot([make_opportunity(1, 1), make_opportunity(2, 200)], 1, '2025-01-01T00:00:00')
+    assert [opp['id'] for opp in old.get_opportunities(365)] == [1, 2]
+    assert [opp['id'] for opp in old.records([1, 0])] == [2, 1]
+    assert [opp['id'] for opp in old.opportunities] == [1, 2]
+
+def test_api_reports_version_and_generated_at():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir)
+        scraper._save_cache([make_opportunity(1, 2), make_opportunity(2, 40)])
+
+        previous = app_module.scraper_instance
+        app_module.scraper_instance = scraper
+        try:
+            app.config['TESTING'] = True
+            with app.test_client() as client:
+                data = client.get('/api/opportunities?days=7').get_json()
+        finally:
+            app_module.scraper_instance = previous
+
+        assert data['success']
+        assert data['version'] == scraper.snapshot.version
+        assert data['generated_at'] == scraper.snapshot.generated_at
+        assert [opp['id'] for opp in data['opportunities']] == [1]
+
+if __name__ == "__main__":
+    test_save_cache_publishes_new_snapshot()
+    test_snapshot_is_immutable()
+    test_date_index_windows()
+    test_api_reports_version_and_generated_at()
+    print("✅ Snapshot tests passed")
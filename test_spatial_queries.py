@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test radius, nearest, bbox and polygon queries on /api/spatial
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import MAX_ENCODED_WINDOWS, NYCRealEstatePricePredictor
+from test_clusters import make_cluster_scraper
+from test_response_encoding import fetch
+
+TIMES_SQUARE = (40.7580, -73.9855)
+
+def haversine(lat1, lng1, lat2, lng2):
+    # calculate_distance doesn't use the predictor's state
+    return NYCRealEstatePricePredictor.calculate_distance(None, lat1, lng1, lat2, lng2)
+
+def test_radius_matches_calculate_distance():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_cluster_scraper(tmp_dir)
+        data = fetch(scraper, '/api/spatial?lat=40.7580&lng=-73.9855&radius_miles=0.5').get_json()
+
+        assert data['success']
+        assert [opp['id'] for opp in data['opportunities']] == [2, 1, 3]
+        for opp in data['opportunities']:
+            assert abs(opp['distance_miles'] - haversine(*TIMES_SQUARE, opp['lat'], opp['lng'])) < 1e-3
+            assert opp['distance_miles'] <= 0.5
+
+def test_nearest():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_cluster_scraper(tmp_dir)
+        data = fetch(scraper, '/api/spatial?lat=40.6930&lng=-73.9900&k=3').get_json()
+        assert [opp['id'] for opp in data['opportunities']] == [4, 5, 3]
+        distances = [opp['distance_miles'] for opp in data['opportunities']]
+        assert distances == sorted(distances)
+
+        # The BallTree is built once per window even after many other results are cached
+        snapshot = scraper.snapshot
+        index = snapshot.spatial_index(30)
+        for size in range(1, MAX_ENCODED_WINDOWS + 5):
+            snapshot.encoded_aggregates(30, bin_edges=[0, size * 1000, 10 ** 7])
+        assert snapshot.spatial_index(30) is index
+
+def test_bbox_and_polygon():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_cluster_scraper(tmp_dir)
+        brooklyn = fetch(scraper, '/api/spatial?bbox=-74.0,40.68,-73.98,40.70').get_json()
+        assert [opp['id'] for opp in brooklyn['opportunities']] == [4, 5]
+
+        # Triangle around Midtown that leaves out the northernmost closure
+        triangle = '40.750,-74.000;40.750,-73.970;40.7560,-73.985'
+        data = fetch(scraper, f'/api/spatial?polygon={triangle}').get_json()
+        assert [opp['id'] for opp in data['opportunities']] == [1, 3]
+
+def test_invalid_queries():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_cluster_scraper(tmp_dir)
+        assert fetch(scraper, '/api/spatial?lat=40.7').status_code == 400
+        assert fetch(scraper, '/api/spatial?lat=40.7&lng=-73.9&k=0').status_code == 400
+        assert fetch(scraper, '/api/spatial?polygon=40.7,-73.9;40.8,-73.9').status_code == 400
+
+if __name__ == "__main__":
+    test_radius_matches_calculate_distance()
+    test_nearest()
+    test_bbox_and_polygon()
+    test_invalid_queries()
+    print("✅ Spatial query tests passed")
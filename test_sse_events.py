@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test the /api/events Server-Sent Events stream
+"""
+
+import json
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from app import app, snapshot_events
+from test_snapshot import make_opportunity, make_scraper
+
+def parse_event(chunk):
+    """Fields of one SSE message"""
+    fields = dict(line.split(': ', 1) for line in chunk.decode('utf-8').strip().split('\n'))
+    if 'data' in fields:
+        fields['data'] = json.loads(fields['data'])
+    return fields
+
+def open_stream(client, path, headers=None):
+    response = client.get(path, headers=headers or {}, buffered=False)
+    assert response.mimetype == 'text/event-stream'
+    chunks = iter(response.response)
+    assert next(chunks).startswith(b'retry: ')
+    return response, chunks
+
+def test_pushes_deltas_and_resumes():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir)
+        scraper._save_cache([make_opportunity(1, 1), make_opportunity(2, 2)])
+        first = scraper.snapshot.version
+
+        previous = app_module.scraper_instance
+        app_module.scraper_instance = scraper
+        try:
+            app.config['TESTING'] = True
+            with app.test_client() as client:
+                response, chunks = open_stream(client, '/api/events?days=30')
+                event = parse_event(next(chunks))
+                assert event['event'] == 'version' and event['id'] == str(first)
+
+                # A refresh wakes the stream with just the delta
+                scraper._save_cache([make_opportunity(1, 1), make_opportunity(3, 3)])
+                event = parse_event(next(chunks))
+                assert event['event'] == 'opportunities'
+                assert event['id'] == str(first + 1)
+                assert [opp['id'] for opp in event['data']['added']] == [3]
+                assert event['data']['removed'] == [2]
+                response.close()
+
+                # Reconnecting with Last-Event-ID replays what was missed
+                scraper._save_cache([make_opportunity(1, 1, value=5), make_opportunity(3, 3)])
+                response, chunks = open_stream(client, '/api/events', {'Last-Event-ID': str(first)})
+                event = parse_event(next(chunks))
+                assert event['id'] == str(first + 2)
+                assert [opp['id'] for opp in event['data']['added']] == [3]
+                assert [opp['id'] for opp in event['data']['changed']] == [1]
+                response.close()
+        finally:
+            app_module.scraper_instance = previous
+
+def test_heartbeat_and_client_limit():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir)
+        scraper._save_cache([make_opportunity(1, 1)])
+
+        previous = app_module.scraper_instance, app_module.SSE_HEARTBEAT_SECONDS, snapshot_events.max_clients
+        app_module.scraper_instance = scraper
+        app_module.SSE_HEARTBEAT_SECONDS = 0.05
+        try:
+            app.config['TESTING'] = True
+            with app.test_client() as client:
+                connected = snapshot_events.clients
+                response, chunks = open_stream(client, f'/api/events?since={scraper.snapshot.version}')
+                assert next(chunks) == b': heartbeat\n\n'
+                assert snapshot_events.clients == connected + 1
+                response.close()
+                assert snapshot_events.clients == connected
+
+                snapshot_events.max_clients = snapshot_events.clients
+                assert client.get('/api/events').status_code == 503
+        finally:
+            app_module.scraper_instance, app_module.SSE_HEARTBEAT_SECONDS, snapshot_events.max_clients = previous
+
+if __name__ == "__main__":
+    test_pushes_deltas_and_resumes()
+    test_heartbeat_and_client_limit()
+    print("✅ SSE event tests passed")
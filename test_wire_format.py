@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test the columnar and MessagePack wire formats for /api/opportunities
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from test_snapshot import make_opportunity, make_scraper
+from test_response_encoding import fetch
+
+def decode_columnar(table):
+    """Python version of decodeColumnar in script.js"""
+    return [
+        {field: table['dictionaries'][field][table['columns'][field][i]] if field in table['dictionaries']
+         else table['columns'][field][i]
+         for field in table['fields'] if table['columns'][field][i] is not None}
+        for i in range(table['count'])
+    ]
+
+def make_wire_scraper(tmp_dir):
+    opportunities = [make_opportunity(i, i, value=i * 100000) for i in range(1, 6)]
+    opportunities[2]['borough'] = 'Brooklyn'
+    scraper = make_scraper(tmp_dir)
+    scraper._save_cache(opportunities)
+    return scraper
+
+def test_columnar_decodes_to_json_records():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_wire_scraper(tmp_dir)
+        plain = fetch(scraper, '/api/opportunities?days=30')
+        columnar = fetch(scraper, '/api/opportunities?days=30&format=columnar')
+
+        data = columnar.get_json()
+        assert data['format'] == 'columnar'
+        assert data['stats'] == plain.get_json()['stats']
+        assert decode_columnar(data['opportunities']) == plain.get_json()['opportunities']
+        # Repeated strings are sent once
+        assert data['opportunities']['dictionaries']['violationType'] == ['Establishment Closed by DOHMH.']
+        assert data['opportunities']['dictionaries']['borough'] == ['Manhattan', 'Brooklyn']
+
+        assert len(columnar.data) < len(plain.data)
+        assert columnar.headers['ETag'] != plain.headers['ETag']
+
+def test_columnar_query_mode():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_wire_scraper(tmp_dir)
+        data = fetch(scraper, '/api/opportunities?days=30&sort=value_asc&limit=2&format=columnar').get_json()
+        assert [opp['id'] for opp in decode_columnar(data['opportunities'])] == [1, 2]
+        assert data['next_cursor']
+
+def test_msgpack_and_invalid_formats():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_wire_scraper(tmp_dir)
+        assert fetch(scraper, '/api/opportunities?format=xml').status_code == 400
+
+        if app_module.msgpack is None:
+            assert fetch(scraper, '/api/opportunities?format=msgpack').status_code == 400
+            return
+
+        response = fetch(scraper, '/api/opportunities?days=30&format=msgpack')
+        assert response.mimetype == 'application/x-msgpack'
+        data = app_module.msgpack.unpackb(response.data, raw=False)
+        plain = fetch(scraper, '/api/opportunities?days=30').get_json()
+        assert decode_columnar(data['opportunities']) == plain['opportunities']
+
+if __name__ == "__main__":
+    test_columnar_decodes_to_json_records()
+    test_columnar_query_mode()
+    test_msgpack_and_invalid_formats()
+    print("✅ Wire format tests passed")
@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+"""
+Train, list and promote Random Forest versions in the model registry.
+
+    python train_model.py train [--seed 42] [--n-estimators 100] [--max-depth 12] [--promote]
+    python train_model.py list
+    python train_model.py promote v0002
+    python train_model.py search [--random 20] [--workers 4] [--min-r2 0.5] [--register]
+    python train_model.py distill [--teacher v0001] [--n-estimators 10] [--max-depth 8] [--promote]
+    python train_model.py train-csv rolling_sales.csv [--chunk-rows 50000] [--buffer-rows 200000] [--promote]
+
+search cross-validates forest settings in a process pool and reports accuracy,
+inference latency and model size for each, recommending the smallest forest
+that meets the accuracy bar. The training matrix is built once and cached in
+training_features.npz for the workers and later searches.
+
+distill fits a compact forest to the served model's own predictions, reports
+how far it strays from them on held-out rows alongside latency and size, and
+registers it like any other version. Promoting it switches a running server
+to compact mode; promoting the full version switches back.
+
+train-csv trains on real sales instead of synthetic samples. The CSV (NYC
+rolling sales / ACRIS layout) is read in chunks, each chunk is geocoded and
+featurized in one batch, and a fixed-size uniform sample of the rows is kept
+for the fit, so memory stays bounded however large the file is.
+
+A running server picks up a newly promoted version within MODEL_RELOAD_CHECK_SECONDS.
+"""
+
+import argparse
+import concurrent.futures
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import KFold, cross_validate
+
+from app import (FEATURE_SCHEMA_VERSION, MODEL_ARTIFACT_DIR, MODEL_REGISTRY_DIR, RANDOM_FOREST_PARAMS,
+                 TRAINING_SAMPLES_PER_ANCHOR, TRAINING_SEED, FlatForest, ModelRegistry, NYCRealEstatePricePredictor,
+                 train_model_version)
+
+FEATURE_CACHE_FILE = 'training_features.npz'
+SEARCH_GRID = {
+    'n_estimators': [10, 25, 50, 100],
+    'max_depth': [4, 6, 8, 12],
+    'min_samples_leaf': [2, 5]
+}
+SEARCH_FOLDS = 5
+SEARCH_R2_TOLERANCE = 0.01  # Without --min-r2, accept candidates this close to the best CV R²
+LATENCY_REPEAT = 200
+
+# Compact model distilled from the full forest
+DISTILL_PARAMS = {'n_estimators': 10, 'max_depth': 8, 'min_samples_leaf': 2}
+DISTILL_ROWS = 20000  # Rows labeled by the full model to fit the compact one
+DISTILL_HOLDOUT_ROWS = 5000
+
+# Sales CSV training - columns as published in NYC rolling sales files
+SALES_CHUNK_ROWS = 50000
+SALES_BUFFER_ROWS = 200000  # Rows sampled for the fit, whatever the file size
+SALES_COLUMNS = ('BOROUGH', 'ADDRESS', 'GROSS SQUARE FEET', 'SALE PRICE', 'LATITUDE', 'LONGITUDE')
+BOROUGH_CODES = {'1': 'Manhattan', '2': 'Bronx', '3': 'Brooklyn', '4': 'Queens', '5': 'Staten Island'}
+MIN_SALE_PRICE = 10000  # Below this a "sale" is a transfer between related parties, not a market price
+PRICE_PER_SQFT_RANGE = (20, 5000)
+
+# Training matrix each search worker loads once from the cache file
+_worker_matrix = None
+
+def forest_params(args):
+    """Forest settings given on the command line"""
+    return {name: getattr(args, name) for name in ('n_estimators', 'max_depth', 'min_samples_split', 'min_samples_leaf')
+            if getattr(args, name) is not None}
+
+def train(args, registry):
+    version, manifest = train_model_version(NYCRealEstatePricePredictor(), registry, args.seed, forest_params(args),
+                                            args.promote)
+    metrics = manifest['metrics']
+    print(f"🤖 Registered {version}: {manifest['n_trees']} trees, {manifest['node_count']:,} nodes, "
+          f"fit in {manifest['fit_seconds']:.2f} s")
+    print(f"   Holdout R² {metrics['r2']}, RMSE ${metrics['rmse']}/sqft, MAE ${metrics['mae']}/sqft")
+    if args.promote:
+        print(f"🚀 Promoted {version}")
+
+def list_versions(args, registry):
+    promoted = registry.promoted()
+    for version in registry.versions():
+        manifest = registry.manifest(version)
+        marker = '*' if version == promoted else ' '
+        if manifest.get('source') == 'distilled':
+            quality = f"distilled from {manifest['teacher']}, MAE ${manifest['validation']['mae']}/sqft"
+        else:
+            quality = f"R² {manifest.get('metrics', {}).get('r2')}"
+        print(f"{marker} {version}  {manifest.get('trained_at', '')[:19]}  seed {manifest.get('seed')}  "
+              f"{manifest['n_trees']} trees  {quality}  {manifest.get('hyperparameters')}")
+
+def promote(args, registry):
+    registry.promote(args.version)
+    print(f"🚀 Promoted {args.version}")
+
+def cached_training_matrix(predictor, path=FEATURE_CACHE_FILE, seed=TRAINING_SEED,
+                           samples_per_anchor=TRAINING_SAMPLES_PER_ANCHOR):
+    """Training (X, y), rebuilt only when the seed, sample count or feature inputs change"""
+    key = json.dumps({'seed': seed, 'samples_per_anchor': samples_per_anchor,
+                      'feature_fingerprint': predictor._feature_fingerprint()}, sort_keys=True)
+    if os.path.exists(path):
+        with np.load(path) as cached:
+            if str(cached['key']) == key:
+                return cached['X'], cached['y']
+
+    X, y = predictor.synthesize_training_data(seed, samples_per_anchor)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.npz',
+                                    dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, X=X, y=y, key=key)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return X, y
+
+def search_candidates(grid=SEARCH_GRID, sample=None, seed=TRAINING_SEED):
+    """Every combination of the grid, or `sample` of them drawn at random"""
+    names = sorted(grid)
+    candidates = [dict(RANDOM_FOREST_PARAMS, **dict(zip(names, values)))
+                  for values in itertools.product(*(grid[name] for name in names))]
+    if sample is not None and sample < len(candidates):
+        candidates = random.Random(seed).sample(candidates, sample)
+    return candidates
+
+def _init_search_worker(path):
+    global _worker_matrix
+    with np.load(path) as cached:
+        _worker_matrix = cached['X'], cached['y']
+
+def _evaluate_candidate(params, seed, folds):
+    """Cross-validate one candidate, then fit it on every row and return it flattened"""
+    X, y = _worker_matrix
+    # The pool already uses every core, so each fit runs on one
+    model = RandomForestRegressor(**params, random_state=seed, n_jobs=1)
+    scores = cross_validate(model, X, y, cv=KFold(folds, shuffle=True, random_state=seed),
+                            scoring=('r2', 'neg_root_mean_squared_error'))
+    # Standardizing doesn't change which splits a tree picks, so the unscaled fit has the served size
+    forest = FlatForest.from_model(model.fit(X, y))
+    return {
+        'params': params,
+        'r2': float(scores['test_r2'].mean()),
+        'r2_std': float(scores['test_r2'].std()),
+        'rmse': float(-scores['test_neg_root_mean_squared_error'].mean()),
+        'fit_seconds': float(scores['fit_time'].mean()),
+        'forest': forest
+    }
+
+def forest_bytes(forest):
+    arrays = (forest.feature, forest.threshold, forest.children, forest.value, forest.roots, forest.spread)
+    return sum(array.nbytes for array in arrays if array is not None)
+
+def measure_latency(forest, X, rows, repeat=LATENCY_REPEAT):
+    """Median seconds for one predict_with_spread call on `rows` rows of X"""
+    batch = X[np.arange(rows) % len(X)]
+    timings = []
+    for _ in range(max(5, repeat // rows)):
+        start = time.perf_counter()
+        forest.predict_with_spread(batch)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+def run_search(cache_path, candidates, seed=TRAINING_SEED, folds=SEARCH_FOLDS, workers=None):
+    """Cross-validate candidates across a process pool, then time and size each fitted forest"""
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_search_worker,
+                                                initargs=(cache_path,)) as pool:
+        results = list(pool.map(_evaluate_candidate, candidates, itertools.repeat(seed), itertools.repeat(folds)))
+
+    # Timed one at a time in this process, so candidates don't compete for cores
+    with np.load(cache_path) as cached:
+        X = cached['X']
+    for result in results:
+        forest = result.pop('forest')
+        result['nodes'] = len(forest.value)
+        result['model_bytes'] = forest_bytes(forest)
+        result['latency_1_ms'] = measure_latency(forest, X, 1) * 1000
+        result['latency_1000_ms'] = measure_latency(forest, X, 1000) * 1000
+    return results
+
+def choose_candidate(results, min_r2=None, tolerance=SEARCH_R2_TOLERANCE):
+    """Smallest forest meeting min_r2 (or within tolerance of the best score), None if none does"""
+    if min_r2 is None:
+        min_r2 = max(result['r2'] for result in results) - tolerance
+    passing = [result for result in results if result['r2'] >= min_r2]
+    return min(passing, key=lambda result: (result['model_bytes'], -result['r2'])) if passing else None
+
+def search(args, registry):
+    predictor = NYCRealEstatePricePredictor()
+    start = time.perf_counter()
+    X, _ = cached_training_matrix(predictor, args.cache, args.seed)
+    print(f"📦 Training matrix {X.shape[0]:,} x {X.shape[1]} ready in {(time.perf_counter() - start) * 1000:.1f} ms "
+          f"({args.cache})")
+
+    candidates = search_candidates(sample=args.random, seed=args.seed)
+    print(f"🔎 Cross-validating {len(candidates)} candidates, {args.folds} folds each...")
+    start = time.perf_counter()
+    results = run_search(args.cache, candidates, args.seed, args.folds, args.workers)
+    print(f"   Done in {time.perf_counter() - start:.1f} s")
+
+    chosen = choose_candidate(results, args.min_r2)
+    print(f"   {'trees':>5s} {'depth':>5s} {'leaf':>4s} {'CV R²':>13s} {'RMSE':>7s} {'nodes':>7s} "
+          f"{'size':>8s} {'1 row':>8s} {'1k rows':>8s}")
+    for result in sorted(results, key=lambda result: -result['r2']):
+        params = result['params']
+        marker = '*' if result is chosen else ' '
+        print(f" {marker} {params['n_estimators']:5d} {str(params['max_depth']):>5s} {params['min_samples_leaf']:4d} "
+              f"{result['r2']:7.4f}±{result['r2_std']:.3f} {result['rmse']:7.2f} {result['nodes']:7,d} "
+              f"{result['model_bytes'] / 1024:6.0f}KB {result['latency_1_ms']:6.2f}ms {result['latency_1000_ms']:6.1f}ms")
+
+    if chosen is None:
+        print(f"⚠️ No candidate reaches CV R² {args.min_r2}")
+        return
+    print(f"✅ Smallest forest meeting the bar: {chosen['params']}")
+    if args.register:
+        version, manifest = train_model_version(predictor, registry, args.seed, chosen['params'])
+        print(f"🤖 Registered {version} (holdout R² {manifest['metrics']['r2']}), "
+              f"run 'train_model.py promote {version}' to serve it")
+
+def transfer_rows(predictor, rows, seed):
+    """Feature rows for the full model to label: half at addresses across every
+    neighborhood, as served, half drawn like its training data"""
+    rng = np.random.default_rng(seed)
+    registry = predictor.registry
+    ids = rng.integers(len(registry), size=rows // 2)
+    _, served = predictor.feature_matrix(rng.uniform(registry.min_lat[ids], registry.max_lat[ids]),
+                                         rng.uniform(registry.min_lng[ids], registry.max_lng[ids]))
+    samples_per_anchor = -(-(rows - len(served)) // len(registry.training_ids))
+    synthetic, _ = predictor.synthesize_training_data(seed, samples_per_anchor)
+    return np.vstack([served, synthetic[:rows - len(served)]])
+
+def compare_models(full, compact, features_scaled):
+    """Prediction and confidence deltas of the compact model against the full one, plus latency and size of both"""
+    full_outputs = full.predict_with_spread(features_scaled)
+    compact_outputs = compact.predict_with_spread(features_scaled)
+    deltas = np.abs(compact_outputs[:, 0] - full_outputs[:, 0])
+
+    def confidence(outputs):
+        return np.clip(np.round(100 * (1 - outputs[:, 1] / np.maximum(outputs[:, 0], 1.0))), 0, 100)
+
+    report = {
+        'rows': len(features_scaled),
+        'mae': round(float(deltas.mean()), 2),
+        'p95': round(float(np.percentile(deltas, 95)), 2),
+        'max': round(float(deltas.max()), 2),
+        'mean_relative': round(float((deltas / full_outputs[:, 0]).mean()), 4),
+        'confidence_mae': round(float(np.abs(confidence(compact_outputs) - confidence(full_outputs)).mean()), 1)
+    }
+    for name, forest in (('full', full), ('compact', compact)):
+        report[f'{name}_bytes'] = forest_bytes(forest)
+        report[f'{name}_latency_1_ms'] = round(measure_latency(forest, features_scaled, 1) * 1000, 3)
+        report[f'{name}_latency_1000_ms'] = round(measure_latency(forest, features_scaled, 1000) * 1000, 3)
+    return report
+
+def distill_model_version(predictor, registry, teacher=None, params=None, seed=TRAINING_SEED,
+                          rows=DISTILL_ROWS, holdout_rows=DISTILL_HOLDOUT_ROWS, promote=False):
+    """Fit a compact forest to the full model's predictions and register it; returns (version, manifest).
+
+    The teacher is a registry version, or whatever the predictor is serving.
+    The compact model keeps the teacher's scaler, so both read the same features.
+    """
+    if teacher is None:
+        full, scaler_mean, scaler_scale = predictor.forest, predictor.scaler_mean, predictor.scaler_scale
+        teacher = predictor.model_version or MODEL_ARTIFACT_DIR
+    else:
+        full, scaler_mean, scaler_scale, _ = registry.load(teacher)
+
+    def scale(features):
+        return (features - scaler_mean) / scaler_scale
+
+    # Seeds one apart give transfer and holdout rows that don't overlap
+    X = scale(transfer_rows(predictor, rows, seed))
+    holdout = scale(transfer_rows(predictor, holdout_rows, seed + 1))
+
+    params = dict(DISTILL_PARAMS, **(params or {}))
+    start = time.perf_counter()
+    # Fitted on the full model's price and tree spread, so confidence means the same in both modes
+    model = RandomForestRegressor(**params, random_state=seed, n_jobs=-1).fit(X, full.predict_with_spread(X))
+    fit_seconds = time.perf_counter() - start
+    compact = FlatForest.from_model(model)
+
+    metadata = {
+        'source': 'distilled',
+        'teacher': teacher,
+        'seed': seed,
+        'hyperparameters': params,
+        'training_rows': rows,
+        'fit_seconds': round(fit_seconds, 3),
+        'validation': compare_models(full, compact, holdout),
+        'trained_at': datetime.now().isoformat(),
+        'feature_schema_version': FEATURE_SCHEMA_VERSION,
+        'feature_fingerprint': predictor._feature_fingerprint()
+    }
+    version = registry.register(compact, scaler_mean, scaler_scale, metadata)
+    if promote:
+        registry.promote(version)
+    return version, registry.manifest(version)
+
+def distill(args, registry):
+    version, manifest = distill_model_version(NYCRealEstatePricePredictor(), registry, args.teacher,
+                                              forest_params(args), args.seed, promote=args.promote)
+    report = manifest['validation']
+    print(f"🤖 Registered {version}: {manifest['n_trees']} trees, {manifest['node_count']:,} nodes, "
+          f"distilled from {manifest['teacher']} in {manifest['fit_seconds']:.2f} s")
+    print(f"   Against the full model on {report['rows']:,} held-out rows: mean |Δ| ${report['mae']}/sqft "
+          f"({report['mean_relative']:.1%}), p95 ${report['p95']}, max ${report['max']}, "
+          f"confidence within {report['confidence_mae']} points on average")
+    print(f"   {'':8s} {'size':>9s} {'1 row':>9s} {'1k rows':>9s}")
+    for name in ('full', 'compact'):
+        print(f"   {name:8s} {report[f'{name}_bytes'] / 1024:7.0f}KB {report[f'{name}_latency_1_ms']:7.3f}ms "
+              f"{report[f'{name}_latency_1000_ms']:7.2f}ms")
+    print(f"   {report['full_bytes'] / report['compact_bytes']:.1f}x smaller, "
+          f"{report['full_latency_1000_ms'] / report['compact_latency_1000_ms']:.1f}x faster on 1k rows")
+    if args.promote:
+        print(f"🚀 Promoted {version}, serving in compact mode")
+
+class ReservoirSample:
+    """Uniform random sample of at most `capacity` rows from a stream of batches (Algorithm R)"""
+
+    def __init__(self, capacity, n_features, seed=TRAINING_SEED):
+        self.capacity = capacity
+        self.X = np.empty((capacity, n_features))
+        self.y = np.empty(capacity)
+        self.seen = 0
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return min(self.seen, self.capacity)
+
+    def add(self, X, y):
+        # Fill the free slots first
+        free = min(self.capacity - len(self), len(X))
+        self.X[len(self):len(self) + free] = X[:free]
+        self.y[len(self):len(self) + free] = y[:free]
+        self.seen += free
+
+        # Row number t (0-based) replaces a random slot with probability capacity / (t + 1)
+        rest = len(X) - free
+        if rest:
+            slots = self._rng.integers(0, self.seen + np.arange(1, rest + 1))
+            kept = np.flatnonzero(slots < self.capacity)
+            # When rows in one batch pick the same slot, the later one wins, as it would one at a time
+            last = len(kept) - 1 - np.unique(slots[kept][::-1], return_index=True)[1]
+            self.X[slots[kept[last]]] = X[free + kept[last]]
+            self.y[slots[kept[last]]] = y[free + kept[last]]
+            self.seen += rest
+
+    def data(self):
+        return self.X[:len(self)], self.y[:len(self)]
+
+def _numbers(column):
+    return pd.to_numeric(column.str.replace(r'[$,\s]', '', regex=True), errors='coerce')
+
+def sales_feature_chunks(predictor, path, chunk_rows=SALES_CHUNK_ROWS):
+    """Stream a sales CSV, yielding (features, price per sqft, rows read) for each chunk.
+
+    Rows without a market price or floor area are dropped. Rows with
+    coordinates use them; the rest go through the predictor's pattern geocoder,
+    once per distinct address in the chunk and without touching its cache file.
+    """
+    reader = pd.read_csv(path, chunksize=chunk_rows, dtype=str, skipinitialspace=True,
+                         usecols=lambda column: column.strip().upper() in SALES_COLUMNS)
+    for chunk in reader:
+        chunk.columns = [column.strip().upper() for column in chunk.columns]
+        rows_read = len(chunk)
+        price_per_sqft = (_numbers(chunk['SALE PRICE']) / _numbers(chunk['GROSS SQUARE FEET'])).where(
+            _numbers(chunk['SALE PRICE']) >= MIN_SALE_PRICE)
+        chunk = chunk[price_per_sqft.between(*PRICE_PER_SQFT_RANGE)]
+        if chunk.empty:
+            yield np.empty((0, 8)), np.empty(0), rows_read
+            continue
+
+        boroughs = chunk['BOROUGH'].fillna('').str.strip()
+        boroughs = boroughs.map(BOROUGH_CODES).fillna(boroughs.str.title())
+        lats = _numbers(chunk['LATITUDE']) if 'LATITUDE' in chunk else pd.Series(np.nan, index=chunk.index)
+        lngs = _numbers(chunk['LONGITUDE']) if 'LONGITUDE' in chunk else pd.Series(np.nan, index=chunk.index)
+
+        missing = lats.isna() | lngs.isna()
+        if missing.any():
+            places = pd.Series(list(zip(chunk['ADDRESS'][missing].fillna('').str.strip(), boroughs[missing])),
+                               index=chunk.index[missing])
+            coords = {place: predictor._geocode_with_pattern_matching(*place) for place in set(places)}
+            lats[missing] = [coords[place]['lat'] for place in places]
+            lngs[missing] = [coords[place]['lng'] for place in places]
+
+        _, features = predictor.feature_matrix(lats.to_numpy(), lngs.to_numpy())
+        yield features, price_per_sqft[chunk.index].to_numpy(), rows_read
+
+def sample_sales(predictor, path, chunk_rows=SALES_CHUNK_ROWS, buffer_rows=SALES_BUFFER_ROWS, seed=TRAINING_SEED):
+    """Stream a sales CSV into a bounded uniform sample; returns (X, y, ingest stats)"""
+    sample = ReservoirSample(buffer_rows, 8, seed)
+    rows_read = 0
+    start = time.perf_counter()
+    for X, y, read in sales_feature_chunks(predictor, path, chunk_rows):
+        sample.add(X, y)
+        rows_read += read
+    seconds = time.perf_counter() - start
+
+    X, y = sample.data()
+    return X, y, {
+        'rows_read': rows_read,
+        'rows_valid': sample.seen,
+        'rows_sampled': len(sample),
+        'ingest_seconds': round(seconds, 3),
+        'rows_per_second': round(rows_read / seconds) if seconds else None
+    }
+
+def train_csv(args, registry):
+    predictor = NYCRealEstatePricePredictor()
+    print(f"📥 Streaming {args.csv} in chunks of {args.chunk_rows:,} rows...")
+    X, y, stats = sample_sales(predictor, args.csv, args.chunk_rows, args.buffer_rows, args.seed)
+    print(f"   {stats['rows_read']:,} rows in {stats['ingest_seconds']:.1f} s ({stats['rows_per_second']:,} rows/s), "
+          f"{stats['rows_valid']:,} with a market price and floor area, {stats['rows_sampled']:,} sampled for the fit")
+    if len(y) < 10:
+        print("⚠️ Not enough usable sales to train on")
+        return
+
+    start = time.perf_counter()
+    version, manifest = train_model_version(predictor, registry, args.seed, forest_params(args), args.promote,
+                                            training_data=(X, y), source='sales_csv',
+                                            sales_file=os.path.basename(args.csv), ingest=stats)
+    metrics = manifest['metrics']
+    print(f"🤖 Registered {version} in {time.perf_counter() - start:.1f} s: holdout R² {metrics['r2']}, "
+          f"RMSE ${metrics['rmse']}/sqft, MAE ${metrics['mae']}/sqft")
+    if args.promote:
+        print(f"🚀 Promoted {version}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--registry', default=MODEL_REGISTRY_DIR)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    train_parser = commands.add_parser('train', help='train and register a new version')
+    train_parser.add_argument('--seed', type=int, default=TRAINING_SEED)
+    train_parser.add_argument('--n-estimators', type=int)
+    train_parser.add_argument('--max-depth', type=int)
+    train_parser.add_argument('--min-samples-split', type=int)
+    train_parser.add_argument('--min-samples-leaf', type=int)
+    train_parser.add_argument('--promote', action='store_true', help='serve the new version')
+    train_parser.set_defaults(run=train)
+
+    commands.add_parser('list', help='list registered versions, * marks the promoted one').set_defaults(run=list_versions)
+
+    promote_parser = commands.add_parser('promote', help='serve a registered version')
+    promote_parser.add_argument('version')
+    promote_parser.set_defaults(run=promote)
+
+    search_parser = commands.add_parser('search', help='cross-validate forest settings in parallel')
+    search_parser.add_argument('--seed', type=int, default=TRAINING_SEED)
+    search_parser.add_argument('--random', type=int, help='evaluate this many random grid points instead of all')
+    search_parser.add_argument('--folds', type=int, default=SEARCH_FOLDS)
+    search_parser.add_argument('--workers', type=int, help='processes (default: every core)')
+    search_parser.add_argument('--min-r2', type=float, help='accuracy bar (default: within 0.01 of the best)')
+    search_parser.add_argument('--cache', default=FEATURE_CACHE_FILE)
+    search_parser.add_argument('--register', action='store_true', help='train and register the recommended forest')
+    search_parser.set_defaults(run=search)
+
+    distill_parser = commands.add_parser('distill', help='register a compact forest that mimics the full one')
+    distill_parser.add_argument('--teacher', help='registry version to mimic (default: the model being served)')
+    distill_parser.add_argument('--seed', type=int, default=TRAINING_SEED)
+    distill_parser.add_argument('--n-estimators', type=int)
+    distill_parser.add_argument('--max-depth', type=int)
+    distill_parser.add_argument('--min-samples-split', type=int)
+    distill_parser.add_argument('--min-samples-leaf', type=int)
+    distill_parser.add_argument('--promote', action='store_true', help='serve the compact version')
+    distill_parser.set_defaults(run=distill)
+
+    csv_parser = commands.add_parser('train-csv', help='train and register a version from a sales CSV')
+    csv_parser.add_argument('csv')
+    csv_parser.add_argument('--chunk-rows', type=int, default=SALES_CHUNK_ROWS)
+    csv_parser.add_argument('--buffer-rows', type=int, default=SALES_BUFFER_ROWS)
+    csv_parser.add_argument('--seed', type=int, default=TRAINING_SEED)
+    csv_parser.add_argument('--n-estimators', type=int)
+    csv_parser.add_argument('--max-depth', type=int)
+    csv_parser.add_argument('--min-samples-split', type=int)
+    csv_parser.add_argument('--min-samples-leaf', type=int)
+    csv_parser.add_argument('--promote', action='store_true', help='serve the new version')
+    csv_parser.set_defaults(run=train_csv)
+
+    args = parser.parse_args()
+    args.run(args, ModelRegistry(args.registry))
+
+if __name__ == "__main__":
+    main()